@@ -0,0 +1,51 @@
+"""Run the test suites of every module in one pytest session.
+
+module_03 and module_04 each import their shared code as a top-level package
+named common, from their own directory. Before a test file is collected and
+before each test runs, the common package of that file's module is swapped
+into sys.modules and the module directory goes first on sys.path.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent
+SHARED_PACKAGE = 'common'
+
+# common modules of the modules not currently active, by module directory
+_parked: dict[Path, dict[str, object]] = {}
+_active: Path | None = None
+
+
+def _module_dir(path: Path) -> Path | None:
+    """module_XX directory holding path, if any."""
+    try:
+        parts = Path(path).resolve().relative_to(ROOT).parts
+    except ValueError:
+        return None
+    return ROOT / parts[0] if parts and parts[0].startswith('module_') else None
+
+
+def _activate(module_dir: Path | None) -> None:
+    global _active
+    if module_dir is None or module_dir == _active:
+        return
+    loaded = [name for name in sys.modules if name == SHARED_PACKAGE or name.startswith(SHARED_PACKAGE + '.')]
+    parked = {name: sys.modules.pop(name) for name in loaded}
+    if _active is not None:
+        _parked[_active] = parked
+    sys.modules.update(_parked.pop(module_dir, {}))
+    if str(module_dir) in sys.path:
+        sys.path.remove(str(module_dir))
+    sys.path.insert(0, str(module_dir))
+    _active = module_dir
+
+
+def pytest_collectstart(collector: pytest.Collector) -> None:
+    _activate(_module_dir(collector.path))
+
+
+def pytest_runtest_setup(item: pytest.Item) -> None:
+    _activate(_module_dir(item.path))
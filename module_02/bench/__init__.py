@@ -0,0 +1 @@
+"""Synthetic data generation and scaling benchmarks for module_02."""
@@ -0,0 +1,236 @@
+"""Scaling benchmarks for the module_02 analysis functions on synthetic data.
+
+Each (function, size) pair runs in a fresh process so its peak RSS is its own.
+Results can be saved as baselines and later runs are compared against them.
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import multiprocessing
+import os
+import pickle
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Charts are drawn off-screen; common.plotting skips the GUI backend probing
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+MODULE_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(MODULE_ROOT))
+
+from bench.synthetic import (
+    DEFAULT_SEED,
+    customer_features_from_events,
+    generate_purchase_events,
+    parse_size,
+)
+from common.exercises import load_exercise
+
+DEFAULT_SIZES = [100_000, 1_000_000]
+DEFAULT_TOLERANCE = 0.25
+BASELINE_PATH = Path(__file__).parent / "baselines.json"
+# The exercises import these inside their functions to start quickly; the
+# worker imports them before the clock starts so only the work is timed
+DEFERRED_IMPORTS = ["pandas", "sklearn.cluster", "sklearn.preprocessing", "matplotlib.pyplot"]
+
+
+def _purchases(events):
+    purchases = events.loc[events["event_type"] == "purchase", ["user_id", "price"]]
+    return purchases.reset_index(drop=True)
+
+
+def _run_extract_customer_features(features):
+    # The SQL aggregate is replaced by its pandas equivalent during input
+    # preparation; what is timed is the Python feature engineering that follows it
+    load_exercise("clustering").prepare_customer_features(features)
+
+
+def _run_create_customer_segments(features):
+    clustering = load_exercise("clustering")
+    clustering.create_customer_segments(clustering.prepare_customer_features(features))
+
+
+def _run_prepare_clustering_features(purchases):
+    load_exercise("elbow").prepare_clustering_features(purchases)
+
+
+def _run_calculate_elbow_method(scaled_features):
+    load_exercise("elbow").calculate_elbow_method(scaled_features, max_clusters=10)
+
+
+def _run_create_frequency_chart(purchases):
+    import matplotlib.pyplot as plt
+
+    plt.close(load_exercise("building").create_frequency_chart(purchases))
+
+
+def _run_calculate_statistics(purchases):
+    with contextlib.redirect_stdout(io.StringIO()):
+        load_exercise("mustache").calculate_statistics(purchases)
+
+
+def _features_input(events):
+    return customer_features_from_events(events)
+
+
+def _scaled_input(events):
+    scaled, _ = load_exercise("elbow").prepare_clustering_features(_purchases(events))
+    return scaled
+
+
+# name -> (exercise script, input builder from raw events, timed function)
+BENCHMARKS = {
+    "extract_customer_features": ("clustering", _features_input, _run_extract_customer_features),
+    "create_customer_segments": ("clustering", _features_input, _run_create_customer_segments),
+    "prepare_clustering_features": ("elbow", _purchases, _run_prepare_clustering_features),
+    "calculate_elbow_method": ("elbow", _scaled_input, _run_calculate_elbow_method),
+    "create_frequency_chart": ("building", _purchases, _run_create_frequency_chart),
+    "calculate_statistics": ("mustache", _purchases, _run_calculate_statistics),
+}
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _benchmark_worker(name, input_path, queue):
+    exercise, _, run = BENCHMARKS[name]
+    with open(input_path, "rb") as handle:
+        payload = pickle.load(handle)
+    # Import the exercise and its deferred imports up front so import time is not part of the measurement
+    load_exercise(exercise)
+    for module in DEFERRED_IMPORTS:
+        importlib.import_module(module)
+
+    rss_before = _peak_rss_mb()
+    start = time.perf_counter()
+    run(payload)
+    wall_time = time.perf_counter() - start
+    peak_rss = _peak_rss_mb()
+
+    queue.put(
+        {
+            "wall_time": wall_time,
+            "peak_rss_mb": peak_rss,
+            "rss_growth_mb": max(0.0, peak_rss - rss_before),
+            "input_rows": len(payload),
+        }
+    )
+
+
+def run_benchmark(name, payload, work_dir):
+    """Time one benchmark in a fresh process and return its measurements."""
+    input_path = Path(work_dir) / f"{name}.pkl"
+    with open(input_path, "wb") as handle:
+        pickle.dump(payload, handle, protocol=pickle.HIGHEST_PROTOCOL)
+
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_benchmark_worker, args=(name, input_path, queue))
+    process.start()
+    process.join()
+    if process.exitcode != 0:
+        raise RuntimeError(f"Benchmark '{name}' failed with exit code {process.exitcode}")
+
+    result = queue.get()
+    result["rows_per_sec"] = result["input_rows"] / result["wall_time"] if result["wall_time"] else 0.0
+    return result
+
+
+def run_suite(sizes, names, seed=DEFAULT_SEED):
+    """Run every selected benchmark at every size; keys are 'function@size'."""
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="module02-bench-") as work_dir:
+        for size in sizes:
+            print(f"\nGenerating {size:,} synthetic events...")
+            # Only the purchases are kept: every input below is built from them
+            events = generate_purchase_events(size, seed)
+            for name in names:
+                payload = BENCHMARKS[name][1](events)
+                print(f"  {name:<28}", end="", flush=True)
+                result = run_benchmark(name, payload, work_dir)
+                results[f"{name}@{size}"] = result
+                print(
+                    f"{result['wall_time']:9.3f}s  {result['peak_rss_mb']:9.1f} MB"
+                    f"  {result['rows_per_sec']:14,.0f} rows/s"
+                )
+            del events
+    return results
+
+
+def compare_with_baselines(results, baselines, tolerance):
+    """Return a list of human-readable regressions beyond the tolerance."""
+    regressions = []
+    for key, result in results.items():
+        baseline = baselines.get(key)
+        if baseline is None:
+            continue
+        for metric in ("wall_time", "peak_rss_mb"):
+            limit = baseline[metric] * (1 + tolerance)
+            if result[metric] > limit:
+                change = (result[metric] / baseline[metric] - 1) * 100
+                regressions.append(
+                    f"{key}: {metric} {result[metric]:.3f} vs baseline {baseline[metric]:.3f} (+{change:.0f}%)"
+                )
+    return regressions
+
+
+def main():
+    """Run the benchmark suite and compare against stored baselines."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", nargs="+", type=parse_size, default=DEFAULT_SIZES,
+                        help="event counts to generate, e.g. 1e5 1e6 1e7")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store this run's results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown/growth before flagging a regression")
+    parser.add_argument("--output", type=Path, help="write the raw results as JSON")
+    args = parser.parse_args()
+
+    results = run_suite(args.sizes, args.only, args.seed)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+        print(f"\nResults written to {args.output}")
+
+    baselines = {}
+    if args.baseline.exists():
+        baselines = json.loads(args.baseline.read_text())
+
+    if args.save_baseline:
+        baselines.update(results)
+        args.baseline.write_text(json.dumps(baselines, indent=2, sort_keys=True))
+        print(f"\n✓ Baseline saved to {args.baseline}")
+        return 0
+
+    if not baselines:
+        print("\nNo baseline found; run with --save-baseline to create one.")
+        return 0
+
+    regressions = compare_with_baselines(results, baselines, args.tolerance)
+    if regressions:
+        print(f"\n✗ {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+
+    print(f"\n✓ No regressions beyond {args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        sys.exit(1)
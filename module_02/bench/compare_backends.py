@@ -0,0 +1,86 @@
+"""Compare the Postgres and DuckDB/Parquet backends on the module_02 dashboard queries."""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy.exc import OperationalError
+
+from common.backends import BACKENDS, open_backend
+from common.queries import DASHBOARD_QUERIES
+
+
+def positive_int(value):
+    """argparse type for counts that must be at least 1."""
+    try:
+        number = int(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"Invalid count '{value}'") from e
+    if number < 1:
+        raise argparse.ArgumentTypeError("Count must be at least 1")
+    return number
+
+
+def time_queries(backend_name, queries, repeat):
+    """Return {query name: (median seconds, row count)} for one backend."""
+    timings = {}
+    with open_backend(backend_name) as backend:
+        for name, query in queries.items():
+            samples = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                data = backend.read_query(query)
+                samples.append(time.perf_counter() - start)
+            timings[name] = (statistics.median(samples), len(data))
+    return timings
+
+
+def main():
+    """Run every dashboard query on each backend and print a side-by-side comparison."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=positive_int, default=3, help="runs per query; the median is reported")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    args = parser.parse_args()
+
+    results = {}
+    for backend_name in args.backends:
+        print(f"Timing {backend_name}...")
+        try:
+            results[backend_name] = time_queries(backend_name, DASHBOARD_QUERIES, args.repeat)
+        except (ImportError, FileNotFoundError, ValueError, OperationalError) as e:
+            print(f"✗ Skipping {backend_name}: {e}")
+
+    if not results:
+        return 1
+
+    names = list(results)
+    header = f"{'query':<12}" + "".join(f"{name:>14}" for name in names)
+    if len(names) == 2:
+        header += f"{'speedup':>10}"
+    print("\n" + header)
+    print("-" * len(header))
+
+    for query in DASHBOARD_QUERIES:
+        row = f"{query:<12}" + "".join(f"{results[name][query][0]:13.3f}s" for name in names)
+        if len(names) == 2:
+            first, second = (results[name][query] for name in names)
+            row += f"{first[0] / second[0]:9.1f}x" if second[0] else f"{'-':>10}"
+            if first[1] != second[1]:
+                row += f"  ⚠ row counts differ ({first[1]:,} vs {second[1]:,})"
+        print(row)
+
+    totals = {name: sum(seconds for seconds, _ in results[name].values()) for name in names}
+    print("-" * len(header))
+    print(f"{'total':<12}" + "".join(f"{totals[name]:13.3f}s" for name in names))
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        sys.exit(1)
@@ -0,0 +1,97 @@
+"""Memory footprint of the customer feature frame through the segmentation stages.
+
+Synthesizes a frame shaped like CUSTOMER_FEATURES_QUERY's result (dates as
+Python date objects, as the database drivers return them) and reports its
+size and the tracemalloc peak of engineering features and segmenting it,
+scaled to one million customers.
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+MODULE_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(MODULE_ROOT))
+
+from bench.synthetic import DEFAULT_SEED, PERIOD_END, PERIOD_START, parse_size
+from common.exercises import load_exercise
+
+MILLION = 1_000_000
+
+
+def synthetic_customer_features(n_customers, seed=DEFAULT_SEED):
+    """A CUSTOMER_FEATURES_QUERY-shaped frame drawn directly per customer."""
+    rng = np.random.default_rng(seed)
+    period_days = int((PERIOD_END - PERIOD_START).astype("timedelta64[D]").astype(np.int64))
+    first_day = rng.integers(0, period_days, n_customers)
+    lifespan = rng.integers(0, period_days - first_day) + 1
+    total_purchases = rng.geometric(0.15, n_customers)
+    active_days = np.minimum(total_purchases, lifespan)
+    total_spent = np.round(total_purchases * rng.lognormal(1.5, 0.8, n_customers), 2)
+
+    start = PERIOD_START.astype("datetime64[D]")
+    first_date = start + first_day
+    last_date = first_date + lifespan - 1
+    return pd.DataFrame(
+        {
+            "customer_id": np.arange(n_customers, dtype=np.int64) + 100_000_000,
+            "total_purchases": total_purchases.astype(np.int64),
+            "total_spent": total_spent,
+            "avg_purchase_value": total_spent / total_purchases,
+            "first_purchase_date": first_date.astype(object),
+            "last_purchase_date": last_date.astype(object),
+            "customer_lifespan_days": lifespan.astype(np.int64),
+            "active_days": active_days.astype(np.int64),
+            "days_since_last_purchase": (PERIOD_END.astype("datetime64[D]") - last_date).astype(np.int64),
+            "last_event_time": pd.to_datetime(last_date).tz_localize("UTC") + pd.Timedelta(hours=12),
+        }
+    )
+
+
+def frame_bytes(data):
+    return int(data.memory_usage(deep=True, index=True).sum())
+
+
+def measure(n_customers, seed):
+    """Return (frame bytes after extraction, frame bytes after segmenting, peak bytes, seconds)."""
+    clustering = load_exercise("clustering")
+    raw = synthetic_customer_features(n_customers, seed)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    data = clustering.prepare_customer_features(raw)
+    del raw
+    extracted = frame_bytes(data)
+    data, _, _ = clustering.create_customer_segments(data)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return extracted, frame_bytes(data), peak, elapsed
+
+
+def main():
+    """Report the feature frame's memory per million customers."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--customers", type=parse_size, default=MILLION)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    args = parser.parse_args()
+
+    extracted, segmented, peak, elapsed = measure(args.customers, args.seed)
+    scale = MILLION / args.customers
+    print(f"{args.customers:,} customers, segmented in {elapsed:.2f}s")
+    print(f"  feature frame after extraction: {extracted * scale / 2**20:8.1f} MB per million customers")
+    print(f"  feature frame after segmenting: {segmented * scale / 2**20:8.1f} MB per million customers")
+    print(f"  tracemalloc peak while segmenting: {peak * scale / 2**20:8.1f} MB per million customers")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        sys.exit(1)
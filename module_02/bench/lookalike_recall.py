@@ -0,0 +1,124 @@
+"""Recall and latency of the lookalike index against a brute-force scan.
+
+Builds the index over customers derived from synthetic events, then answers
+the same random seed sets with the tree and with brute force. Recall counts a
+returned customer as correct when it is no farther from the seeds than the
+brute-force k-th neighbour, so ties between identical customers do not count
+as misses. The same comparison is repeated after an incremental update.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+MODULE_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(MODULE_ROOT))
+
+from bench.synthetic import DEFAULT_SEED, customer_features_from_events, generate_purchase_events, parse_size
+from common.exercises import load_exercise
+
+DEFAULT_SEED_SIZES = [1, 10, 100]
+DEFAULT_QUERIES = 50
+# Share of customers whose features change between the full build and the update
+CHANGED_FRACTION = 0.01
+
+
+def scaled_customer_features(n_rows, seed):
+    """Customer ids and StandardScaler-ed clustering features from synthetic events."""
+    clustering = load_exercise("clustering")
+    from sklearn.preprocessing import StandardScaler
+    from segmentation import CLUSTERING_FEATURES
+
+    data = clustering.add_engagement_features(
+        customer_features_from_events(generate_purchase_events(n_rows, seed))
+    )
+    features = data[CLUSTERING_FEATURES].fillna(0).to_numpy(dtype=np.float64)
+    return data["customer_id"].to_numpy(dtype=np.int64), StandardScaler().fit_transform(features)
+
+
+def timed(call, *args):
+    start = time.perf_counter_ns()
+    result = call(*args)
+    return result, (time.perf_counter_ns() - start) / 1e6
+
+
+def compare(index, ids, vectors, seed_size, k, n_queries, rng):
+    """Run n_queries random seed sets; returns (recall, index ms list, brute ms list)."""
+    from lookalike import brute_force_query
+
+    hits = total = 0
+    index_ms, brute_ms = [], []
+    for _ in range(n_queries):
+        seeds = rng.choice(ids, size=seed_size, replace=False)
+        (found, _), elapsed = timed(index.query, seeds, k)
+        index_ms.append(elapsed)
+        (_, expected), elapsed = timed(brute_force_query, ids, vectors, seeds, k)
+        brute_ms.append(elapsed)
+
+        seed_vectors = vectors[np.isin(ids, seeds)]
+        found_vectors = vectors[np.searchsorted(ids, found)]
+        found_distances = np.sqrt(((found_vectors[:, None, :] - seed_vectors[None]) ** 2).sum(axis=2)).min(axis=1)
+        hits += int((found_distances <= expected[-1] + 1e-9).sum())
+        total += len(expected)
+    return hits / total, index_ms, brute_ms
+
+
+def print_comparison(label, index, ids, vectors, seed_sizes, k, n_queries, rng):
+    for seed_size in seed_sizes:
+        recall, index_ms, brute_ms = compare(index, ids, vectors, seed_size, k, n_queries, rng)
+        print(
+            f"{label:<10}{seed_size:>6}{recall:>9.3f}"
+            f"{np.percentile(index_ms, 50):>11.2f}{np.percentile(index_ms, 99):>11.2f}"
+            f"{np.percentile(brute_ms, 50):>11.2f}{np.percentile(brute_ms, 99):>11.2f}"
+        )
+
+
+def main():
+    """Benchmark the lookalike index against brute force on synthetic customers."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=parse_size, default=3_000_000,
+                        help="synthetic events the customers are derived from")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--seed-sizes", nargs="+", type=int, default=DEFAULT_SEED_SIZES)
+    parser.add_argument("--queries", type=int, default=DEFAULT_QUERIES)
+    parser.add_argument("--tree", choices=["kd_tree", "ball_tree"], default="kd_tree")
+    args = parser.parse_args()
+
+    print(f"Deriving customers from {args.rows:,} synthetic events...")
+    ids, vectors = scaled_customer_features(args.rows, args.seed)
+    from lookalike import LookalikeIndex
+
+    order = np.argsort(ids)
+    ids, vectors = ids[order], vectors[order]
+    rng = np.random.default_rng(args.seed)
+
+    index, build_ms = timed(LookalikeIndex(args.tree).build, ids, vectors)
+    print(f"Built {args.tree} over {len(ids):,} customers in {build_ms:.1f} ms\n")
+
+    print(f"{'index':<10}{'seeds':>6}{'recall':>9}{'p50 ms':>11}{'p99 ms':>11}{'brute p50':>11}{'brute p99':>11}")
+    print_comparison("full", index, ids, vectors, args.seed_sizes, args.k, args.queries, rng)
+
+    # Move a share of the customers, as an incremental refresh would
+    changed = rng.choice(len(ids), size=max(1, int(len(ids) * CHANGED_FRACTION)), replace=False)
+    vectors = vectors.copy()
+    vectors[changed] += rng.normal(scale=0.5, size=(len(changed), vectors.shape[1]))
+    rebuilt, upsert_ms = timed(index.upsert, ids[changed], vectors[changed])
+    print_comparison("updated", index, ids, vectors, args.seed_sizes, args.k, args.queries, rng)
+
+    print(
+        f"\nUpserted {len(changed):,} changed customers in {upsert_ms:.1f} ms "
+        f"({'tree rebuilt' if rebuilt else f'{len(index.delta_ids):,} in the brute-force delta'}), "
+        f"full build takes {build_ms:.1f} ms"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        sys.exit(1)
@@ -0,0 +1,137 @@
+"""Latency and throughput benchmark for the in-process segment scorer.
+
+Times SegmentScorer.score on single customers and micro-batches and reports
+p50/p99 latency per call and customers scored per second. With --http the same
+is measured end to end through the local HTTP front-end.
+"""
+
+import argparse
+import http.client
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+MODULE_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(MODULE_ROOT))
+
+from bench.synthetic import DEFAULT_SEED, customer_features_from_events, generate_purchase_events, parse_size
+from common.exercises import load_exercise
+
+DEFAULT_BATCH_SIZES = [1, 8, 64, 512, 4096]
+DEFAULT_HTTP_BATCH_SIZES = [1, 64]
+TIME_BUDGET = 1.0
+MAX_CALLS = 20_000
+
+
+def fit_synthetic_scorer(n_rows, seed):
+    """Fit the segmentation on synthetic events and return (scorer, feature records)."""
+    clustering = load_exercise("clustering")
+    from scoring import SegmentScorer
+    from segmentation import CLUSTERING_FEATURES
+
+    features = clustering.add_engagement_features(
+        customer_features_from_events(generate_purchase_events(n_rows, seed))
+    )
+    data, kmeans, scaler = clustering.create_customer_segments(features)
+    scorer = SegmentScorer.from_fit(data, kmeans, scaler, model_version="synthetic")
+    return scorer, data[CLUSTERING_FEATURES].to_numpy(dtype=np.float64)
+
+
+def percentiles(timings_ns):
+    timings_us = np.asarray(timings_ns) / 1000
+    return np.percentile(timings_us, 50), np.percentile(timings_us, 99)
+
+
+def time_calls(call, batches):
+    """Call repeatedly for about TIME_BUDGET seconds; returns per-call nanoseconds."""
+    timings = []
+    deadline = time.perf_counter() + TIME_BUDGET
+    for index in range(MAX_CALLS):
+        batch = batches[index % len(batches)]
+        start = time.perf_counter_ns()
+        call(batch)
+        timings.append(time.perf_counter_ns() - start)
+        if time.perf_counter() > deadline:
+            break
+    return timings
+
+
+def sample_batches(features, batch_size, rng, count=64):
+    # Batches are sliced up front so the timed call does no indexing of its own
+    return [features[rng.integers(0, len(features), batch_size)] for _ in range(count)]
+
+
+def print_row(label, batch_size, timings_ns):
+    p50, p99 = percentiles(timings_ns)
+    throughput = batch_size * len(timings_ns) / (sum(timings_ns) / 1e9)
+    print(f"{label:<8}{batch_size:>8}{len(timings_ns):>9,}{p50:>12.1f}{p99:>12.1f}{throughput:>16,.0f}")
+
+
+def benchmark_in_process(scorer, features, batch_sizes, rng):
+    for batch_size in batch_sizes:
+        batches = sample_batches(features, batch_size, rng)
+        scorer.score(batches[0])  # warm-up
+        print_row("numpy", batch_size, time_calls(scorer.score, batches))
+
+
+def benchmark_http(scorer, features, batch_sizes, rng):
+    from scoring import make_server
+    from segmentation import CLUSTERING_FEATURES
+
+    server = make_server(scorer, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    connection = http.client.HTTPConnection(*server.server_address)
+
+    def post(body):
+        connection.request("POST", "/score", body, {"Content-Type": "application/json"})
+        response = connection.getresponse()
+        response.read()
+        if response.status != 200:
+            raise RuntimeError(f"Scoring request failed with HTTP {response.status}")
+
+    try:
+        for batch_size in batch_sizes:
+            bodies = [
+                json.dumps({"customers": [dict(zip(CLUSTERING_FEATURES, row)) for row in batch.tolist()]})
+                for batch in sample_batches(features, batch_size, rng, count=16)
+            ]
+            post(bodies[0])  # warm-up and keep-alive connection
+            print_row("http", batch_size, time_calls(post, bodies))
+    finally:
+        connection.close()
+        server.shutdown()
+        server.server_close()
+
+
+def main():
+    """Benchmark the scorer on a model fitted to synthetic data."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=parse_size, default=1_000_000,
+                        help="synthetic events used to fit the model")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=DEFAULT_BATCH_SIZES)
+    parser.add_argument("--http", action="store_true", help="also measure through the HTTP front-end")
+    args = parser.parse_args()
+
+    print(f"Fitting segments on {args.rows:,} synthetic events...")
+    scorer, features = fit_synthetic_scorer(args.rows, args.seed)
+    print(f"Scoring against {len(features):,} customers' features\n")
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'path':<8}{'batch':>8}{'calls':>9}{'p50 (us)':>12}{'p99 (us)':>12}{'customers/s':>16}")
+    benchmark_in_process(scorer, features, args.batch_sizes, rng)
+    if args.http:
+        benchmark_http(scorer, features, DEFAULT_HTTP_BATCH_SIZES, rng)
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        sys.exit(1)
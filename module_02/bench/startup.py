@@ -0,0 +1,110 @@
+"""Cold-start benchmark for the module_02 entry points using python -X importtime.
+
+Each target is started in a fresh interpreter several times. The median wall
+time, minus a bare interpreter start, is checked against a cold-start budget,
+and the heaviest top-level imports are listed so regressions are easy to trace.
+"""
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+MODULE_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(MODULE_ROOT))
+
+from common.exercises import EXERCISES
+
+# Budget for loading an entry point, on top of the bare interpreter start
+DEFAULT_BUDGET_MS = 400
+DEFAULT_REPEATS = 5
+TOP_IMPORTS = 5
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+LOAD_EXERCISE = (
+    "import sys; sys.path.insert(0, {root!r}); "
+    "from common.exercises import load_exercise; load_exercise({name!r})"
+)
+
+
+def build_targets():
+    """Map target names to interpreter arguments."""
+    targets = {"cli --help": [str(MODULE_ROOT / "cli.py"), "--help"]}
+    for name in EXERCISES:
+        targets[f"import {name}"] = ["-c", LOAD_EXERCISE.format(root=str(MODULE_ROOT), name=name)]
+    return targets
+
+
+def parse_importtime(stderr):
+    """Return {top-level module: cumulative microseconds} from -X importtime output."""
+    top_level = {}
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match and not match.group(3):
+            top_level[match.group(4)] = int(match.group(2))
+    return top_level
+
+
+def time_start(args, repeats):
+    """Median wall time of starting an interpreter with args, plus its import profile."""
+    timings = []
+    imports = {}
+    for _ in range(repeats):
+        start = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", *args],
+            capture_output=True,
+            text=True,
+        )
+        timings.append(time.perf_counter() - start)
+        if completed.returncode != 0:
+            raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+        imports = parse_importtime(completed.stderr)
+    return statistics.median(timings), imports
+
+
+def main():
+    """Measure every entry point and check it against the cold-start budget."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="allowed start-up time on top of a bare interpreter")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    args = parser.parse_args()
+
+    interpreter_time, _ = time_start(["-c", "pass"], args.repeats)
+    print(f"Bare interpreter start: {interpreter_time * 1000:.0f} ms")
+    print(f"Budget per entry point: {args.budget_ms:.0f} ms on top of that\n")
+
+    over_budget = []
+    for name, target_args in build_targets().items():
+        try:
+            wall_time, imports = time_start(target_args, args.repeats)
+        except RuntimeError as e:
+            print(f"{name:<20} failed: {e}")
+            over_budget.append(name)
+            continue
+
+        own_ms = (wall_time - interpreter_time) * 1000
+        status = "✓" if own_ms <= args.budget_ms else "✗"
+        if own_ms > args.budget_ms:
+            over_budget.append(name)
+        heaviest = sorted(imports.items(), key=lambda item: item[1], reverse=True)[:TOP_IMPORTS]
+        heaviest_text = ", ".join(f"{module} {us / 1000:.0f}ms" for module, us in heaviest)
+        print(f"{status} {name:<20}{own_ms:8.0f} ms   {heaviest_text}")
+
+    if over_budget:
+        print(f"\n✗ {len(over_budget)} entry point(s) over budget: {', '.join(over_budget)}")
+        return 1
+    print("\n✓ All entry points within the cold-start budget")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        sys.exit(1)
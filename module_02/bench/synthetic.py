@@ -0,0 +1,276 @@
+"""Deterministic synthetic customers/items event data for benchmarking module_02."""
+
+import argparse
+import shutil
+import sys
+import uuid
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_SEED = 42
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+# Funnel shape of the real warehouse: ~60% view-to-cart, ~23% cart-to-purchase
+EVENT_TYPES = np.array(["view", "cart", "remove_from_cart", "purchase"])
+EVENT_WEIGHTS = np.array([0.467, 0.280, 0.187, 0.066])
+
+PERIOD_START = np.datetime64("2022-10-01T00:00:00", "s")
+PERIOD_END = np.datetime64("2023-03-01T00:00:00", "s")
+
+USER_ID_BASE = 100_000_000
+PRODUCT_ID_BASE = 3_700_000
+CATEGORY_ID_BASE = 1_487_580_000_000_000_000
+
+CATEGORY_CODES = np.array(
+    [
+        "appliances.environment.vacuum",
+        "apparel.glove",
+        "furniture.bathroom.bath",
+        "stationery.cartrige",
+        "accessories.bag",
+        "appliances.personal.hair_cutter",
+    ],
+    dtype=object,
+)
+BRANDS = np.array(
+    ["runail", "irisk", "masura", "grattol", "kapous", "estel", "ingarden", "uno"],
+    dtype=object,
+)
+
+CUSTOMER_COLUMNS = ["event_time", "event_type", "product_id", "price", "user_id", "user_session"]
+ITEM_COLUMNS = ["product_id", "category_id", "category_code", "brand"]
+
+
+def dataset_shape(n_rows):
+    """Scale the user and product populations with the event count."""
+    n_users = max(100, n_rows // 25)
+    n_products = min(250_000, max(50, n_rows // 200))
+    return n_users, n_products
+
+
+def _skewed_index(rng, size, population):
+    # Squaring a uniform draw concentrates activity on low indices, giving a few
+    # heavy users/products and a long tail, like the real event logs
+    return np.floor(population * rng.random(size) ** 2).astype(np.int64)
+
+
+def generate_items(n_products, seed=DEFAULT_SEED):
+    """Build the item catalogue, including the per-product price used by events."""
+    rng = np.random.default_rng([seed, 0xC0FFEE])
+    n_categories = max(5, n_products // 40)
+
+    category_index = rng.integers(0, n_categories, n_products)
+    items = pd.DataFrame(
+        {
+            "product_id": PRODUCT_ID_BASE + np.arange(n_products, dtype=np.int64),
+            "category_id": CATEGORY_ID_BASE + category_index * 7919,
+            "category_code": CATEGORY_CODES[category_index % len(CATEGORY_CODES)],
+            "brand": BRANDS[rng.integers(0, len(BRANDS), n_products)],
+        }
+    )
+    # The real catalogue is missing most category codes and many brands
+    items.loc[rng.random(n_products) < 0.7, "category_code"] = None
+    items.loc[rng.random(n_products) < 0.3, "brand"] = None
+
+    prices = np.round(rng.lognormal(mean=1.5, sigma=0.9, size=n_products), 2)
+    prices = np.clip(prices, 0.05, 350.0)
+    return items, prices
+
+
+def _session_ids(user_ids, event_times, seed):
+    # One session per user per day; only the distinct pairs are formatted as UUIDs
+    days = event_times.astype("datetime64[D]").astype(np.int64)
+    pairs = np.stack([user_ids, days], axis=1)
+    unique_pairs, inverse = np.unique(pairs, axis=0, return_inverse=True)
+
+    rng = np.random.default_rng([seed, int(unique_pairs[0, 1]), len(unique_pairs)])
+    raw = rng.integers(0, 256, size=(len(unique_pairs), 16), dtype=np.uint8)
+    sessions = np.array(
+        [str(uuid.UUID(bytes=row.tobytes(), version=4)) for row in raw], dtype=object
+    )
+    return sessions[inverse.ravel()]
+
+
+def iter_event_chunks(n_rows, seed=DEFAULT_SEED, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield customer event DataFrames in time order, chunk by chunk.
+
+    Each chunk draws from its own seeded generator and covers its own slice of
+    the period, so output is identical for a given (n_rows, seed, chunk_size).
+    """
+    n_users, n_products = dataset_shape(n_rows)
+    _, product_prices = generate_items(n_products, seed)
+
+    period_seconds = int((PERIOD_END - PERIOD_START) / np.timedelta64(1, "s"))
+    n_chunks = max(1, -(-n_rows // chunk_size))
+
+    for chunk_index in range(n_chunks):
+        size = min(chunk_size, n_rows - chunk_index * chunk_size)
+        rng = np.random.default_rng([seed, chunk_index])
+
+        slice_start = period_seconds * chunk_index // n_chunks
+        slice_end = period_seconds * (chunk_index + 1) // n_chunks
+        offsets = np.sort(rng.integers(slice_start, slice_end, size))
+        event_times = PERIOD_START + offsets.astype("timedelta64[s]")
+
+        user_ids = USER_ID_BASE + _skewed_index(rng, size, n_users)
+        product_index = _skewed_index(rng, size, n_products)
+
+        yield pd.DataFrame(
+            {
+                "event_time": event_times,
+                "event_type": EVENT_TYPES[rng.choice(len(EVENT_TYPES), size, p=EVENT_WEIGHTS)],
+                "product_id": PRODUCT_ID_BASE + product_index,
+                "price": product_prices[product_index],
+                "user_id": user_ids,
+                "user_session": _session_ids(user_ids, event_times, seed),
+            },
+            columns=CUSTOMER_COLUMNS,
+        )
+
+
+def generate_events(n_rows, seed=DEFAULT_SEED, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Materialize all events in memory; use iter_event_chunks for large sizes."""
+    return pd.concat(iter_event_chunks(n_rows, seed, chunk_size), ignore_index=True)
+
+
+def generate_purchase_events(n_rows, seed=DEFAULT_SEED, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Purchase events of the n_rows-event dataset, filtered chunk by chunk.
+
+    Purchases are about 7% of the events and every benchmark input derives
+    from them, so sizes far beyond memory (1e8 events) can still be benchmarked.
+    The session ids, one string per row, are left out.
+    """
+    columns = [column for column in CUSTOMER_COLUMNS if column != "user_session"]
+    purchases = [
+        chunk.loc[chunk["event_type"] == "purchase", columns]
+        for chunk in iter_event_chunks(n_rows, seed, chunk_size)
+    ]
+    return pd.concat(purchases, ignore_index=True)
+
+
+def customer_features_from_events(events, as_of=PERIOD_END):
+    """Pandas equivalent of CUSTOMER_FEATURES_QUERY, used when no database is involved."""
+    purchases = events[(events["event_type"] == "purchase") & (events["price"] > 0)]
+    purchase_dates = purchases["event_time"].dt.floor("D")
+    grouped = purchases.assign(purchase_date=purchase_dates).groupby("user_id")
+
+    features = grouped.agg(
+        total_purchases=("price", "size"),
+        total_spent=("price", "sum"),
+        avg_purchase_value=("price", "mean"),
+        first_purchase_date=("purchase_date", "min"),
+        last_purchase_date=("purchase_date", "max"),
+        active_days=("purchase_date", "nunique"),
+    )
+    features["customer_lifespan_days"] = (
+        features["last_purchase_date"] - features["first_purchase_date"]
+    ).dt.days + 1
+    features["days_since_last_purchase"] = (
+        pd.Timestamp(as_of) - features["last_purchase_date"]
+    ).dt.days
+
+    features = features.reset_index().rename(columns={"user_id": "customer_id"})
+    features["first_purchase_date"] = features["first_purchase_date"].dt.date
+    features["last_purchase_date"] = features["last_purchase_date"].dt.date
+    return features.sort_values("total_spent", ascending=False, ignore_index=True)
+
+
+def write_dataset(output_dir, n_rows, seed=DEFAULT_SEED, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Write customer/customers.csv and item/item.csv in the layout the module_00 loaders expect."""
+    output_dir = Path(output_dir).expanduser()
+    customer_path = output_dir / "customer" / "customers.csv"
+    item_path = output_dir / "item" / "item.csv"
+    customer_path.parent.mkdir(parents=True, exist_ok=True)
+    item_path.parent.mkdir(parents=True, exist_ok=True)
+
+    _, n_products = dataset_shape(n_rows)
+    items, _ = generate_items(n_products, seed)
+    items.to_csv(item_path, index=False)
+
+    written = 0
+    with open(customer_path, "w", newline="") as handle:
+        for index, chunk in enumerate(iter_event_chunks(n_rows, seed, chunk_size)):
+            chunk["event_time"] = chunk["event_time"].dt.strftime("%Y-%m-%d %H:%M:%S UTC")
+            chunk.to_csv(handle, index=False, header=index == 0)
+            written += len(chunk)
+            print(f"\r  {written:,}/{n_rows:,} events written", end="", flush=True)
+    print()
+
+    return customer_path, item_path
+
+
+def write_parquet_dataset(parquet_path, n_rows, seed=DEFAULT_SEED, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Write the same data straight into the Parquet layout read by the DuckDB backend."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    parquet_path = Path(parquet_path).expanduser()
+    customers_path = parquet_path / "customers"
+    items_path = parquet_path / "items"
+    for path in (customers_path, items_path):
+        if path.exists():
+            shutil.rmtree(path)
+    items_path.mkdir(parents=True)
+
+    _, n_products = dataset_shape(n_rows)
+    items, _ = generate_items(n_products, seed)
+    pq.write_table(pa.Table.from_pandas(items, preserve_index=False), items_path / "items.parquet")
+
+    for index, chunk in enumerate(iter_event_chunks(n_rows, seed, chunk_size)):
+        chunk["event_time"] = chunk["event_time"].dt.tz_localize("UTC")
+        chunk["event_month"] = chunk["event_time"].dt.strftime("%Y-%m")
+        pq.write_to_dataset(
+            pa.Table.from_pandas(chunk, preserve_index=False),
+            root_path=customers_path,
+            partition_cols=["event_month"],
+            basename_template=f"part-{index:05d}-{{i}}.parquet",
+        )
+
+    return parquet_path
+
+
+def parse_size(value):
+    """Accept sizes such as 100000, 1e6 or 10**7."""
+    try:
+        if "**" in value:
+            base, exponent = value.split("**", 1)
+            size = int(base) ** int(exponent)
+        else:
+            size = int(float(value))
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"Invalid size '{value}'") from e
+    if size <= 0:
+        raise argparse.ArgumentTypeError("Size must be positive")
+    return size
+
+
+def main():
+    """Generate a synthetic warehouse dataset on disk."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=parse_size, default=1_000_000, help="number of customer events")
+    parser.add_argument("--output", default="~/goinfre/data", help="data directory (DATA_PATH)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--chunk-size", type=parse_size, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv",
+                        help="parquet writes the DuckDB backend layout instead of loader CSVs")
+    args = parser.parse_args()
+
+    print(f"Generating {args.rows:,} synthetic events (seed={args.seed})...")
+    if args.format == "parquet":
+        parquet_path = write_parquet_dataset(args.output, args.rows, args.seed, args.chunk_size)
+        print(f"✓ Parquet dataset: {parquet_path}")
+        return
+
+    customer_path, item_path = write_dataset(args.output, args.rows, args.seed, args.chunk_size)
+    print(f"✓ Customers: {customer_path}")
+    print(f"✓ Items:     {item_path}")
+    print("Load them with module_00/ex03/automatic_table.sh and module_00/ex04/items_table.sh")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit(1)
@@ -0,0 +1,61 @@
+"""Single entry point for the module_02 scripts: cli.py <command> [script arguments].
+
+Only the chosen command's script is loaded, so listing commands or asking for
+help never imports pandas, matplotlib or sklearn.
+"""
+
+import argparse
+import runpy
+import sys
+from pathlib import Path
+
+MODULE_ROOT = Path(__file__).resolve().parent
+
+COMMANDS = {
+    "pie": ("ex00/pie.py", "event type distribution pie chart"),
+    "chart": ("ex01/chart.py", "daily customers, monthly sales and average spend"),
+    "mustache": ("ex02/mustache.py", "purchase price statistics and box plots"),
+    "building": ("ex03/Building.py", "order frequency and spending bar charts"),
+    "elbow": ("ex04/elbow.py", "elbow method for the number of clusters"),
+    "clustering": ("ex05/Clustering.py", "customer segmentation"),
+    "lookalike": ("ex05/lookalike.py", "customers most similar to a seed set"),
+    "serve-segments": ("ex05/scoring.py", "local HTTP API scoring customers' segments"),
+    "dashboard": ("dashboard.py", "all exercise queries concurrently"),
+    "queries": ("query_report.py", "rank the heaviest logged SQL queries"),
+    "export-parquet": ("export_parquet.py", "export the warehouse to Parquet for DuckDB"),
+    "synthetic": ("bench/synthetic.py", "generate a synthetic dataset"),
+    "benchmark": ("bench/benchmark.py", "scaling benchmarks on synthetic data"),
+    "compare-backends": ("bench/compare_backends.py", "Postgres vs DuckDB query timings"),
+    "startup": ("bench/startup.py", "import-time benchmark against the cold-start budget"),
+    "bench-scoring": ("bench/scoring_latency.py", "p50/p99 latency of the segment scorer"),
+    "bench-lookalike": ("bench/lookalike_recall.py", "lookalike index recall and latency vs brute force"),
+    "feature-memory": ("bench/feature_memory.py", "customer feature frame memory per million customers"),
+}
+
+
+def run_command(name, args):
+    """Run a command's script as __main__ with the remaining arguments."""
+    script_path = MODULE_ROOT / COMMANDS[name][0]
+    # Scripts import sibling helpers by plain name, as when run directly
+    sys.path.insert(0, str(script_path.parent))
+    sys.argv = [str(script_path), *args]
+    runpy.run_path(str(script_path), run_name="__main__")
+
+
+def main():
+    """Dispatch to the selected module_02 script."""
+    commands = "\n".join(f"  {name:<18}{help_text}" for name, (_, help_text) in COMMANDS.items())
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        epilog=f"commands:\n{commands}",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("command", choices=COMMANDS, metavar="command")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="arguments passed to the script")
+    args = parser.parse_args()
+
+    run_command(args.command, args.args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Shared helpers for the module_02 visualization scripts."""
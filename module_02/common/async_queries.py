@@ -0,0 +1,80 @@
+"""Concurrent execution of independent dashboard queries with asyncio."""
+
+import asyncio
+import time
+from dataclasses import dataclass
+
+import pandas as pd
+
+
+@dataclass
+class QueryResult:
+    name: str
+    data: pd.DataFrame
+    elapsed: float
+    # perf_counter() when the query returned, stamped on its worker thread
+    finished: float
+
+
+def _read_query(name, query, backend):
+    start = time.perf_counter()
+    data = backend.read_query(query)
+    finished = time.perf_counter()
+    return QueryResult(name, data, finished - start, finished)
+
+
+async def iter_query_results(queries, backend):
+    """Run every query concurrently and yield results in completion order.
+
+    Each query runs on its own worker thread and connection (a pooled Postgres
+    connection or a DuckDB cursor); both drivers release the GIL while a query
+    runs, so the queries overlap.
+    """
+    tasks = [
+        asyncio.create_task(asyncio.to_thread(_read_query, name, query, backend))
+        for name, query in queries.items()
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def run_queries_concurrently(queries, backend, on_result=None):
+    """Execute all queries on the backend, calling on_result as each one completes.
+
+    on_result runs on the event loop (chart building, for the dashboard) while
+    the other queries continue on their threads. The wall time stops when the
+    last query returns, so it excludes that work and compares with the
+    query times alone.
+
+    Returns (results by name, query wall time in seconds).
+    """
+    results = {}
+    start = time.perf_counter()
+
+    async for result in iter_query_results(queries, backend):
+        results[result.name] = result
+        if on_result is not None:
+            on_result(result)
+
+    last_finished = max((result.finished for result in results.values()), default=start)
+    return results, last_finished - start
+
+
+def print_timing_report(results, wall_time):
+    """Compare the concurrent wall time against running the queries back to back."""
+    sequential_time = sum(result.elapsed for result in results.values())
+
+    print("\n" + "=" * 60)
+    print("DASHBOARD QUERY TIMING")
+    print("=" * 60)
+    for result in sorted(results.values(), key=lambda r: r.elapsed, reverse=True):
+        print(f"{result.name:<12} {result.elapsed:8.3f}s  {len(result.data):>12,} rows")
+    print("-" * 60)
+    print(f"Sum of query times: {sequential_time:.3f}s")
+    print(f"Query wall time:    {wall_time:.3f}s")
+    if wall_time > 0:
+        print(f"Speedup:            {sequential_time / wall_time:.2f}x")
@@ -0,0 +1,186 @@
+"""Pluggable query backends: the dockerized Postgres or DuckDB over exported Parquet.
+
+The backend is chosen per run with the DASHBOARD_BACKEND environment variable
+(or a script's --backend flag). Both run the same SQL from common/queries.py.
+"""
+
+import os
+import re
+import shutil
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from common.db import get_db_engine, load_environment
+from common.query_log import log_query
+
+BACKENDS = ("postgres", "duckdb")
+DEFAULT_BACKEND = "postgres"
+EXPORT_CHUNK_SIZE = 1_000_000
+
+CUSTOMERS_EXPORT_QUERY = """
+SELECT
+    event_time,
+    event_type,
+    product_id,
+    price,
+    user_id,
+    user_session::text as user_session,
+    to_char(event_time, 'YYYY-MM') as event_month
+FROM customers
+"""
+
+ITEMS_EXPORT_QUERY = "SELECT product_id, category_id, category_code, brand FROM items"
+
+# Queries bind parameters as %(name)s, psycopg2's style; DuckDB spells them $name
+NAMED_PARAMETER = re.compile(r"%\((\w+)\)s")
+
+
+def get_parquet_path():
+    """Directory holding the Parquet export, next to the raw CSV data by default."""
+    load_environment()
+    configured = os.getenv("PARQUET_PATH")
+    if configured:
+        return Path(configured).expanduser()
+    return Path(os.getenv("DATA_PATH", "~/goinfre/data")).expanduser() / "parquet"
+
+
+def get_backend_name(name=None):
+    """Resolve the backend from an explicit name or the DASHBOARD_BACKEND variable."""
+    load_environment()
+    name = (name or os.getenv("DASHBOARD_BACKEND", DEFAULT_BACKEND)).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend '{name}', expected one of {BACKENDS}")
+    return name
+
+
+class PostgresBackend:
+    """Runs queries on the dockerized PostgreSQL warehouse through SQLAlchemy."""
+
+    name = "postgres"
+
+    def __init__(self, **engine_options):
+        self.engine = get_db_engine(**engine_options)
+
+    def read_query(self, query, params=None):
+        import pandas as pd
+
+        return pd.read_sql_query(query, self.engine, params=params)
+
+    def close(self):
+        self.engine.dispose()
+
+
+class DuckDBBackend:
+    """Runs queries in-process with DuckDB over the partitioned Parquet export."""
+
+    name = "duckdb"
+
+    def __init__(self, parquet_path=None):
+        try:
+            import duckdb
+        except ImportError as e:
+            raise ImportError(
+                "The duckdb backend needs the 'columnar' extra: uv sync --extra columnar"
+            ) from e
+
+        self.parquet_path = Path(parquet_path or get_parquet_path())
+        customers_glob = self.parquet_path / "customers" / "**" / "*.parquet"
+        items_glob = self.parquet_path / "items" / "*.parquet"
+        if not (self.parquet_path / "customers").exists():
+            raise FileNotFoundError(
+                f"No Parquet export found in {self.parquet_path}; run module_02/export_parquet.py first"
+            )
+
+        self.connection = duckdb.connect()
+        self.connection.execute(
+            f"CREATE VIEW customers AS SELECT * FROM read_parquet('{customers_glob}', hive_partitioning = true)"
+        )
+        if (self.parquet_path / "items").exists():
+            self.connection.execute(
+                f"CREATE VIEW items AS SELECT * FROM read_parquet('{items_glob}')"
+            )
+
+    def read_query(self, query, params=None):
+        if params:
+            query = NAMED_PARAMETER.sub(r"$\1", query)
+        # A cursor is an independent connection to the same database, so
+        # concurrent callers (see async_queries) do not share statement state
+        cursor = self.connection.cursor()
+        start = time.perf_counter()
+        try:
+            table = cursor.execute(query, params).fetch_arrow_table()
+        finally:
+            cursor.close()
+        # SQLAlchemy events only see Postgres, so DuckDB queries are logged here
+        log_query(query, time.perf_counter() - start, table.num_rows, table.nbytes, self.name)
+        # split_blocks/self_destruct let numeric columns without nulls be handed
+        # to pandas without an extra copy of the Arrow buffers
+        return table.to_pandas(split_blocks=True, self_destruct=True)
+
+    def close(self):
+        self.connection.close()
+
+
+def create_backend(name=None, **options):
+    """Instantiate the selected backend; options go to the backend constructor."""
+    name = get_backend_name(name)
+    if name == "duckdb":
+        return DuckDBBackend(options.get("parquet_path"))
+    options.pop("parquet_path", None)
+    return PostgresBackend(**options)
+
+
+@contextmanager
+def open_backend(name=None, **options):
+    """Context manager that closes the backend's connections on exit."""
+    backend = create_backend(name, **options)
+    try:
+        yield backend
+    finally:
+        backend.close()
+
+
+def export_to_parquet(parquet_path=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Copy customers (partitioned by month) and items from Postgres into Parquet.
+
+    Rows are streamed with a server-side cursor so the export never holds more
+    than one chunk in memory. Returns the number of customer rows written.
+    """
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    parquet_path = Path(parquet_path or get_parquet_path())
+    customers_path = parquet_path / "customers"
+    items_path = parquet_path / "items"
+    for path in (customers_path, items_path):
+        if path.exists():
+            shutil.rmtree(path)
+    items_path.mkdir(parents=True)
+
+    engine = get_db_engine()
+    written = 0
+    try:
+        with engine.connect().execution_options(stream_results=True) as connection:
+            chunks = pd.read_sql_query(CUSTOMERS_EXPORT_QUERY, connection, chunksize=chunk_size)
+            for index, chunk in enumerate(chunks):
+                pq.write_to_dataset(
+                    pa.Table.from_pandas(chunk, preserve_index=False),
+                    root_path=customers_path,
+                    partition_cols=["event_month"],
+                    basename_template=f"part-{index:05d}-{{i}}.parquet",
+                )
+                written += len(chunk)
+                print(f"\r  {written:,} customer rows exported", end="", flush=True)
+            print()
+
+            items = pd.read_sql_query(ITEMS_EXPORT_QUERY, connection)
+            pq.write_table(
+                pa.Table.from_pandas(items, preserve_index=False),
+                items_path / "items.parquet",
+            )
+    finally:
+        engine.dispose()
+
+    return written
@@ -0,0 +1,250 @@
+"""Cluster-quality metrics that scale to the full customer base.
+
+Exact silhouette needs every pairwise distance, O(n^2) in time and memory. Here
+it is computed on a stratified sample, with the distance matrix built in row
+chunks. Calinski-Harabasz and Davies-Bouldin only need centroids and per-cluster
+dispersion, so they are computed exactly in chunked passes over all rows.
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from common.feature_store import open_feature_matrix
+
+DEFAULT_SAMPLE_SIZE = 10_000
+DEFAULT_CHUNK_SIZE = 512
+MIN_SAMPLES_PER_CLUSTER = 2
+# The elbow's k is kept while its silhouette is within this share of the best one
+SILHOUETTE_TOLERANCE = 0.85
+
+
+@dataclass
+class ClusterScores:
+    k: int
+    inertia: float
+    silhouette: float
+    calinski_harabasz: float
+    davies_bouldin: float
+
+
+def stratified_sample(labels, sample_size=DEFAULT_SAMPLE_SIZE, random_state=42):
+    """Row indices sampled from every cluster in proportion to its size.
+
+    Each cluster keeps at least MIN_SAMPLES_PER_CLUSTER rows (when it has them),
+    so small clusters still contribute to the silhouette.
+    """
+    labels = np.asarray(labels)
+    if len(labels) <= sample_size:
+        return np.arange(len(labels))
+
+    rng = np.random.default_rng(random_state)
+    clusters, counts = np.unique(labels, return_counts=True)
+    quotas = np.maximum(np.round(counts * sample_size / len(labels)).astype(np.int64), MIN_SAMPLES_PER_CLUSTER)
+    quotas = np.minimum(quotas, counts)
+
+    samples = [
+        rng.choice(np.flatnonzero(labels == cluster), size=quota, replace=False)
+        for cluster, quota in zip(clusters, quotas)
+    ]
+    return np.sort(np.concatenate(samples))
+
+
+def sampled_silhouette(features, labels, sample_size=DEFAULT_SAMPLE_SIZE,
+                       chunk_size=DEFAULT_CHUNK_SIZE, random_state=42):
+    """Mean silhouette of a stratified sample, using chunk_size x sample distance blocks."""
+    labels = np.asarray(labels)
+    clusters, codes = np.unique(labels, return_inverse=True)
+    if not 2 <= len(clusters) < len(labels):
+        return math.nan
+
+    sample = stratified_sample(codes, sample_size, random_state)
+    points, point_codes = np.asarray(features[sample], dtype=np.float64), codes[sample]
+    # One-hot membership turns per-cluster distance sums into one matrix product
+    membership = np.zeros((len(points), len(clusters)))
+    membership[np.arange(len(points)), point_codes] = 1.0
+    cluster_sizes = membership.sum(axis=0)
+    squared_norms = (points**2).sum(axis=1)
+
+    scores = np.empty(len(points))
+    for start in range(0, len(points), chunk_size):
+        stop = min(start + chunk_size, len(points))
+        chunk = points[start:stop]
+        distances = squared_norms[start:stop, None] - 2.0 * chunk @ points.T + squared_norms[None, :]
+        distances = np.sqrt(np.maximum(distances, 0.0))
+        sums = distances @ membership
+
+        own = point_codes[start:stop]
+        rows = np.arange(stop - start)
+        own_sizes = cluster_sizes[own] - 1
+        with np.errstate(divide="ignore", invalid="ignore"):
+            intra = sums[rows, own] / own_sizes
+            means = sums / cluster_sizes
+        means[rows, own] = np.inf
+        nearest = means.min(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Points alone in their cluster score 0, as in sklearn
+            scores[start:stop] = np.where(
+                own_sizes > 0, (nearest - intra) / np.maximum(intra, nearest), 0.0
+            )
+    return float(np.nanmean(scores))
+
+
+def _cluster_dispersion(features, codes, n_clusters, chunk_size):
+    """Counts, centroids and per-cluster sums of squared and plain distances to the centroid."""
+    n_features = features.shape[1]
+    counts = np.bincount(codes, minlength=n_clusters).astype(np.float64)
+    sums = np.zeros((n_clusters, n_features))
+    for start in range(0, len(features), chunk_size):
+        chunk_codes = codes[start : start + chunk_size]
+        for column in range(n_features):
+            sums[:, column] += np.bincount(
+                chunk_codes, weights=features[start : start + chunk_size, column], minlength=n_clusters
+            )
+    centroids = sums / counts[:, None]
+
+    squared = np.zeros(n_clusters)
+    plain = np.zeros(n_clusters)
+    for start in range(0, len(features), chunk_size):
+        chunk_codes = codes[start : start + chunk_size]
+        # Chunks are promoted to float64 one at a time, so float32 inputs are never copied whole
+        offsets = features[start : start + chunk_size] - centroids[chunk_codes]
+        row_squared = (offsets**2).sum(axis=1)
+        squared += np.bincount(chunk_codes, weights=row_squared, minlength=n_clusters)
+        plain += np.bincount(chunk_codes, weights=np.sqrt(row_squared), minlength=n_clusters)
+    return counts, centroids, squared, plain
+
+
+def dispersion_scores(features, labels, chunk_size=100_000):
+    """Exact (Calinski-Harabasz, Davies-Bouldin) from chunked passes over all rows."""
+    clusters, codes = np.unique(np.asarray(labels), return_inverse=True)
+    n_clusters = len(clusters)
+    if not 2 <= n_clusters < len(features):
+        return math.nan, math.nan
+
+    counts, centroids, within_squared, within_plain = _cluster_dispersion(
+        features, codes, n_clusters, chunk_size
+    )
+    overall_mean = (centroids * counts[:, None]).sum(axis=0) / counts.sum()
+    between = (counts * ((centroids - overall_mean) ** 2).sum(axis=1)).sum()
+    within = within_squared.sum()
+    calinski_harabasz = (
+        1.0 if within == 0 else between * (len(features) - n_clusters) / (within * (n_clusters - 1))
+    )
+
+    spread = within_plain / counts
+    centroid_distances = np.sqrt(((centroids[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2))
+    if np.allclose(spread, 0) or np.allclose(centroid_distances, 0):
+        return float(calinski_harabasz), 0.0
+    # Coinciding centroids (and the diagonal) drop out of the max, as in sklearn
+    centroid_distances[centroid_distances == 0] = np.inf
+    ratios = (spread[:, None] + spread[None, :]) / centroid_distances
+    davies_bouldin = float(ratios.max(axis=1).mean())
+    return float(calinski_harabasz), davies_bouldin
+
+
+def evaluate_clustering(features, labels, inertia=math.nan, sample_size=DEFAULT_SAMPLE_SIZE, random_state=42):
+    """All quality scores for one labelling of the features."""
+    calinski_harabasz, davies_bouldin = dispersion_scores(features, labels)
+    return ClusterScores(
+        k=len(np.unique(labels)),
+        inertia=float(inertia),
+        silhouette=sampled_silhouette(features, labels, sample_size, random_state=random_state),
+        calinski_harabasz=calinski_harabasz,
+        davies_bouldin=davies_bouldin,
+    )
+
+
+def _fit_and_score(features, k, sample_size, random_state):
+    from sklearn.cluster import KMeans
+
+    kmeans = KMeans(n_clusters=k, random_state=random_state, n_init=10)
+    labels = kmeans.fit_predict(features)
+    scores = evaluate_clustering(features, labels, kmeans.inertia_, sample_size, random_state)
+    scores.k = k
+    return scores
+
+
+def evaluate_k_range(features, k_values, sample_size=DEFAULT_SAMPLE_SIZE, n_jobs=None, random_state=42):
+    """Fit KMeans for every k and score it, several k at a time.
+
+    The k values run on worker threads that share the one feature matrix, so
+    memory grows by a label vector and a few chunk-sized buffers per worker
+    rather than by a copy of the data. KMeans and NumPy release the GIL, and
+    their native thread pools are shrunk so the workers do not oversubscribe
+    the CPUs.
+    """
+    from threadpoolctl import threadpool_limits
+
+    features = np.asarray(features)
+    k_values = list(k_values)
+    cpus = os.cpu_count() or 1
+    n_jobs = max(1, min(n_jobs or cpus, len(k_values)))
+
+    with threadpool_limits(limits=max(1, cpus // n_jobs)):
+        with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+            return list(
+                executor.map(lambda k: _fit_and_score(features, k, sample_size, random_state), k_values)
+            )
+
+
+def _limit_native_threads(limit):
+    from threadpoolctl import threadpool_limits
+
+    threadpool_limits(limits=limit)
+
+
+def _score_stored_k(path, k, sample_size, random_state):
+    features, _ = open_feature_matrix(path)
+    return _fit_and_score(features, k, sample_size, random_state)
+
+
+def evaluate_k_range_stored(path, k_values, sample_size=DEFAULT_SAMPLE_SIZE, n_jobs=None, random_state=42):
+    """Like evaluate_k_range, but on worker processes that map a feature store file.
+
+    Each worker attaches to the memory-mapped matrix by path, so nothing but
+    the path and the scores crosses the process boundary, and the matrix pages
+    are shared through the page cache rather than copied per worker.
+    """
+    k_values = list(k_values)
+    cpus = os.cpu_count() or 1
+    n_jobs = max(1, min(n_jobs or cpus, len(k_values)))
+    path = str(path)
+
+    with ProcessPoolExecutor(
+        max_workers=n_jobs, initializer=_limit_native_threads, initargs=(max(1, cpus // n_jobs),)
+    ) as executor:
+        futures = [
+            executor.submit(_score_stored_k, path, k, sample_size, random_state) for k in k_values
+        ]
+        return [future.result() for future in futures]
+
+
+def choose_k(scores, elbow_k=None, tolerance=SILHOUETTE_TOLERANCE):
+    """Pick k from the elbow, overruled when its silhouette is clearly worse than the best.
+
+    Without an elbow suggestion the k with the best silhouette wins, with
+    Davies-Bouldin (lower is better) breaking ties.
+    """
+    candidates = [score for score in scores if not math.isnan(score.silhouette)]
+    if not candidates:
+        return elbow_k
+    best = max(candidates, key=lambda score: (score.silhouette, -score.davies_bouldin))
+    if elbow_k is not None:
+        elbow = next((score for score in candidates if score.k == elbow_k), None)
+        if elbow is not None and elbow.silhouette >= tolerance * best.silhouette:
+            return elbow_k
+    return best.k
+
+
+def print_scores_table(scores, chosen_k=None):
+    print(f"{'k':>4}{'inertia':>14}{'silhouette':>12}{'Calinski-H':>14}{'Davies-B':>11}")
+    for score in scores:
+        marker = "  <-" if score.k == chosen_k else ""
+        print(
+            f"{score.k:>4}{score.inertia:>14,.1f}{score.silhouette:>12.3f}"
+            f"{score.calinski_harabasz:>14,.1f}{score.davies_bouldin:>11.3f}{marker}"
+        )
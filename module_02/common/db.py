@@ -0,0 +1,40 @@
+"""Database configuration shared by the module_02 scripts."""
+
+import functools
+import os
+from pathlib import Path
+
+ENV_PATH = Path(__file__).resolve().parent.parent.parent / ".env"
+
+
+@functools.cache
+def load_environment():
+    """Load the repository .env once, the first time a setting is needed."""
+    from dotenv import load_dotenv
+
+    load_dotenv(ENV_PATH)
+
+
+def get_connection_string():
+    """Build the PostgreSQL connection string from environment variables."""
+    load_environment()
+    db_host = os.getenv("POSTGRES_HOST", "localhost")
+    db_port = os.getenv("POSTGRES_PORT", "5432")
+    db_name = os.getenv("POSTGRES_DB")
+    db_user = os.getenv("POSTGRES_USER")
+    db_password = os.getenv("POSTGRES_PASSWORD")
+
+    if not all([db_name, db_user, db_password]):
+        raise ValueError("Missing required database credentials")
+
+    return f"postgresql+psycopg2://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
+
+
+def get_db_engine(**engine_options):
+    """Establish PostgreSQL database engine using environment variables."""
+    from sqlalchemy import create_engine
+
+    from common.query_log import instrument_engine, logging_enabled
+
+    engine = create_engine(get_connection_string(), **engine_options)
+    return instrument_engine(engine) if logging_enabled() else engine
@@ -0,0 +1,42 @@
+"""Load module_02 exercise scripts as modules so their functions can be reused."""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+MODULE_ROOT = Path(__file__).resolve().parent.parent
+
+EXERCISES = {
+    "pie": "ex00/pie.py",
+    "chart": "ex01/chart.py",
+    "mustache": "ex02/mustache.py",
+    "building": "ex03/Building.py",
+    "elbow": "ex04/elbow.py",
+    "clustering": "ex05/Clustering.py",
+}
+
+
+def load_exercise(name):
+    """Import an exercise script by its short name, caching it in sys.modules."""
+    if name not in EXERCISES:
+        raise ValueError(f"Unknown exercise '{name}', expected one of {list(EXERCISES)}")
+
+    module_name = f"module_02_{name}"
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+
+    script_path = MODULE_ROOT / EXERCISES[name]
+    # Exercise scripts import their sibling helpers (e.g. projection.py) by plain name
+    exercise_dir = str(script_path.parent)
+    if exercise_dir not in sys.path:
+        sys.path.insert(0, exercise_dir)
+
+    spec = importlib.util.spec_from_file_location(module_name, script_path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except Exception:
+        del sys.modules[module_name]
+        raise
+    return module
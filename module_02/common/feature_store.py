@@ -0,0 +1,110 @@
+"""Memory-mapped store for scaled feature matrices shared between processes.
+
+A store file is a fixed-size JSON header followed by the raw float32 matrix in
+C order. Worker processes open it with np.memmap and share the parent's pages
+through the OS page cache instead of receiving a pickled copy. The header
+records the source watermark the matrix was built from, so later runs can reuse
+the file rather than re-extracting and re-scaling.
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+MAGIC = "module02-features"
+FORMAT_VERSION = 1
+HEADER_SIZE = 4096
+DTYPE = np.float32
+
+
+@dataclass
+class FeatureMatrixInfo:
+    shape: tuple
+    columns: list
+    watermark: str
+    metadata: dict = field(default_factory=dict)
+
+
+def _read_header(file):
+    raw = file.read(HEADER_SIZE)
+    try:
+        header = json.loads(raw.rstrip(b"\0"))
+    except ValueError as e:
+        raise ValueError(f"{file.name} is not a feature store file") from e
+    if header.get("magic") != MAGIC or header.get("version") != FORMAT_VERSION:
+        raise ValueError(f"{file.name} is not a version {FORMAT_VERSION} feature store file")
+    return header
+
+
+def read_info(path):
+    """Header of a store file, without touching the matrix."""
+    with open(path, "rb") as file:
+        header = _read_header(file)
+    return FeatureMatrixInfo(tuple(header["shape"]), header["columns"], header["watermark"], header["metadata"])
+
+
+def write_feature_matrix(path, matrix, columns, watermark, metadata=None):
+    """Write the matrix as float32 behind a header; replaces the file atomically."""
+    path = Path(path)
+    matrix = np.ascontiguousarray(matrix, dtype=DTYPE)
+    if matrix.ndim != 2 or matrix.shape[1] != len(columns):
+        raise ValueError(f"Expected a 2D matrix with {len(columns)} columns, got shape {matrix.shape}")
+
+    header = json.dumps(
+        {
+            "magic": MAGIC,
+            "version": FORMAT_VERSION,
+            "dtype": np.dtype(DTYPE).str,
+            "shape": list(matrix.shape),
+            "columns": list(columns),
+            "watermark": str(watermark),
+            "metadata": metadata or {},
+        }
+    ).encode()
+    if len(header) > HEADER_SIZE:
+        raise ValueError(f"Feature store header exceeds {HEADER_SIZE} bytes")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(partial, "wb") as file:
+            file.write(header.ljust(HEADER_SIZE, b"\0"))
+            file.write(memoryview(matrix).cast("B"))
+        # Readers that already mapped the old file keep their pages; new readers see the new one
+        os.replace(partial, path)
+    finally:
+        partial.unlink(missing_ok=True)
+    return read_info(path)
+
+
+def open_feature_matrix(path):
+    """Map a store file read-only; returns (matrix, info) without reading the data."""
+    info = read_info(path)
+    if info.shape[0] == 0:
+        return np.zeros(info.shape, dtype=DTYPE), info
+    matrix = np.memmap(path, dtype=DTYPE, mode="r", offset=HEADER_SIZE, shape=info.shape)
+    return matrix, info
+
+
+def load_or_build(path, watermark, build):
+    """Map the stored matrix if it was built from the same watermark, else rebuild it.
+
+    build() must return (matrix, columns, metadata). Returns (matrix, info, reused).
+    """
+    path = Path(path)
+    if path.exists():
+        try:
+            info = read_info(path)
+        except ValueError:
+            info = None
+        if info is not None and info.watermark == str(watermark):
+            matrix, info = open_feature_matrix(path)
+            return matrix, info, True
+
+    matrix, columns, metadata = build()
+    write_feature_matrix(path, matrix, columns, watermark, metadata)
+    matrix, info = open_feature_matrix(path)
+    return matrix, info, False
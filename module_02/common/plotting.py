@@ -0,0 +1,50 @@
+"""Lazy matplotlib setup shared by the module_02 scripts.
+
+Importing pyplot and probing the GUI backends is a large part of a script's
+startup, so it only happens the first time a chart is actually drawn.
+"""
+
+import os
+import sys
+
+GUI_BACKENDS = ("TkAgg", "Qt5Agg")
+
+_pyplot = None
+
+
+def _use_first_available(matplotlib, backends):
+    for backend in backends:
+        try:
+            matplotlib.use(backend)
+            return True
+        except ImportError:
+            continue
+    return False
+
+
+def get_pyplot(preferred_backends=GUI_BACKENDS):
+    """Select the first available GUI backend (falling back to Agg) and return pyplot.
+
+    An explicit MPLBACKEND (e.g. Agg for headless runs) skips the probing.
+    """
+    global _pyplot
+    if _pyplot is not None:
+        return _pyplot
+
+    import matplotlib
+
+    if not os.getenv("MPLBACKEND") and not _use_first_available(matplotlib, preferred_backends):
+        print("Warning: No GUI backend available. Using non-interactive 'Agg' backend.", file=sys.stderr)
+        matplotlib.use("Agg")
+
+    import matplotlib.pyplot as plt
+
+    plt.ion()
+    _pyplot = plt
+    return _pyplot
+
+
+def close_all_figures():
+    """Close every open figure, without importing pyplot if nothing was drawn."""
+    if _pyplot is not None:
+        _pyplot.close("all")
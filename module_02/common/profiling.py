@@ -0,0 +1,231 @@
+"""Per-stage timing, cProfile and tracemalloc instrumentation for the module_02 scripts.
+
+Scripts mark their stages with ``stage("extract")`` blocks or the ``@profiled``
+decorator. Both cost nothing unless the run was started with ``--profile`` (or
+MODULE02_PROFILE=1), in which case ``profile_run`` writes a JSON report, one
+.prof file per stage and a folded-stack file ready for flamegraph.pl/speedscope.
+"""
+
+import functools
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+PROFILE_FLAG = "--profile"
+PROFILE_DIR = Path(__file__).resolve().parent.parent / "profiles"
+TOP_FUNCTIONS = 15
+
+_active_profiler = None
+
+
+class StageRecord:
+    """Accumulated measurements for every execution of one named stage."""
+
+    def __init__(self, name):
+        # Profiling modules are imported only once a profiled run creates a stage
+        import cProfile
+
+        self.name = name
+        self.calls = 0
+        self.wall_time = 0.0
+        self.peak_memory = 0
+        self.profile = cProfile.Profile()
+        self.profiled = False
+
+
+class _OpenStage:
+    def __init__(self, record, start_memory, owns_profile):
+        self.record = record
+        self.start_memory = start_memory
+        self.owns_profile = owns_profile
+        self.peak = 0
+
+
+class Profiler:
+    """Collects stage records for one script run."""
+
+    def __init__(self, script_name):
+        self.script_name = script_name
+        self.stages = {}
+        self._stack = []
+        self.started_at = datetime.now()
+
+    def start(self):
+        tracemalloc.start()
+
+    def stop(self):
+        tracemalloc.stop()
+
+    @contextmanager
+    def stage(self, name):
+        record = self.stages.setdefault(name, StageRecord(name))
+
+        current, peak = tracemalloc.get_traced_memory()
+        if self._stack:
+            self._stack[-1].peak = max(self._stack[-1].peak, peak)
+        tracemalloc.reset_peak()
+
+        # Only one cProfile can be active at a time, so nested stages are
+        # attributed to their outermost stage's profile
+        owns_profile = not any(open_stage.owns_profile for open_stage in self._stack)
+        open_stage = _OpenStage(record, current, owns_profile)
+        self._stack.append(open_stage)
+
+        if owns_profile:
+            record.profile.enable()
+            record.profiled = True
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            elapsed = time.perf_counter() - start
+            if owns_profile:
+                record.profile.disable()
+
+            self._stack.pop()
+            _, peak = tracemalloc.get_traced_memory()
+            open_stage.peak = max(open_stage.peak, peak)
+            tracemalloc.reset_peak()
+            if self._stack:
+                self._stack[-1].peak = max(self._stack[-1].peak, open_stage.peak)
+
+            record.calls += 1
+            record.wall_time += elapsed
+            record.peak_memory = max(record.peak_memory, open_stage.peak - open_stage.start_memory)
+
+    def _top_functions(self, record):
+        if not record.profiled:
+            return []
+        import pstats
+
+        stats = pstats.Stats(record.profile)
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+        return [
+            {
+                "function": f"{Path(filename).name}:{line}({function})",
+                "calls": call_count,
+                "own_time": own_time,
+                "cumulative_time": cumulative_time,
+            }
+            for (filename, line, function), (_, call_count, own_time, cumulative_time, _) in rows[:TOP_FUNCTIONS]
+        ]
+
+    def to_dict(self):
+        return {
+            "script": self.script_name,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "stages": [
+                {
+                    "name": record.name,
+                    "calls": record.calls,
+                    "wall_time": record.wall_time,
+                    "peak_memory_mb": record.peak_memory / (1024 * 1024),
+                    "top_functions": self._top_functions(record),
+                }
+                for record in self.stages.values()
+            ],
+        }
+
+    def folded_stacks(self):
+        """Yield 'script;stage;function microseconds' lines from each stage's own-time profile."""
+        for record in self.stages.values():
+            if not record.profiled:
+                continue
+            import pstats
+
+            stats = pstats.Stats(record.profile)
+            for (filename, line, function), (_, _, own_time, _, _) in stats.stats.items():
+                microseconds = int(own_time * 1_000_000)
+                if microseconds > 0:
+                    frame = f"{Path(filename).name}:{function}:{line}".replace(";", ",").replace(" ", "_")
+                    yield f"{self.script_name};{record.name};{frame} {microseconds}"
+
+    def write_report(self, output_dir=None):
+        """Write report.json, stacks.folded and <stage>.prof files; returns the directory."""
+        import json
+
+        timestamp = self.started_at.strftime("%Y%m%d-%H%M%S")
+        output_dir = Path(output_dir or PROFILE_DIR / f"{self.script_name}-{timestamp}")
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        (output_dir / "report.json").write_text(json.dumps(self.to_dict(), indent=2))
+        (output_dir / "stacks.folded").write_text("\n".join(self.folded_stacks()) + "\n")
+        for record in self.stages.values():
+            if record.profiled:
+                record.profile.dump_stats(output_dir / f"{record.name}.prof")
+        return output_dir
+
+    def print_summary(self):
+        total = sum(record.wall_time for record in self.stages.values()) or 1.0
+        print("\n" + "=" * 60)
+        print(f"PROFILE: {self.script_name}")
+        print("=" * 60)
+        print(f"{'stage':<22}{'calls':>6}{'time':>11}{'share':>8}{'peak mem':>12}")
+        for record in sorted(self.stages.values(), key=lambda r: r.wall_time, reverse=True):
+            print(
+                f"{record.name:<22}{record.calls:>6}{record.wall_time:>10.3f}s"
+                f"{record.wall_time / total:>8.1%}{record.peak_memory / (1024 * 1024):>9.1f} MB"
+            )
+
+
+def profiling_requested():
+    return PROFILE_FLAG in sys.argv or os.getenv("MODULE02_PROFILE") == "1"
+
+
+def get_profiler():
+    """Return the profiler of the current run, or None when profiling is off."""
+    return _active_profiler
+
+
+@contextmanager
+def stage(name):
+    """Mark a named pipeline stage (extract, feature_engineering, scale, fit, project, render)."""
+    if _active_profiler is None:
+        yield None
+        return
+    with _active_profiler.stage(name) as record:
+        yield record
+
+
+def profiled(name):
+    """Decorator form of stage() for functions that are a whole stage."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def profile_run(script_name, enabled=None):
+    """Activate profiling for the enclosed run when requested and report at the end."""
+    global _active_profiler
+
+    if enabled is None:
+        enabled = profiling_requested()
+    if not enabled:
+        yield None
+        return
+
+    if PROFILE_FLAG in sys.argv:
+        sys.argv.remove(PROFILE_FLAG)
+
+    _active_profiler = Profiler(script_name)
+    _active_profiler.start()
+    try:
+        yield _active_profiler
+    finally:
+        profiler, _active_profiler = _active_profiler, None
+        profiler.stop()
+        profiler.print_summary()
+        output_dir = profiler.write_report()
+        print(f"Profile written to {output_dir}")
@@ -0,0 +1,107 @@
+"""SQL used by the module_02 dashboard scripts, kept in one place so they can be batched."""
+
+EVENT_COUNTS_QUERY = """
+SELECT
+    COALESCE(event_type, 'unknown') as action,
+    COUNT(*) as count
+FROM customers
+GROUP BY event_type
+ORDER BY count DESC;
+"""
+
+PURCHASES_WINDOW_QUERY = """
+SELECT event_time, price, user_id
+FROM customers
+WHERE event_type = 'purchase'
+    AND event_time >= '2022-10-01'
+    AND event_time < '2023-02-28'
+"""
+
+PURCHASE_PRICES_QUERY = """
+SELECT price, user_id
+FROM customers
+WHERE event_type = 'purchase'
+    AND price IS NOT NULL
+ORDER BY price;
+"""
+
+ORDER_DATA_QUERY = """
+SELECT user_id, price
+FROM customers
+WHERE event_type = 'purchase'
+    AND price IS NOT NULL
+    AND price > 0
+"""
+
+CUSTOMER_PURCHASES_QUERY = """
+SELECT user_id, price
+FROM customers
+WHERE event_type = 'purchase'
+    AND price IS NOT NULL
+"""
+
+# Changes whenever a purchase is added to (or removed from) CUSTOMER_PURCHASES_QUERY's rows
+PURCHASES_WATERMARK_QUERY = """
+SELECT MAX(event_time) as last_event_time, COUNT(*) as purchase_count
+FROM customers
+WHERE event_type = 'purchase'
+    AND price IS NOT NULL
+"""
+
+CUSTOMER_FEATURES_QUERY = """
+SELECT
+    user_id as customer_id,
+    COUNT(*) as total_purchases,
+    SUM(price) as total_spent,
+    AVG(price) as avg_purchase_value,
+    MIN(event_time::date) as first_purchase_date,
+    MAX(event_time::date) as last_purchase_date,
+    (MAX(event_time::date) - MIN(event_time::date)) + 1 as customer_lifespan_days,
+    COUNT(DISTINCT event_time::date) as active_days,
+    (CURRENT_DATE - MAX(event_time::date)) as days_since_last_purchase,
+    MAX(event_time) as last_event_time
+FROM customers
+WHERE price IS NOT NULL AND price > 0 AND event_type = 'purchase'
+GROUP BY user_id
+HAVING COUNT(*) > 0
+ORDER BY SUM(price) DESC;
+"""
+
+# Same features for customers with purchases after the watermark only, plus their
+# values as of the watermark so the threshold distributions can be updated.
+# The watermark is bound as the %(watermark)s parameter (see read_query).
+CHANGED_CUSTOMER_FEATURES_QUERY = """
+WITH changed AS (
+    SELECT DISTINCT user_id
+    FROM customers
+    WHERE price IS NOT NULL AND price > 0 AND event_type = 'purchase'
+      AND event_time > CAST(%(watermark)s AS TIMESTAMPTZ)
+)
+SELECT
+    user_id as customer_id,
+    COUNT(*) as total_purchases,
+    SUM(price) as total_spent,
+    AVG(price) as avg_purchase_value,
+    MIN(event_time::date) as first_purchase_date,
+    MAX(event_time::date) as last_purchase_date,
+    (MAX(event_time::date) - MIN(event_time::date)) + 1 as customer_lifespan_days,
+    COUNT(DISTINCT event_time::date) as active_days,
+    (CURRENT_DATE - MAX(event_time::date)) as days_since_last_purchase,
+    MAX(event_time) as last_event_time,
+    COUNT(*) FILTER (WHERE event_time <= CAST(%(watermark)s AS TIMESTAMPTZ)) as previous_purchases,
+    SUM(price) FILTER (WHERE event_time <= CAST(%(watermark)s AS TIMESTAMPTZ)) as previous_spent,
+    MAX(event_time::date) FILTER (WHERE event_time <= CAST(%(watermark)s AS TIMESTAMPTZ)) as previous_last_purchase_date
+FROM customers
+JOIN changed USING (user_id)
+WHERE price IS NOT NULL AND price > 0 AND event_type = 'purchase'
+GROUP BY user_id;
+"""
+
+DASHBOARD_QUERIES = {
+    "pie": EVENT_COUNTS_QUERY,
+    "chart": PURCHASES_WINDOW_QUERY,
+    "mustache": PURCHASE_PRICES_QUERY,
+    "building": ORDER_DATA_QUERY,
+    "elbow": CUSTOMER_PURCHASES_QUERY,
+    "clustering": CUSTOMER_FEATURES_QUERY,
+}
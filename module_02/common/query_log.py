@@ -0,0 +1,225 @@
+"""Per-query observability: latency, rows, payload size and plans, appended to a local log.
+
+Postgres queries are captured through SQLAlchemy's cursor execution events, so
+every engine from get_db_engine() is covered without changes to the callers.
+DuckDB results are logged by the backend itself. Logging is off unless
+MODULE02_QUERY_LOG=1; each query is then one JSON line in
+module_02/logs/queries.jsonl (MODULE02_QUERY_LOG_PATH overrides the path).
+query_report.py ranks them.
+
+Setting MODULE02_EXPLAIN_SLOW_MS makes SELECTs slower than that many
+milliseconds run once more under EXPLAIN (ANALYZE, BUFFERS). Each statement is
+explained at most once per process.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+import weakref
+from datetime import datetime, timezone
+from pathlib import Path
+
+from common.db import load_environment
+
+DEFAULT_LOG_PATH = Path(__file__).resolve().parent.parent / "logs" / "queries.jsonl"
+# Rows sampled from a result to estimate its payload size
+PAYLOAD_SAMPLE_ROWS = 100
+QUERY_PREVIEW_CHARS = 200
+# Statements SQLAlchemy issues on its own when a connection is first set up
+IGNORED_PREFIXES = ("select pg_catalog.version()", "select current_schema()", "show ")
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+_write_lock = threading.Lock()
+_explained = set()
+_instrumented_engines = weakref.WeakSet()
+
+
+def logging_enabled():
+    load_environment()
+    return os.getenv("MODULE02_QUERY_LOG") == "1"
+
+
+def get_log_path():
+    load_environment()
+    configured = os.getenv("MODULE02_QUERY_LOG_PATH")
+    return Path(configured).expanduser() if configured else DEFAULT_LOG_PATH
+
+
+def get_explain_threshold_ms():
+    """Latency above which SELECTs are explained, or None when plan capture is off."""
+    load_environment()
+    value = os.getenv("MODULE02_EXPLAIN_SLOW_MS")
+    return float(value) if value else None
+
+
+def normalize_query(statement):
+    """Collapse whitespace and replace literals, so runs with other values group together."""
+    statement = _WHITESPACE.sub(" ", statement).strip().rstrip(";").strip()
+    return _LITERALS.sub("?", statement)
+
+
+def query_hash(statement):
+    return hashlib.blake2b(normalize_query(statement).encode(), digest_size=8).hexdigest()
+
+
+def _script_name():
+    return Path(sys.argv[0]).stem if sys.argv and sys.argv[0] else "interactive"
+
+
+def write_record(record, path=None):
+    """Append one record to the log as a JSON line."""
+    path = path or get_log_path()
+    line = json.dumps(record, default=str)
+    with _write_lock:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as log:
+            log.write(line + "\n")
+
+
+def log_query(statement, latency, rows, payload_bytes, backend, plan=None):
+    """Record one executed query; latency is in seconds."""
+    if not logging_enabled():
+        return
+    record = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+        "script": _script_name(),
+        "backend": backend,
+        "query_hash": query_hash(statement),
+        "query": normalize_query(statement)[:QUERY_PREVIEW_CHARS],
+        "latency_ms": round(latency * 1000, 3),
+        "rows": rows,
+        "payload_bytes": payload_bytes,
+    }
+    if plan is not None:
+        record["plan"] = plan
+    write_record(record)
+
+
+def estimate_payload_bytes(cursor, rows):
+    """Approximate size of a client-side result from a sample of its rows.
+
+    psycopg2's default cursors hold the whole result after execute(), so a
+    sample can be read and the cursor scrolled back before the caller fetches.
+    Sizes are those of the values' text form, which is what Postgres sends.
+    """
+    if cursor.description is None:
+        return 0
+    # Without scroll() the sampled rows could not be handed back to the caller
+    if not rows or not hasattr(cursor, "scroll"):
+        return None
+    try:
+        sample = cursor.fetchmany(PAYLOAD_SAMPLE_ROWS)
+        cursor.scroll(0, mode="absolute")
+    except Exception:
+        return None
+    if not sample:
+        return 0
+    sample_bytes = sum(len(str(value)) for row in sample for value in row if value is not None)
+    return int(sample_bytes / len(sample) * rows)
+
+
+def _plan_summary(plan):
+    """Top-level timing and buffer counts from an EXPLAIN (FORMAT JSON) result."""
+    root = plan[0] if isinstance(plan, list) else plan
+    node = root.get("Plan", {})
+    return {
+        "execution_ms": root.get("Execution Time"),
+        "planning_ms": root.get("Planning Time"),
+        "node": node.get("Node Type"),
+        "shared_hit_blocks": node.get("Shared Hit Blocks"),
+        "shared_read_blocks": node.get("Shared Read Blocks"),
+        "temp_written_blocks": node.get("Temp Written Blocks"),
+        "plan": root,
+    }
+
+
+def explain_analyze(dbapi_connection, statement, parameters):
+    """Run a SELECT again under EXPLAIN (ANALYZE, BUFFERS) and return its plan summary.
+
+    The statement runs inside a savepoint that is always rolled back, so the
+    second execution leaves no side effects and a failing EXPLAIN does not
+    abort the caller's transaction.
+    """
+    with dbapi_connection.cursor() as cursor:
+        cursor.execute("SAVEPOINT query_log_explain")
+        try:
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", parameters or None)
+            plan = cursor.fetchone()[0]
+        finally:
+            cursor.execute("ROLLBACK TO SAVEPOINT query_log_explain")
+            cursor.execute("RELEASE SAVEPOINT query_log_explain")
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return _plan_summary(plan)
+
+
+def _is_select(statement):
+    head = statement.lstrip().lower()
+    return head.startswith("select") or head.startswith("with")
+
+
+def instrument_engine(engine):
+    """Log every statement the engine runs; returns the engine."""
+    from sqlalchemy import event
+
+    if engine in _instrumented_engines:
+        return engine
+    _instrumented_engines.add(engine)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_log_starts", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        latency = time.perf_counter() - conn.info["query_log_starts"].pop()
+        if statement.lstrip().lower().startswith(IGNORED_PREFIXES):
+            return
+
+        rows = cursor.rowcount if cursor.rowcount is not None and cursor.rowcount >= 0 else None
+        payload_bytes = estimate_payload_bytes(cursor, rows)
+
+        plan = None
+        threshold = get_explain_threshold_ms()
+        digest = query_hash(statement)
+        if (
+            threshold is not None
+            and latency * 1000 >= threshold
+            and _is_select(statement)
+            and digest not in _explained
+        ):
+            _explained.add(digest)
+            try:
+                plan = explain_analyze(conn.connection.dbapi_connection, statement, parameters)
+            except Exception as e:
+                plan = {"error": str(e)}
+
+        log_query(statement, latency, rows, payload_bytes, "postgres", plan)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        # A failed statement never reaches after_cursor_execute, so drop its start time here
+        starts = context.connection.info.get("query_log_starts") if context.connection else None
+        if starts:
+            starts.pop()
+
+    return engine
+
+
+def read_log(path=None):
+    """Yield the records of a query log, skipping lines that are not valid JSON."""
+    path = path or get_log_path()
+    if not path.exists():
+        return
+    with open(path, encoding="utf-8") as log:
+        for line in log:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
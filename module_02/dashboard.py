@@ -0,0 +1,110 @@
+"""Run every module_02 dashboard query concurrently and build the charts as results arrive."""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from common.async_queries import print_timing_report, run_queries_concurrently
+from common.backends import BACKENDS, open_backend
+from common.exercises import load_exercise
+from common.plotting import close_all_figures, get_pyplot
+from common.queries import DASHBOARD_QUERIES
+
+
+def build_pie(data):
+    return [load_exercise("pie").create_pie_chart(data)]
+
+
+def build_chart(data):
+    chart = load_exercise("chart")
+    data = chart.prepare_purchase_data(data)
+    return [
+        chart.chart1_customers_per_day(data),
+        chart.chart2_sales_by_month(data),
+        chart.chart3_avg_spend_per_day(data),
+    ]
+
+
+def build_mustache(data):
+    mustache = load_exercise("mustache")
+    mustache.calculate_statistics(data)
+    return [mustache.create_price_box_plot(data), mustache.create_basket_box_plot(data)]
+
+
+def build_building(data):
+    building = load_exercise("building")
+    return [building.create_frequency_chart(data), building.create_spending_chart(data)]
+
+
+def build_elbow(data):
+    elbow = load_exercise("elbow")
+    features_scaled, _ = elbow.prepare_clustering_features(data)
+    scores = elbow.evaluate_cluster_range(features_scaled)
+    _, optimal_k = elbow.suggest_clusters(scores)
+    print(f"Suggested optimal number of clusters: {optimal_k}")
+    return [
+        elbow.plot_elbow_method(
+            [score.k for score in scores], [score.inertia for score in scores], scores
+        )
+    ]
+
+
+def build_clustering(data):
+    clustering = load_exercise("clustering")
+    data = clustering.prepare_customer_features(data)
+    segmented_data, _, _ = clustering.create_customer_segments(data)
+    clustering.create_four_key_visualizations(segmented_data)
+    clustering.print_segment_analysis(segmented_data)
+    return []
+
+
+CHART_BUILDERS = {
+    "pie": build_pie,
+    "chart": build_chart,
+    "mustache": build_mustache,
+    "building": build_building,
+    "elbow": build_elbow,
+    "clustering": build_clustering,
+}
+
+
+def handle_result(result):
+    """Hand a finished query to its chart builder while the other queries keep running."""
+    print(f"✓ {result.name}: {len(result.data):,} rows in {result.elapsed:.3f}s")
+    if result.data.empty:
+        print(f"  No data for {result.name}, skipping charts.")
+        return
+    CHART_BUILDERS[result.name](result.data)
+
+
+def main():
+    """Main function to execute all dashboard queries concurrently."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--backend", choices=BACKENDS, help="overrides DASHBOARD_BACKEND")
+    args = parser.parse_args()
+
+    with open_backend(args.backend, pool_size=len(DASHBOARD_QUERIES), max_overflow=0) as backend:
+        print(f"Running {len(DASHBOARD_QUERIES)} dashboard queries concurrently on {backend.name}...")
+        results, wall_time = asyncio.run(
+            run_queries_concurrently(DASHBOARD_QUERIES, backend, on_result=handle_result)
+        )
+
+    print_timing_report(results, wall_time)
+
+    get_pyplot().show(block=False)
+    try:
+        input("Press Enter to exit...")
+    except (KeyboardInterrupt, EOFError):
+        pass
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        close_all_figures()
@@ -1,73 +1,46 @@
-import matplotlib
-import matplotlib.pyplot as plt
-import pandas as pd
-import os
 import sys
 from pathlib import Path
-from dotenv import load_dotenv
-import matplotlib.dates as mdates
-from sqlalchemy import create_engine
 
-backend_set = False
-for backend in ["TkAgg", "Qt5Agg"]:
-    try:
-        matplotlib.use(backend)
-        backend_set = True
-        break
-    except ImportError:
-        continue
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-if not backend_set:
-    print("Warning: No GUI backend available. Using non-interactive 'Agg' backend.", file=sys.stderr)
-    matplotlib.use("Agg")
+from common.backends import create_backend
+from common.plotting import get_pyplot
+from common.profiling import profile_run, profiled, stage
+from common.queries import PURCHASES_WINDOW_QUERY
 
-plt.ion()
-env_path = Path(__file__).parent.parent.parent / ".env"
-load_dotenv(env_path)
 
+@profiled("feature_engineering")
+def prepare_purchase_data(data):
+    """Derive the date and month columns used by the charts"""
+    import pandas as pd
 
-def get_data():
-    """Connect to database and extract purchase data for analysis"""
-    db_host = os.getenv("POSTGRES_HOST", "localhost")
-    db_port = os.getenv("POSTGRES_PORT", "5432")
-    db_name = os.getenv("POSTGRES_DB")
-    db_user = os.getenv("POSTGRES_USER")
-    db_password = os.getenv("POSTGRES_PASSWORD")
+    data["event_time"] = pd.to_datetime(data["event_time"])
+    data["date"] = data["event_time"].dt.date
+    data["month"] = data["event_time"].dt.to_period("M")
+    return data
 
-    if not all([db_name, db_user, db_password]):
-        raise ValueError("Missing required database credentials")
 
-    connection_string = (
-        f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
-    )
-    engine = create_engine(connection_string)
+def get_data():
+    """Connect to database and extract purchase data for analysis"""
+    backend = create_backend()
 
     try:
-        query = """
-        SELECT event_time, price, user_id
-        FROM customers 
-        WHERE event_type = 'purchase'
-            AND event_time >= '2022-10-01'
-            AND event_time < '2023-02-28'
-        """
-
-        data = pd.read_sql_query(query, engine)
-
-        data["event_time"] = pd.to_datetime(data["event_time"])
-        data["date"] = data["event_time"].dt.date
-        data["month"] = data["event_time"].dt.to_period("M")
-
-        return data
+        with stage("extract"):
+            data = backend.read_query(PURCHASES_WINDOW_QUERY)
+        return prepare_purchase_data(data)
     finally:
-        engine.dispose()
+        backend.close()
 
 
 def chart1_customers_per_day(data):
     """Create Chart 1: Number of unique customers per day"""
+    import matplotlib.dates as mdates
+
+    plt = get_pyplot()
     daily_customers = data.groupby("date")["user_id"].nunique().reset_index()
     daily_customers.columns = ["date", "customers"]
 
-    plt.figure(figsize=(10, 6))
+    fig = plt.figure(figsize=(10, 6))
     plt.plot(
         daily_customers["date"],
         daily_customers["customers"],
@@ -88,24 +61,19 @@ def chart1_customers_per_day(data):
     plt.ylabel("number of customers")
     plt.grid(True, alpha=0.3)
     plt.tight_layout()
-    plt.show(block=False)
-    try:
-        input("Press Enter for Chart 2...")
-    except (KeyboardInterrupt, EOFError):
-        pass
-    finally:
-        plt.close()
+    return fig
 
 
 def chart2_sales_by_month(data):
     """Create Chart 2: Total sales by month in millions"""
+    plt = get_pyplot()
     monthly_sales = data.groupby("month")["price"].sum().reset_index()
     monthly_sales["sales_millions"] = monthly_sales["price"] / 1_000_000
 
     # Extract month names from the data dynamically
     month_labels = [month.strftime("%b") for month in monthly_sales["month"]]
 
-    plt.figure(figsize=(10, 6))
+    fig = plt.figure(figsize=(10, 6))
     plt.bar(month_labels, monthly_sales["sales_millions"], color="#7FB3D3", alpha=0.8)
 
     plt.title("Total Sales by Month", fontsize=14, fontweight="bold")
@@ -113,23 +81,20 @@ def chart2_sales_by_month(data):
     plt.ylabel("total sales in million of ₳")
     plt.grid(True, alpha=0.3, axis="y")
     plt.tight_layout()
-    plt.show(block=False)
-    try:
-        input("Press Enter for Chart 3...")
-    except (KeyboardInterrupt, EOFError):
-        pass
-    finally:
-        plt.close()
+    return fig
 
 
 def chart3_avg_spend_per_day(data):
     """Create Chart 3: Average spend per customer per day"""
+    import matplotlib.dates as mdates
+
+    plt = get_pyplot()
     daily_data = (
         data.groupby("date").agg({"price": "sum", "user_id": "nunique"}).reset_index()
     )
     daily_data["avg_spend"] = daily_data["price"] / daily_data["user_id"]
 
-    plt.figure(figsize=(10, 6))
+    fig = plt.figure(figsize=(10, 6))
     plt.plot(
         daily_data["date"], daily_data["avg_spend"], color="#5F9BD1", linewidth=1.5
     )
@@ -144,13 +109,7 @@ def chart3_avg_spend_per_day(data):
     plt.ylabel("average spend/customers in ₳")
     plt.grid(True, alpha=0.3)
     plt.tight_layout()
-    plt.show(block=False)
-    try:
-        input("Press Enter to exit...")
-    except (KeyboardInterrupt, EOFError):
-        pass
-    finally:
-        plt.close()
+    return fig
 
 
 def main():
@@ -165,13 +124,27 @@ def main():
     print(f"Found {len(data):,} purchases")
     print(f"Total sales: ₳{data['price'].sum():,.2f}")
 
-    chart1_customers_per_day(data)
-    chart2_sales_by_month(data)
-    chart3_avg_spend_per_day(data)
+    charts = [
+        (chart1_customers_per_day, "Press Enter for Chart 2..."),
+        (chart2_sales_by_month, "Press Enter for Chart 3..."),
+        (chart3_avg_spend_per_day, "Press Enter to exit..."),
+    ]
+    for create_chart, prompt in charts:
+        with stage("render"):
+            fig = create_chart(data)
+        plt = get_pyplot()
+        plt.show(block=False)
+        try:
+            input(prompt)
+        except (KeyboardInterrupt, EOFError):
+            pass
+        finally:
+            plt.close(fig)
 
 
 if __name__ == "__main__":
-    try:
-        main()
-    except KeyboardInterrupt:
-        pass
+    with profile_run("chart"):
+        try:
+            main()
+        except KeyboardInterrupt:
+            pass
@@ -1,68 +1,29 @@
 """Statistical analysis and box plot visualization of purchase prices."""
 
-import matplotlib
-import matplotlib.pyplot as plt
-import pandas as pd
-import os
 import sys
 from pathlib import Path
-from dotenv import load_dotenv
-from sqlalchemy import create_engine
 
-backend_set = False
-for backend in ["TkAgg", "Qt5Agg"]:
-    try:
-        matplotlib.use(backend)
-        backend_set = True
-        break
-    except ImportError:
-        continue
-
-if not backend_set:
-    print("Warning: No GUI backend available. Using non-interactive 'Agg' backend.", file=sys.stderr)
-    matplotlib.use("Agg")
-
-plt.ion()
-env_path = Path(__file__).parent.parent.parent / ".env"
-load_dotenv(env_path)
-
-
-def get_db_engine():
-    """Establish PostgreSQL database engine using environment variables."""
-    db_host = os.getenv("POSTGRES_HOST", "localhost")
-    db_port = os.getenv("POSTGRES_PORT", "5432")
-    db_name = os.getenv("POSTGRES_DB")
-    db_user = os.getenv("POSTGRES_USER")
-    db_password = os.getenv("POSTGRES_PASSWORD")
-
-    if not all([db_name, db_user, db_password]):
-        raise ValueError("Missing required database credentials")
-
-    connection_string = (
-        f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
-    )
-    return create_engine(connection_string)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.backends import create_backend
+from common.plotting import get_pyplot
+from common.profiling import profile_run, profiled, stage
+from common.queries import PURCHASE_PRICES_QUERY
 
 
+@profiled("extract")
 def extract_purchase_data():
     """Extract purchase price data from the cleaned customers table."""
-    engine = get_db_engine()
+    backend = create_backend()
 
     try:
-        query = """
-        SELECT price, user_id
-        FROM customers 
-        WHERE event_type = 'purchase'
-            AND price IS NOT NULL
-        ORDER BY price;
-        """
-
-        data = pd.read_sql_query(query, engine)
+        data = backend.read_query(PURCHASE_PRICES_QUERY)
         return data
     finally:
-        engine.dispose()
+        backend.close()
 
 
+@profiled("feature_engineering")
 def calculate_statistics(data):
     """Calculate and display descriptive statistics for purchase prices."""
     prices = data["price"]
@@ -93,6 +54,7 @@ def calculate_statistics(data):
 
 def create_price_box_plot(data, zoom_to_main_range=False):
     """Create horizontal box plot for individual purchase price distribution."""
+    plt = get_pyplot()
     fig, ax = plt.subplots(figsize=(10, 6))
 
     ax.boxplot(
@@ -127,6 +89,7 @@ def create_price_box_plot(data, zoom_to_main_range=False):
 
 def create_basket_box_plot(data):
     """Create horizontal box plot for average basket price per user."""
+    plt = get_pyplot()
     user_avg_basket = data.groupby("user_id")["price"].mean().reset_index()
     user_avg_basket.columns = ["user_id", "avg_basket_price"]
 
@@ -164,7 +127,9 @@ def main():
     calculate_statistics(data)
     print()
 
-    fig1 = create_price_box_plot(data)
+    with stage("render"):
+        fig1 = create_price_box_plot(data)
+    plt = get_pyplot()
     plt.show()
     try:
         input("Press Enter for next chart...")
@@ -173,7 +138,8 @@ def main():
     finally:
         plt.close(fig1)
 
-    fig2 = create_basket_box_plot(data)
+    with stage("render"):
+        fig2 = create_basket_box_plot(data)
     plt.show()
     try:
         input("Press Enter to exit...")
@@ -184,7 +150,8 @@ def main():
 
 
 if __name__ == "__main__":
-    try:
-        main()
-    except KeyboardInterrupt:
-        pass
+    with profile_run("mustache"):
+        try:
+            main()
+        except KeyboardInterrupt:
+            pass
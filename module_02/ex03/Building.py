@@ -1,71 +1,33 @@
 """Bar charts for order frequency and customer spending analysis."""
 
-import matplotlib
-import matplotlib.pyplot as plt
-import pandas as pd
-import os
 import sys
 from pathlib import Path
-from dotenv import load_dotenv
-from sqlalchemy import create_engine
 
-backend_set = False
-for backend in ["TkAgg", "Qt5Agg"]:
-    try:
-        matplotlib.use(backend)
-        backend_set = True
-        break
-    except ImportError:
-        continue
-
-if not backend_set:
-    print("Warning: No GUI backend available. Using non-interactive 'Agg' backend.", file=sys.stderr)
-    matplotlib.use("Agg")
-
-plt.ion()
-env_path = Path(__file__).parent.parent.parent / ".env"
-load_dotenv(env_path)
-
-
-def get_db_engine():
-    """Establish PostgreSQL database engine using environment variables."""
-    db_host = os.getenv("POSTGRES_HOST", "localhost")
-    db_port = os.getenv("POSTGRES_PORT", "5432")
-    db_name = os.getenv("POSTGRES_DB")
-    db_user = os.getenv("POSTGRES_USER")
-    db_password = os.getenv("POSTGRES_PASSWORD")
-
-    if not all([db_name, db_user, db_password]):
-        raise ValueError("Missing required database credentials")
-
-    connection_string = (
-        f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
-    )
-    return create_engine(connection_string)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.backends import create_backend
+from common.plotting import get_pyplot
+from common.profiling import profile_run, profiled, stage
+from common.queries import ORDER_DATA_QUERY
 
 
+@profiled("extract")
 def extract_order_data():
     """Extract purchase data for order frequency analysis."""
-    engine = get_db_engine()
+    backend = create_backend()
 
     try:
-        query = """
-        SELECT user_id, price
-        FROM customers 
-
-        WHERE event_type = 'purchase'
-            AND price IS NOT NULL
-            AND price > 0
-        """
-
-        data = pd.read_sql_query(query, engine)
+        data = backend.read_query(ORDER_DATA_QUERY)
         return data
     finally:
-        engine.dispose()
+        backend.close()
 
 
 def create_frequency_chart(data):
     """Create bar chart showing number of orders by frequency."""
+    import pandas as pd
+
+    plt = get_pyplot()
     orders_per_customer = data.groupby("user_id").size().reset_index(name="order_count")
 
     bins = [0, 10, 20, 30, 40, float("inf")]
@@ -107,6 +69,9 @@ def create_frequency_chart(data):
 
 def create_spending_chart(data):
     """Create bar chart showing Altairian Dollars spent by customers."""
+    import pandas as pd
+
+    plt = get_pyplot()
     customer_spending = data.groupby("user_id")["price"].sum().reset_index()
     customer_spending.columns = ["user_id", "total_spent"]
 
@@ -158,7 +123,9 @@ def main():
 
     print(f"Found {len(data):,} purchase records")
 
-    fig1 = create_frequency_chart(data)
+    with stage("render"):
+        fig1 = create_frequency_chart(data)
+    plt = get_pyplot()
     plt.show()
     try:
         input("Press Enter for next chart...")
@@ -167,7 +134,8 @@ def main():
     finally:
         plt.close(fig1)
 
-    fig2 = create_spending_chart(data)
+    with stage("render"):
+        fig2 = create_spending_chart(data)
     plt.show()
     try:
         input("Press Enter to exit...")
@@ -178,7 +146,8 @@ def main():
 
 
 if __name__ == "__main__":
-    try:
-        main()
-    except KeyboardInterrupt:
-        pass
+    with profile_run("building"):
+        try:
+            main()
+        except KeyboardInterrupt:
+            pass
@@ -1,75 +1,72 @@
 """Elbow Method for finding optimal number of customer clusters."""
 
-import matplotlib
-import matplotlib.pyplot as plt
-import pandas as pd
-import os
 import sys
 from pathlib import Path
-from dotenv import load_dotenv
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
 import numpy as np
-from sqlalchemy import create_engine
 
-backend_set = False
-for backend in ["TkAgg", "Qt5Agg"]:
-    try:
-        matplotlib.use(backend)
-        backend_set = True
-        break
-    except ImportError:
-        continue
-
-if not backend_set:
-    print("Warning: No GUI backend available. Using non-interactive 'Agg' backend.", file=sys.stderr)
-    matplotlib.use("Agg")
-
-plt.ion()
-env_path = Path(__file__).parent.parent.parent / ".env"
-load_dotenv(env_path)
-
-
-def get_db_engine():
-    """Establish PostgreSQL database engine using environment variables."""
-    db_host = os.getenv("POSTGRES_HOST", "localhost")
-    db_port = os.getenv("POSTGRES_PORT", "5432")
-    db_name = os.getenv("POSTGRES_DB")
-    db_user = os.getenv("POSTGRES_USER")
-    db_password = os.getenv("POSTGRES_PASSWORD")
-
-    if not all([db_name, db_user, db_password]):
-        raise ValueError("Missing required database credentials")
-
-    connection_string = (
-        f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
-    )
-    return create_engine(connection_string)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.backends import create_backend
+from common.cluster_metrics import (
+    choose_k,
+    evaluate_k_range,
+    evaluate_k_range_stored,
+    print_scores_table,
+)
+from common.feature_store import load_or_build
+from common.plotting import get_pyplot
+from common.profiling import profile_run, profiled, stage
+from common.queries import CUSTOMER_PURCHASES_QUERY, PURCHASES_WATERMARK_QUERY
+
+FEATURE_STORE_PATH = Path(__file__).resolve().parent / ".cache" / "elbow_features.f32"
+FEATURE_COLUMNS = ["total_spent", "order_count"]
 
 
+@profiled("extract")
 def extract_customer_data():
     """Extract customer purchase data for clustering analysis."""
-    engine = get_db_engine()
+    backend = create_backend()
 
     try:
-        query = """
-        SELECT user_id, price
-        FROM customers 
-        WHERE event_type = 'purchase'
-            AND price IS NOT NULL
-        """
-
-        data = pd.read_sql_query(query, engine)
+        data = backend.read_query(CUSTOMER_PURCHASES_QUERY)
         return data
     finally:
-        engine.dispose()
+        backend.close()
+
+
+def read_source_watermark():
+    """Identify the current purchase data by its latest event and row count."""
+    backend = create_backend()
+
+    try:
+        row = backend.read_query(PURCHASES_WATERMARK_QUERY).iloc[0]
+    finally:
+        backend.close()
+
+    if not row["purchase_count"]:
+        return None
+    return f"{row['last_event_time']}|{row['purchase_count']}"
+
+
+def load_clustering_features(watermark):
+    """Scaled features from the feature store, rebuilt only when the purchases changed."""
+
+    def build():
+        data = extract_customer_data()
+        features_scaled, _ = prepare_clustering_features(data)
+        return features_scaled, FEATURE_COLUMNS, {"purchase_records": len(data)}
+
+    return load_or_build(FEATURE_STORE_PATH, watermark, build)
 
 
 def prepare_clustering_features(data):
     """Prepare features for clustering: total spent and order frequency per customer."""
-    customer_features = (
-        data.groupby("user_id").agg({"price": ["sum", "count", "mean"]}).reset_index()
-    )
+    from sklearn.preprocessing import StandardScaler
+
+    with stage("feature_engineering"):
+        customer_features = (
+            data.groupby("user_id").agg({"price": ["sum", "count", "mean"]}).reset_index()
+        )
 
     customer_features.columns = [
         "user_id",
@@ -78,35 +75,50 @@ def prepare_clustering_features(data):
         "avg_order_value",
     ]
 
-    features = customer_features[["total_spent", "order_count"]].copy()
+    features = customer_features[FEATURE_COLUMNS].copy()
 
-    scaler = StandardScaler()
-    features_scaled = scaler.fit_transform(features)
+    with stage("scale"):
+        scaler = StandardScaler()
+        features_scaled = scaler.fit_transform(features)
 
     return features_scaled, customer_features
 
 
-def calculate_elbow_method(features, max_clusters=10):
-    """Calculate inertia for different numbers of clusters."""
-    inertias = []
-    cluster_range = range(1, max_clusters + 1)
+@profiled("fit")
+def evaluate_cluster_range(features, max_clusters=10):
+    """Fit K-means for every k up to max_clusters in parallel and score each fit."""
+    return evaluate_k_range(features, range(1, max_clusters + 1))
+
 
-    for k in cluster_range:
-        kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
-        kmeans.fit(features)
-        inertias.append(kmeans.inertia_)
+@profiled("fit")
+def evaluate_stored_cluster_range(path=FEATURE_STORE_PATH, max_clusters=10):
+    """Same as evaluate_cluster_range, on worker processes attached to the feature store."""
+    return evaluate_k_range_stored(path, range(1, max_clusters + 1))
 
-    return cluster_range, inertias
+
+def calculate_elbow_method(features, max_clusters=10):
+    """Calculate inertia for different numbers of clusters."""
+    scores = evaluate_cluster_range(features, max_clusters)
+    return range(1, max_clusters + 1), [score.inertia for score in scores]
 
 
-def plot_elbow_method(cluster_range, inertias):
+def plot_elbow_method(cluster_range, inertias, scores=None):
     """Create elbow method plot to determine optimal number of clusters."""
+    plt = get_pyplot()
     fig, ax = plt.subplots(figsize=(10, 6))
 
     ax.plot(cluster_range, inertias, "bo-", linewidth=2, markersize=8)
 
     ax.set_xlabel("Number of clusters")
     ax.set_ylabel("Inertia")
+
+    if scores is not None:
+        silhouette_ax = ax.twinx()
+        silhouette_ax.plot(
+            [score.k for score in scores], [score.silhouette for score in scores],
+            "s--", color="darkorange", linewidth=1.5, markersize=6,
+        )
+        silhouette_ax.set_ylabel("Silhouette (sampled)", color="darkorange")
     ax.set_title("The Elbow Method", fontsize=14, fontweight="bold")
     ax.grid(True, alpha=0.3)
 
@@ -127,29 +139,41 @@ def find_optimal_clusters(cluster_range, inertias):
     return elbow_point
 
 
+def suggest_clusters(scores):
+    """Return (elbow k, chosen k), where the silhouette can overrule a poor elbow."""
+    cluster_range = [score.k for score in scores]
+    elbow_k = int(find_optimal_clusters(cluster_range, [score.inertia for score in scores]))
+    return elbow_k, choose_k(scores, elbow_k)
+
+
 def main():
     """Main function to execute elbow method analysis."""
-    print("Connecting to database and extracting customer data...")
-    data = extract_customer_data()
+    print("Connecting to database and checking the purchase data...")
+    with stage("extract"):
+        watermark = read_source_watermark()
 
-    if data.empty:
+    if watermark is None:
         print("No customer data found.")
         return
 
-    print(f"Found {len(data):,} purchase records")
+    _, info, reused = load_clustering_features(watermark)
+    if reused:
+        print(f"No new purchases; reusing the scaled features in {FEATURE_STORE_PATH.name}")
+    else:
+        print(f"Found {info.metadata['purchase_records']:,} purchase records")
 
-    print("Preparing clustering features...")
-    features_scaled, customer_features = prepare_clustering_features(data)
+    print(f"Analyzing {info.shape[0]:,} unique customers")
 
-    print(f"Analyzing {len(customer_features):,} unique customers")
+    print("Calculating elbow method and cluster quality scores...")
+    scores = evaluate_stored_cluster_range(FEATURE_STORE_PATH, max_clusters=10)
+    cluster_range = [score.k for score in scores]
+    inertias = [score.inertia for score in scores]
 
-    print("Calculating elbow method...")
-    cluster_range, inertias = calculate_elbow_method(
-        features_scaled, max_clusters=10
-    )
-
-    optimal_k = find_optimal_clusters(cluster_range, inertias)
+    elbow_k, optimal_k = suggest_clusters(scores)
 
+    print()
+    print_scores_table(scores, optimal_k)
+    print(f"\nElbow of the inertia curve: {elbow_k}")
     print(f"Suggested optimal number of clusters: {optimal_k}")
     print("\nElbow Method Analysis:")
     print("- The elbow point indicates where adding more clusters")
@@ -157,8 +181,12 @@ def main():
     print(
         "- Look for the 'bend' in the curve where the slope changes significantly"
     )
+    print("- The elbow is kept unless its silhouette (sampled) is clearly below the best k's")
+    print("- Higher silhouette and Calinski-Harabasz, lower Davies-Bouldin mean better separated clusters")
 
-    fig = plot_elbow_method(cluster_range, inertias)
+    with stage("render"):
+        fig = plot_elbow_method(cluster_range, inertias, scores)
+    plt = get_pyplot()
     plt.show()
     try:
         input("Press Enter to exit...")
@@ -169,7 +197,8 @@ def main():
 
 
 if __name__ == "__main__":
-    try:
-        main()
-    except KeyboardInterrupt:
-        pass
+    with profile_run("elbow"):
+        try:
+            main()
+        except KeyboardInterrupt:
+            pass
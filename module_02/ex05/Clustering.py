@@ -1,187 +1,154 @@
 #!/usr/bin/env python3
 
-import matplotlib
-import pandas as pd
+import argparse
 import numpy as np
-import matplotlib.pyplot as plt
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
-import os
 import sys
+from datetime import date
 from pathlib import Path
-from dotenv import load_dotenv
-from sqlalchemy import create_engine
 
-backend_set = False
-for backend in ["TkAgg", "Qt5Agg"]:
-    try:
-        matplotlib.use(backend)
-        backend_set = True
-        break
-    except ImportError:
-        continue
-
-if not backend_set:
-    print("Warning: No GUI backend available. Using non-interactive 'Agg' backend.", file=sys.stderr)
-    matplotlib.use("Agg")
-
-plt.ion()
-env_path = Path(__file__).parent.parent.parent / ".env"
-load_dotenv(env_path)
-
-
-def get_db_engine():
-    """Connect to PostgreSQL database using environment variables"""
-    db_host = os.getenv("POSTGRES_HOST", "localhost")
-    db_port = os.getenv("POSTGRES_PORT", "5432")
-    db_name = os.getenv("POSTGRES_DB")
-    db_user = os.getenv("POSTGRES_USER")
-    db_password = os.getenv("POSTGRES_PASSWORD")
-
-    if not all([db_name, db_user, db_password]):
-        raise ValueError("Missing required database credentials")
-
-    connection_string = (
-        f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
-    )
-    return create_engine(connection_string)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.backends import create_backend, get_backend_name
+from common.cluster_metrics import (
+    choose_k,
+    evaluate_clustering,
+    evaluate_k_range_stored,
+    print_scores_table,
+)
+from common.feature_store import load_or_build
+from common.plotting import close_all_figures, get_pyplot
+from common.profiling import profile_run, profiled, stage
+from common.queries import CHANGED_CUSTOMER_FEATURES_QUERY, CUSTOMER_FEATURES_QUERY
+from customer_frame import compact_customer_features
+from lookalike import LOOKALIKE_INDEX_PATH, LookalikeIndex
+from projection import CACHE_DIR, iter_chunks, load_or_fit_projection
+from segment_store import SEGMENTS_TABLE, model_version_for, upsert_segments, write_segments
+from segmentation import (
+    CLUSTERING_FEATURES,
+    SEGMENT_MODEL_PATH,
+    SegmentModel,
+    assign_customer_segments,
+    compute_segment_thresholds,
+    engagement_features,
+)
+
+PROJECTION_CACHE_PATH = CACHE_DIR / "cluster_projection.npz"
+FEATURE_STORE_PATH = CACHE_DIR / "clustering_features.f32"
+DEFAULT_CLUSTERS = 6
+AUTO_CLUSTER_RANGE = range(2, 11)
 
 
 def extract_customer_features():
     """Extract customer behavioral features for clustering"""
-    engine = get_db_engine()
+    backend = create_backend()
 
     print("Extracting customer behavioral features...")
 
-    # Simplified query to get comprehensive customer metrics
-    query = """
-    SELECT 
-        user_id as customer_id,
-        COUNT(*) as total_purchases,
-        SUM(price) as total_spent,
-        AVG(price) as avg_purchase_value,
-        MIN(event_time::date) as first_purchase_date,
-        MAX(event_time::date) as last_purchase_date,
-        (MAX(event_time::date) - MIN(event_time::date)) + 1 as customer_lifespan_days,
-        COUNT(DISTINCT event_time::date) as active_days,
-        (CURRENT_DATE - MAX(event_time::date)) as days_since_last_purchase
-    FROM customers 
-    WHERE price IS NOT NULL AND price > 0 AND event_type = 'purchase'
-    GROUP BY user_id
-    HAVING COUNT(*) > 0
-    ORDER BY SUM(price) DESC;
-    """
-
     try:
-        data = pd.read_sql_query(query, engine)
-
-        # Calculate engagement rate and purchase intensity
-        data["engagement_rate"] = data.apply(
-            lambda x: (
-                x["active_days"] / x["customer_lifespan_days"]
-                if x["customer_lifespan_days"] > 0
-                else 1
-            ),
-            axis=1,
-        )
-        data["purchase_intensity"] = data.apply(
-            lambda x: (
-                x["total_purchases"] / x["active_days"]
-                if x["active_days"] > 0
-                else x["total_purchases"]
-            ),
-            axis=1,
-        )
+        with stage("extract"):
+            data = backend.read_query(CUSTOMER_FEATURES_QUERY)
+        data = prepare_customer_features(data)
 
         print(f"Extracted features for {len(data)} customers")
         return data
     finally:
-        engine.dispose()
+        backend.close()
+
+
+@profiled("feature_engineering")
+def add_engagement_features(data):
+    """Calculate engagement rate and purchase intensity from the aggregated metrics"""
+    engagement_rate, purchase_intensity = engagement_features(
+        data["total_purchases"], data["active_days"], data["customer_lifespan_days"]
+    )
+    data["engagement_rate"] = engagement_rate.astype(np.float32)
+    data["purchase_intensity"] = purchase_intensity.astype(np.float32)
+    return data
 
 
-def create_customer_segments(data):
+def prepare_customer_features(data):
+    """Shrink the query result to compact column types, then add the engagement features"""
+    return add_engagement_features(compact_customer_features(data))
+
+
+def clustering_feature_matrix(data, columns=CLUSTERING_FEATURES):
+    """One float32 copy of the feature columns, with missing values as 0"""
+    return np.nan_to_num(data[columns].to_numpy(dtype=np.float32), copy=False)
+
+
+def create_customer_segments(data, n_clusters=DEFAULT_CLUSTERS):
     """Create customer segments using business rules and clustering"""
+    from sklearn.cluster import KMeans
+    from sklearn.preprocessing import StandardScaler
 
-    # Create RFM-like features for clustering
-    clustering_features = data[
-        [
-            "total_purchases",
-            "total_spent",
-            "avg_purchase_value",
-            "days_since_last_purchase",
-            "engagement_rate",
-            "purchase_intensity",
-        ]
-    ].copy()
-
-    # Handle any remaining NaN values
-    clustering_features = clustering_features.fillna(0)
-
-    # Scale features for clustering
-    scaler = StandardScaler()
-    scaled_features = scaler.fit_transform(clustering_features)
-
-    # Apply K-means clustering with 6 clusters (to allow for business logic grouping)
-    kmeans = KMeans(n_clusters=6, random_state=42, n_init=10)
-    cluster_labels = kmeans.fit_predict(scaled_features)
+    # Create RFM-like features for clustering (missing values count as 0)
+    clustering_features = clustering_feature_matrix(data)
+
+    # Scale features for clustering, in place: the unscaled matrix is not needed again.
+    # Fitting chunk by chunk bounds the scaler's float64 temporaries to one chunk.
+    with stage("scale"):
+        scaler = StandardScaler()
+        for chunk in iter_chunks(clustering_features):
+            scaler.partial_fit(chunk)
+        scaled_features = scaler.transform(clustering_features, copy=False)
+
+    # Apply K-means clustering, 6 clusters by default (to allow for business logic grouping)
+    with stage("fit"):
+        kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
+        cluster_labels = kmeans.fit_predict(scaled_features)
 
     # Add cluster labels to original data
     data["cluster"] = cluster_labels
 
     # Create business-meaningful segments based on RFM analysis
-    # Calculate percentiles for segmentation
-    spending_high = data["total_spent"].quantile(0.8)
-    spending_med = data["total_spent"].quantile(0.5)
-    frequency_high = data["total_purchases"].quantile(0.8)
-    frequency_med = data["total_purchases"].quantile(0.5)
-    recency_recent = data["days_since_last_purchase"].quantile(0.2)
-    recency_old = data["days_since_last_purchase"].quantile(0.8)
-
-    def assign_customer_segment(row):
-        spending = row["total_spent"]
-        frequency = row["total_purchases"]
-        recency = row["days_since_last_purchase"]
-
-        # Platinum: High spending + High frequency + Recent activity
-        if (
-            spending >= spending_high
-            and frequency >= frequency_high
-            and recency <= recency_recent
-        ):
-            return "Platinum Customer"
-
-        # Gold: High spending OR High frequency + Medium recency
-        elif (
-            spending >= spending_high or frequency >= frequency_high
-        ) and recency <= recency_old:
-            return "Gold Customer"
-
-        # Silver: Medium spending + Medium frequency
-        elif spending >= spending_med and frequency >= frequency_med:
-            return "Silver Customer"
-
-        # New customers: Low frequency but recent activity
-        elif (
-            frequency <= data["total_purchases"].quantile(0.3)
-            and recency <= recency_recent
-        ):
-            return "New Customer"
-
-        # Inactive: Old recency (haven't purchased in a while)
-        elif recency >= recency_old:
-            return "Inactive Customer"
-
-        # Regular: Everyone else
-        else:
-            return "Regular Customer"
-
-    data["customer_segment"] = data.apply(assign_customer_segment, axis=1)
+    with stage("feature_engineering"):
+        thresholds = compute_segment_thresholds(data)
+        data["customer_segment"] = assign_customer_segments(data, thresholds)
 
     return data, kmeans, scaler
 
 
+def scaled_clustering_features(data, scaler):
+    """The clustering features in the scaler's space, as the model was fitted on"""
+    return scaler.transform(clustering_feature_matrix(data), copy=False)
+
+
+@profiled("evaluate")
+def choose_cluster_count(data):
+    """Pick the number of clusters with the best sampled silhouette"""
+    from sklearn.preprocessing import StandardScaler
+
+    def build():
+        scaled = StandardScaler().fit_transform(clustering_feature_matrix(data))
+        return scaled, CLUSTERING_FEATURES, {}
+
+    # Recency is measured from today, so the matrix also changes with the date
+    watermark = f"{data['last_event_time'].max()}|{len(data)}|{date.today()}"
+    _, _, reused = load_or_build(FEATURE_STORE_PATH, watermark, build)
+    if reused:
+        print(f"Reusing the scaled features in {FEATURE_STORE_PATH.name}")
+
+    # Worker processes map the stored matrix instead of receiving a pickled copy
+    scores = evaluate_k_range_stored(FEATURE_STORE_PATH, AUTO_CLUSTER_RANGE)
+    n_clusters = choose_k(scores)
+    print_scores_table(scores, n_clusters)
+    return n_clusters
+
+
+@profiled("evaluate")
+def evaluate_segmentation(data, kmeans, scaler):
+    """Quality scores of the fitted clustering over all customers"""
+    return evaluate_clustering(
+        scaled_clustering_features(data, scaler), data["cluster"].to_numpy(), kmeans.inertia_
+    )
+
+
+@profiled("render")
 def create_four_key_visualizations(data):
     """Create 4 clean and comprehensive visualizations for customer segments"""
+    from sklearn.cluster import KMeans
+
+    plt = get_pyplot()
 
     # Define consistent color scheme
     segment_colors = {
@@ -196,6 +163,7 @@ def create_four_key_visualizations(data):
     # Chart 1: Customer Segment Distribution (Bar Chart)
     plt.figure(figsize=(12, 8))
     segment_counts = data["customer_segment"].value_counts()
+    segment_counts = segment_counts[segment_counts > 0]
     colors = [segment_colors.get(seg, "#95A5A6") for seg in segment_counts.index]
 
     bars = plt.barh(segment_counts.index, segment_counts.values, color=colors)
@@ -252,23 +220,22 @@ def create_four_key_visualizations(data):
 
     plt.figure(figsize=(12, 8))
 
-    from sklearn.decomposition import PCA
-
-    clustering_features = data[
-        ["total_purchases", "total_spent", "days_since_last_purchase"]
-    ].fillna(0)
-
-    # Scale features
-    scaler = StandardScaler()
-    scaled_features = scaler.fit_transform(clustering_features)
+    clustering_features = clustering_feature_matrix(
+        data, ["total_purchases", "total_spent", "days_since_last_purchase"]
+    )
 
-    # Apply PCA for 2D visualization
-    pca = PCA(n_components=2)
-    pca_features = pca.fit_transform(scaled_features)
+    # Project to 2D with the cached chunked PCA; refits only when the data changed
+    with stage("project"):
+        projection = load_or_fit_projection(
+            clustering_features, PROJECTION_CACHE_PATH, method="incremental"
+        )
+        pca_features = projection.transform(clustering_features)
+        scaled_features = projection.standardize(clustering_features)
 
     # Apply K-means clustering
-    kmeans = KMeans(n_clusters=5, random_state=42, n_init=10)
-    cluster_labels = kmeans.fit_predict(scaled_features)
+    with stage("fit"):
+        kmeans = KMeans(n_clusters=5, random_state=42, n_init=10)
+        cluster_labels = kmeans.fit_predict(scaled_features)
 
     # Plot clusters
     cluster_colors = ["#FF6B6B", "#4ECDC4", "#45B7D1", "#96CEB4", "#FFEAA7"]
@@ -285,7 +252,7 @@ def create_four_key_visualizations(data):
         )
 
     # Plot centroids
-    pca_centroids = pca.transform(kmeans.cluster_centers_)
+    pca_centroids = projection.project_scaled(kmeans.cluster_centers_)
     plt.scatter(
         pca_centroids[:, 0],
         pca_centroids[:, 1],
@@ -313,7 +280,7 @@ def create_four_key_visualizations(data):
     # Chart 4: Business Value Analysis
     # Calculate segment metrics
     segment_metrics = (
-        data.groupby("customer_segment")
+        data.groupby("customer_segment", observed=True)
         .agg(
             {
                 "customer_id": "count",
@@ -436,6 +403,116 @@ def create_four_key_visualizations(data):
     return segment_metrics
 
 
+@profiled("persist")
+def save_customer_segments(data, kmeans):
+    """Write the segments back to Postgres so marketing can query them"""
+    if get_backend_name() != "postgres":
+        print("\nSegments are only written back with the Postgres backend; skipping.")
+        return None
+
+    print(f"\nWriting customer segments to {SEGMENTS_TABLE}...")
+    report = write_segments(data, CLUSTERING_FEATURES, model_version_for(kmeans))
+    print(
+        f"✓ Wrote {report.rows:,} rows in {report.batches} COPY batches, "
+        f"{report.elapsed:.2f}s ({report.rows_per_sec:,.0f} rows/sec)"
+    )
+    return report
+
+
+def save_segment_model(data, kmeans, scaler):
+    """Keep the fitted model and threshold distributions for incremental refreshes"""
+    model = SegmentModel.from_fit(
+        data, scaler, kmeans, model_version_for(kmeans), data["last_event_time"].max()
+    )
+    model.save(SEGMENT_MODEL_PATH)
+    return model
+
+
+@profiled("index")
+def save_lookalike_index(data, kmeans, scaler):
+    """Index customers' scaled features so lookalikes can be found without a full scan"""
+    scaled_features = scaled_clustering_features(data, scaler)
+    index = LookalikeIndex(model_version=model_version_for(kmeans))
+    index.build(data["customer_id"].to_numpy(), scaled_features)
+    index.save(LOOKALIKE_INDEX_PATH)
+    print(f"✓ Indexed {len(index):,} customers for lookalike search")
+    return index
+
+
+def refresh_lookalike_index(changed, model):
+    """Move re-scored customers to their new position in the lookalike index"""
+    if not LOOKALIKE_INDEX_PATH.exists():
+        return None
+    index = LookalikeIndex.load(LOOKALIKE_INDEX_PATH)
+    if index.model_version != model.model_version:
+        print("Lookalike index belongs to another model; run a full segmentation to rebuild it.")
+        return None
+
+    with stage("index"):
+        rebuilt = index.upsert(changed["customer_id"].to_numpy(), model.scale(changed))
+        index.save(LOOKALIKE_INDEX_PATH)
+    action = "rebuilt the tree" if rebuilt else f"{len(index.delta_ids):,} customers pending rebuild"
+    print(f"✓ Updated lookalike index ({action})")
+    return index
+
+
+def refresh_customer_segments():
+    """Re-score only the customers with purchases after the last processed event"""
+    if not SEGMENT_MODEL_PATH.exists():
+        print("No saved segment model found. Run a full segmentation first.")
+        return None
+
+    model = SegmentModel.load(SEGMENT_MODEL_PATH)
+    print(f"Looking for purchases after {model.watermark}...")
+
+    backend = create_backend()
+    try:
+        with stage("extract"):
+            changed = backend.read_query(
+                CHANGED_CUSTOMER_FEATURES_QUERY, params={"watermark": model.watermark.isoformat()}
+            )
+    finally:
+        backend.close()
+
+    if changed.empty:
+        print("No new purchases since the last run; segments are up to date.")
+        return changed
+
+    changed = prepare_customer_features(changed)
+
+    # Re-assign clusters against the persisted centroids instead of refitting
+    with stage("score"):
+        changed["cluster"] = model.predict(changed)
+
+    # Thresholds come from the streamed distributions, not the full customer base
+    with stage("feature_engineering"):
+        model.update_distributions(changed)
+        thresholds = model.thresholds(date.today())
+        changed["customer_segment"] = assign_customer_segments(changed, thresholds)
+
+    print(f"Re-scored {len(changed):,} customers with new purchases")
+
+    if get_backend_name() == "postgres":
+        with stage("persist"):
+            report = upsert_segments(changed, CLUSTERING_FEATURES, model.model_version)
+        print(
+            f"✓ Updated {report.rows:,} rows in {SEGMENTS_TABLE}, "
+            f"{report.elapsed:.2f}s ({report.rows_per_sec:,.0f} rows/sec)"
+        )
+
+    refresh_lookalike_index(changed, model)
+
+    model.watermark = changed["last_event_time"].max()
+    model.save(SEGMENT_MODEL_PATH)
+
+    print("\nSegments of re-scored customers:")
+    for segment, count in changed["customer_segment"].value_counts().items():
+        if not count:
+            continue
+        print(f"  {segment}: {count:,} customers")
+    return changed
+
+
 def print_segment_analysis(data):
     """Print detailed analysis of customer segments for marketing strategy"""
 
@@ -444,7 +521,7 @@ def print_segment_analysis(data):
     print("=" * 80)
 
     segment_analysis = (
-        data.groupby("customer_segment")
+        data.groupby("customer_segment", observed=True)
         .agg(
             {
                 "customer_id": "count",
@@ -519,6 +596,24 @@ def print_segment_analysis(data):
 
 def main():
     """Main function to run customer segmentation analysis"""
+    parser = argparse.ArgumentParser(description="Customer segmentation for commercial targeting")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only re-score customers with purchases since the last run",
+    )
+    parser.add_argument(
+        "--clusters",
+        default=str(DEFAULT_CLUSTERS),
+        help="number of K-means clusters, or 'auto' to pick it by sampled silhouette",
+    )
+    args = parser.parse_args()
+    if args.clusters != "auto" and not args.clusters.isdigit():
+        parser.error("--clusters must be a number or 'auto'")
+
+    if args.incremental:
+        refresh_customer_segments()
+        return
 
     print("Starting Customer Segmentation Analysis for Commercial Targeting...")
     print("Extracting customer behavioral data...")
@@ -532,8 +627,14 @@ def main():
     print(f"Successfully loaded data for {len(customer_data)} customers")
 
     # Create customer segments
+    if args.clusters == "auto":
+        print(f"Scoring k = {AUTO_CLUSTER_RANGE.start}..{AUTO_CLUSTER_RANGE.stop - 1} clusters...")
+        n_clusters = choose_cluster_count(customer_data)
+    else:
+        n_clusters = int(args.clusters)
+
     print("Creating customer segments using clustering algorithms...")
-    segmented_data, kmeans_model, scaler = create_customer_segments(customer_data)
+    segmented_data, kmeans_model, scaler = create_customer_segments(customer_data, n_clusters)
 
     # Create visualizations
     print("Generating customer segment visualizations...")
@@ -542,6 +643,11 @@ def main():
     # Print detailed analysis
     print_segment_analysis(segmented_data)
 
+    # Persist segments for the email campaigns, then the model for incremental runs
+    save_customer_segments(segmented_data, kmeans_model)
+    save_segment_model(segmented_data, kmeans_model, scaler)
+    save_lookalike_index(segmented_data, kmeans_model, scaler)
+
     print("\n" + "=" * 80)
     print("CLUSTERING MODEL PERFORMANCE")
     print("=" * 80)
@@ -551,7 +657,13 @@ def main():
         f"Business Segments Created: {len(segmented_data['customer_segment'].unique())}"
     )
 
+    quality = evaluate_segmentation(segmented_data, kmeans_model, scaler)
+    print(f"Silhouette (stratified sample): {quality.silhouette:.3f}")
+    print(f"Calinski-Harabasz Index: {quality.calinski_harabasz:,.1f}")
+    print(f"Davies-Bouldin Index: {quality.davies_bouldin:.3f}")
+
     segment_distribution = segmented_data["customer_segment"].value_counts()
+    segment_distribution = segment_distribution[segment_distribution > 0]
     print(f"\nSegment Distribution:")
     for segment, count in segment_distribution.items():
         percentage = (count / len(segmented_data)) * 100
@@ -568,9 +680,10 @@ def main():
 
 
 if __name__ == "__main__":
-    try:
-        main()
-    except KeyboardInterrupt:
-        pass
-    finally:
-        plt.close('all')
+    with profile_run("clustering"):
+        try:
+            main()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            close_all_figures()
@@ -0,0 +1,70 @@
+"""Compact column types for the customer feature frame.
+
+The database drivers return counts as int64, amounts as float64 and dates as
+Python date objects (about 50 bytes each). Counts and day numbers fit in int32,
+float32 keeps amounts to well under a cent at customer scale, and segment names
+become one-byte categorical codes.
+"""
+
+import numpy as np
+
+from segmentation import SEGMENT_NAMES, day_numbers
+
+COUNT_COLUMNS = [
+    "total_purchases",
+    "customer_lifespan_days",
+    "active_days",
+    "days_since_last_purchase",
+    "previous_purchases",
+]
+AMOUNT_COLUMNS = [
+    "total_spent",
+    "avg_purchase_value",
+    "engagement_rate",
+    "purchase_intensity",
+    "previous_spent",
+]
+# Stored as int32 days since the Unix epoch
+DATE_COLUMNS = ["first_purchase_date", "last_purchase_date", "previous_last_purchase_date"]
+
+INT32_MAX = np.iinfo(np.int32).max
+
+
+def _compact_integers(values):
+    """int32 when the values fit, float32 (NaN for missing) for nullable columns."""
+    import pandas as pd
+
+    values = pd.to_numeric(values)
+    if values.isna().any():
+        # float32 holds integers exactly only up to 2**24
+        return values.astype(np.float32 if values.abs().max() < 2**24 else np.float64)
+    if len(values) and (values.min() < -INT32_MAX or values.max() > INT32_MAX):
+        return values.astype(np.int64)
+    return values.astype(np.int32)
+
+
+def _compact_days(values):
+    import pandas as pd
+
+    days = day_numbers(values)
+    if np.isnan(days).any():
+        return pd.Series(days.astype(np.float32), index=values.index)
+    return pd.Series(days.astype(np.int32), index=values.index)
+
+
+def compact_customer_features(data):
+    """Convert a customer feature frame to compact column types in place and return it."""
+    import pandas as pd
+
+    for column in ["customer_id", *COUNT_COLUMNS]:
+        if column in data:
+            data[column] = _compact_integers(data[column])
+    for column in AMOUNT_COLUMNS:
+        if column in data:
+            data[column] = data[column].astype(np.float32)
+    for column in DATE_COLUMNS:
+        if column in data:
+            data[column] = _compact_days(data[column])
+    if "customer_segment" in data:
+        data["customer_segment"] = pd.Categorical(data["customer_segment"], categories=SEGMENT_NAMES)
+    return data
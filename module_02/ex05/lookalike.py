@@ -0,0 +1,269 @@
+"""Lookalike-customer search over the scaled RFM features the segmentation is fitted on.
+
+Usage: uv run module_02/ex05/lookalike.py <customer_id> [<customer_id> ...] [--k 20]
+"""
+
+import argparse
+import os
+import pickle
+import sys
+
+import numpy as np
+
+from projection import CACHE_DIR
+
+LOOKALIKE_INDEX_PATH = CACHE_DIR / "lookalike_index.pkl"
+TREE_TYPES = ("kd_tree", "ball_tree")
+DEFAULT_LEAF_SIZE = 40
+# Changed customers are searched by brute force until they reach this share of the tree
+REBUILD_FRACTION = 0.05
+
+
+def _build_tree(vectors, tree_type, leaf_size):
+    from sklearn.neighbors import BallTree, KDTree
+
+    tree_class = KDTree if tree_type == "kd_tree" else BallTree
+    return tree_class(vectors, leaf_size=leaf_size)
+
+
+def _squared_distances(queries, vectors):
+    """Pairwise squared Euclidean distances between two small row sets."""
+    distances = (
+        (queries**2).sum(axis=1)[:, None]
+        - 2.0 * queries @ vectors.T
+        + (vectors**2).sum(axis=1)[None, :]
+    )
+    return np.maximum(distances, 0.0)
+
+
+class LookalikeIndex:
+    """Exact k-nearest-neighbour index over customers' scaled feature vectors.
+
+    The bulk of the customers live in a KD (or ball) tree. Customers whose
+    features change are tombstoned in the tree and kept in a small delta that
+    is searched by brute force, so a refresh costs O(changed) rather than a
+    rebuild. The tree is rebuilt once the delta outgrows REBUILD_FRACTION.
+    """
+
+    STATE = (
+        "tree_type", "leaf_size", "model_version",
+        "tree", "ids", "vectors", "alive", "delta_ids", "delta_vectors",
+    )
+
+    def __init__(self, tree_type="kd_tree", leaf_size=DEFAULT_LEAF_SIZE, model_version=None):
+        if tree_type not in TREE_TYPES:
+            raise ValueError(f"Unknown tree type '{tree_type}', expected one of {TREE_TYPES}")
+        self.tree_type = tree_type
+        self.leaf_size = leaf_size
+        self.model_version = model_version
+
+        self.tree = None
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.vectors = np.zeros((0, 0), dtype=np.float64)
+        self.alive = np.zeros(0, dtype=bool)
+        self.delta_ids = np.zeros(0, dtype=np.int64)
+        self.delta_vectors = np.zeros((0, 0), dtype=np.float64)
+
+    def __len__(self):
+        return int(self.alive.sum()) + len(self.delta_ids)
+
+    @property
+    def dead_count(self):
+        return len(self.alive) - int(self.alive.sum())
+
+    def build(self, ids, vectors):
+        """(Re)build the tree over all customers, emptying the delta."""
+        ids = np.asarray(ids, dtype=np.int64)
+        vectors = np.asarray(vectors, dtype=np.float64)
+        if len(np.unique(ids)) != len(ids):
+            raise ValueError("Customer ids must be unique")
+
+        # Sorted ids let upserts find a customer's tree row with a binary search
+        order = np.argsort(ids, kind="stable")
+        self.ids = ids[order]
+        self.vectors = np.ascontiguousarray(vectors[order])
+        self.alive = np.ones(len(ids), dtype=bool)
+        self.delta_ids = np.zeros(0, dtype=np.int64)
+        self.delta_vectors = np.zeros((0, self.vectors.shape[1]), dtype=np.float64)
+        self.tree = _build_tree(self.vectors, self.tree_type, self.leaf_size)
+        return self
+
+    def _tree_rows(self, ids):
+        """Tree row of each id, or -1 where the id is not in the tree."""
+        if len(self.ids) == 0:
+            return np.full(len(ids), -1, dtype=np.int64)
+        rows = np.searchsorted(self.ids, ids)
+        rows = np.minimum(rows, len(self.ids) - 1)
+        return np.where(self.ids[rows] == ids, rows, -1)
+
+    def remove(self, ids):
+        """Drop customers from the index."""
+        ids = np.asarray(ids, dtype=np.int64)
+        rows = self._tree_rows(ids)
+        self.alive[rows[rows >= 0]] = False
+        keep = ~np.isin(self.delta_ids, ids)
+        self.delta_ids = self.delta_ids[keep]
+        self.delta_vectors = self.delta_vectors[keep]
+
+    def upsert(self, ids, vectors):
+        """Insert new customers or replace changed ones; returns True if the tree was rebuilt."""
+        ids = np.asarray(ids, dtype=np.int64)
+        vectors = np.asarray(vectors, dtype=np.float64)
+        if self.tree is None:
+            self.build(ids, vectors)
+            return True
+
+        self.remove(ids)
+        self.delta_ids = np.concatenate([self.delta_ids, ids])
+        self.delta_vectors = np.concatenate([self.delta_vectors, vectors])
+
+        if len(self.delta_ids) + self.dead_count > REBUILD_FRACTION * len(self.ids):
+            self.compact()
+            return True
+        return False
+
+    def compact(self):
+        """Fold the delta into a freshly built tree and drop tombstoned rows."""
+        self.build(
+            np.concatenate([self.ids[self.alive], self.delta_ids]),
+            np.concatenate([self.vectors[self.alive], self.delta_vectors]),
+        )
+
+    def vectors_for(self, ids):
+        """Current vectors of the given customers; raises KeyError for unknown ids."""
+        ids = np.asarray(ids, dtype=np.int64)
+        result = np.empty((len(ids), self.vectors.shape[1]), dtype=np.float64)
+        rows = self._tree_rows(ids)
+        in_tree = rows >= 0
+        in_tree[in_tree] = self.alive[rows[in_tree]]
+        result[in_tree] = self.vectors[rows[in_tree]]
+
+        delta_positions = {customer_id: position for position, customer_id in enumerate(self.delta_ids.tolist())}
+        for index in np.flatnonzero(~in_tree):
+            position = delta_positions.get(int(ids[index]))
+            if position is None:
+                raise KeyError(f"Customer {ids[index]} is not in the lookalike index")
+            result[index] = self.delta_vectors[position]
+        return result
+
+    def _tree_neighbours(self, queries, k, excluded_ids):
+        """The k nearest live tree rows per query, skipping excluded_ids; returns flat (ids, distances)."""
+        found_ids, found_distances = [], []
+        pending = queries
+        fetch = k + len(excluded_ids) + min(self.dead_count, k)
+        while len(pending):
+            fetch = min(fetch, len(self.ids))
+            distances, rows = self.tree.query(pending, k=fetch)
+            keep = self.alive[rows] & ~np.isin(self.ids[rows], excluded_ids)
+            # Results are sorted per query, so the first k kept candidates are its k nearest
+            keep &= np.cumsum(keep, axis=1) <= k
+            # Too many tombstones or seeds among the candidates: ask the tree for more
+            short = (keep.sum(axis=1) < k) if fetch < len(self.ids) else np.zeros(len(rows), dtype=bool)
+            done = ~short
+            found_ids.append(self.ids[rows[done][keep[done]]])
+            found_distances.append(distances[done][keep[done]])
+            pending = pending[short]
+            fetch *= 2
+        return np.concatenate(found_ids), np.concatenate(found_distances)
+
+    def query(self, seed_ids, k=10, exclude_seeds=True):
+        """Top-k customers closest to any of the seed customers.
+
+        Returns (ids, distances) sorted by distance, where a customer's distance
+        is to its nearest seed. The search is exact: every customer in the
+        global top-k is among the top-k neighbours of its nearest seed.
+        """
+        seed_ids = np.unique(np.asarray(seed_ids, dtype=np.int64))
+        queries = self.vectors_for(seed_ids)
+        excluded = seed_ids if exclude_seeds else np.zeros(0, dtype=np.int64)
+
+        candidate_ids, candidate_distances = [], []
+        if self.tree is not None and self.alive.any():
+            ids, distances = self._tree_neighbours(queries, k, excluded)
+            candidate_ids.append(ids)
+            candidate_distances.append(distances)
+
+        if len(self.delta_ids):
+            keep = ~np.isin(self.delta_ids, excluded)
+            delta_distances = np.sqrt(_squared_distances(queries, self.delta_vectors[keep]))
+            candidate_ids.append(np.tile(self.delta_ids[keep], len(queries)))
+            candidate_distances.append(delta_distances.ravel())
+
+        if not candidate_ids:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+
+        ids = np.concatenate(candidate_ids)
+        distances = np.concatenate(candidate_distances)
+        # Keep each customer's distance to its nearest seed, then the k closest customers
+        order = np.lexsort((distances, ids))
+        ids, distances = ids[order], distances[order]
+        first = np.ones(len(ids), dtype=bool)
+        first[1:] = ids[1:] != ids[:-1]
+        ids, distances = ids[first], distances[first]
+        top = np.argsort(distances, kind="stable")[:k]
+        return ids[top], distances[top]
+
+    def save(self, path=LOOKALIKE_INDEX_PATH):
+        # Plain state rather than the instance, so loading does not depend on
+        # which module (a script's __main__ or an import) defined the class
+        state = {name: getattr(self, name) for name in self.STATE}
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(partial, "wb") as file:
+                pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(partial, path)
+        finally:
+            partial.unlink(missing_ok=True)
+
+    @classmethod
+    def load(cls, path=LOOKALIKE_INDEX_PATH):
+        with open(path, "rb") as file:
+            state = pickle.load(file)
+        index = cls(state["tree_type"], state["leaf_size"], state["model_version"])
+        for name in cls.STATE:
+            setattr(index, name, state[name])
+        return index
+
+
+def brute_force_query(ids, vectors, seed_ids, k=10, exclude_seeds=True):
+    """Reference lookalike search that scans every customer."""
+    ids = np.asarray(ids, dtype=np.int64)
+    seed_ids = np.unique(np.asarray(seed_ids, dtype=np.int64))
+    seed_vectors = vectors[np.isin(ids, seed_ids)]
+    distances = np.sqrt(_squared_distances(seed_vectors, vectors)).min(axis=0)
+    if exclude_seeds:
+        distances[np.isin(ids, seed_ids)] = np.inf
+    top = np.argsort(distances, kind="stable")[:k]
+    return ids[top], distances[top]
+
+
+def main():
+    """Print the customers most similar to the given seed customers."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("seeds", nargs="+", type=int, help="seed customer ids")
+    parser.add_argument("--k", type=int, default=20, help="number of lookalikes to return")
+    args = parser.parse_args()
+
+    if not LOOKALIKE_INDEX_PATH.exists():
+        print(f"No lookalike index at {LOOKALIKE_INDEX_PATH}. Run ex05/Clustering.py once first.")
+        return 1
+
+    index = LookalikeIndex.load()
+    try:
+        ids, distances = index.query(args.seeds, args.k)
+    except KeyError as e:
+        print(f"✗ {e.args[0]}")
+        return 1
+
+    print(f"Top {len(ids)} lookalikes of {len(args.seeds)} seed customers ({len(index):,} indexed):")
+    for rank, (customer_id, distance) in enumerate(zip(ids, distances), start=1):
+        print(f"  {rank:>3}. customer {customer_id}  distance {distance:.4f}")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        sys.exit(1)
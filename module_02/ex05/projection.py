@@ -0,0 +1,199 @@
+"""Chunked PCA projection engine for the customer cluster visualization."""
+
+import hashlib
+import os
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_CHUNK_SIZE = 100_000
+CACHE_DIR = Path(__file__).parent / ".cache"
+PROJECTION_METHODS = ("incremental", "randomized")
+
+
+def iter_chunks(features, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield consecutive row blocks of a 2D array as views, without copying."""
+    for start in range(0, len(features), chunk_size):
+        yield features[start : start + chunk_size]
+
+
+def fingerprint_features(features, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Hash a feature matrix chunk by chunk so cached fits can be matched to their data."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(features.shape).encode())
+    for chunk in iter_chunks(features, chunk_size):
+        digest.update(np.ascontiguousarray(chunk, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+class ProjectionEngine:
+    """Standardize-then-PCA projection that is fitted once and reused across runs.
+
+    The scaler statistics and principal axes are folded into a single affine map,
+    so projecting a chunk is one matrix product and no scaled copy of the full
+    feature matrix is ever materialized.
+    """
+
+    def __init__(
+        self,
+        n_components=2,
+        method="incremental",
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        random_state=42,
+    ):
+        if method not in PROJECTION_METHODS:
+            raise ValueError(
+                f"Unknown projection method '{method}', expected one of {PROJECTION_METHODS}"
+            )
+        if chunk_size < n_components:
+            raise ValueError("chunk_size must be at least n_components")
+
+        self.n_components = n_components
+        self.method = method
+        self.chunk_size = chunk_size
+        self.random_state = random_state
+
+        self.scaler_mean_ = None
+        self.scaler_scale_ = None
+        self.pca_mean_ = None
+        self.components_ = None
+        self.explained_variance_ratio_ = None
+        self.fingerprint_ = None
+
+    @property
+    def is_fitted(self):
+        return self.components_ is not None
+
+    def fit(self, features):
+        """Fit scaler statistics and principal axes over the feature matrix in chunks."""
+        # sklearn is only needed for fitting; loading a cached projection skips it
+        from sklearn.decomposition import PCA, IncrementalPCA
+        from sklearn.preprocessing import StandardScaler
+
+        features = np.asarray(features, dtype=np.float64)
+        if len(features) < self.n_components:
+            raise ValueError("Not enough rows to fit the projection")
+
+        scaler = StandardScaler()
+        for chunk in iter_chunks(features, self.chunk_size):
+            scaler.partial_fit(chunk)
+
+        if self.method == "incremental":
+            pca = IncrementalPCA(n_components=self.n_components)
+            for chunk in iter_chunks(features, self.chunk_size):
+                pca.partial_fit(scaler.transform(chunk))
+        else:
+            # Randomized SVD is fitted on an evenly strided sample of at most one
+            # chunk, which keeps memory bounded regardless of the customer count.
+            step = max(1, -(-len(features) // self.chunk_size))
+            pca = PCA(
+                n_components=self.n_components,
+                svd_solver="randomized",
+                random_state=self.random_state,
+            )
+            pca.fit(scaler.transform(features[::step]))
+
+        self.scaler_mean_ = scaler.mean_
+        self.scaler_scale_ = scaler.scale_
+        self.pca_mean_ = pca.mean_
+        self.components_ = pca.components_
+        self.explained_variance_ratio_ = pca.explained_variance_ratio_
+        self.fingerprint_ = fingerprint_features(features, self.chunk_size)
+        return self
+
+    def _affine_map(self):
+        if not self.is_fitted:
+            raise RuntimeError("ProjectionEngine must be fitted or loaded before use")
+        weights = (self.components_ / self.scaler_scale_).T
+        offset = (self.scaler_mean_ / self.scaler_scale_ + self.pca_mean_) @ self.components_.T
+        return weights, offset
+
+    def transform(self, features):
+        """Project raw (unscaled) features to 2D, one chunk at a time, into a preallocated array."""
+        features = np.asarray(features, dtype=np.float64)
+        weights, offset = self._affine_map()
+        projected = np.empty((len(features), self.n_components), dtype=np.float64)
+
+        for start in range(0, len(features), self.chunk_size):
+            chunk = features[start : start + self.chunk_size]
+            np.matmul(chunk, weights, out=projected[start : start + len(chunk)])
+            projected[start : start + len(chunk)] -= offset
+
+        return projected
+
+    def standardize(self, features):
+        """Scale raw features with the fitted scaler statistics."""
+        if not self.is_fitted:
+            raise RuntimeError("ProjectionEngine must be fitted or loaded before use")
+        return (np.asarray(features) - self.scaler_mean_) / self.scaler_scale_
+
+    def project_scaled(self, scaled_points):
+        """Project points already in standardized space, e.g. KMeans centroids."""
+        if not self.is_fitted:
+            raise RuntimeError("ProjectionEngine must be fitted or loaded before use")
+        return (np.asarray(scaled_points) - self.pca_mean_) @ self.components_.T
+
+    def save(self, path):
+        """Persist the fitted projection so new customers can be projected without refitting."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(partial, "wb") as file:
+                np.savez(
+                    file,
+                    method=self.method,
+                    chunk_size=self.chunk_size,
+                    scaler_mean=self.scaler_mean_,
+                    scaler_scale=self.scaler_scale_,
+                    pca_mean=self.pca_mean_,
+                    components=self.components_,
+                    explained_variance_ratio=self.explained_variance_ratio_,
+                    fingerprint=self.fingerprint_,
+                )
+            os.replace(partial, path)
+        finally:
+            partial.unlink(missing_ok=True)
+
+    @classmethod
+    def load(cls, path):
+        """Restore a projection previously written by save()."""
+        with np.load(path) as stored:
+            engine = cls(
+                n_components=stored["components"].shape[0],
+                method=str(stored["method"]),
+                chunk_size=int(stored["chunk_size"]),
+            )
+            engine.scaler_mean_ = stored["scaler_mean"]
+            engine.scaler_scale_ = stored["scaler_scale"]
+            engine.pca_mean_ = stored["pca_mean"]
+            engine.components_ = stored["components"]
+            engine.explained_variance_ratio_ = stored["explained_variance_ratio"]
+            engine.fingerprint_ = str(stored["fingerprint"])
+        return engine
+
+
+def load_or_fit_projection(features, cache_path, **engine_options):
+    """Reuse the cached projection when it was fitted on identical data, otherwise refit and cache."""
+    features = np.asarray(features, dtype=np.float64)
+    cache_path = Path(cache_path)
+
+    if cache_path.exists():
+        try:
+            engine = ProjectionEngine.load(cache_path)
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable projection cache: {e}")
+        else:
+            method = engine_options.get("method", engine.method)
+            n_components = engine_options.get("n_components", engine.n_components)
+            if (
+                method == engine.method
+                and n_components == engine.n_components
+                and engine.components_.shape[1] == features.shape[1]
+                and engine.fingerprint_ == fingerprint_features(features, engine.chunk_size)
+            ):
+                return engine
+
+    engine = ProjectionEngine(**engine_options).fit(features)
+    engine.save(cache_path)
+    return engine
@@ -0,0 +1,226 @@
+"""In-process customer segment scoring with a small local HTTP front-end.
+
+Usage: uv run module_02/ex05/scoring.py [--host 127.0.0.1] [--port 8765]
+
+POST /score with {"customers": [{"total_purchases": ..., ...}, ...]} (or a
+single customer object) returns each customer's cluster and segment.
+GET /health returns the loaded model version.
+"""
+
+import argparse
+import json
+import sys
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+
+from segmentation import (
+    CLUSTERING_FEATURES,
+    SEGMENT_MODEL_PATH,
+    SEGMENT_NAMES,
+    SegmentModel,
+    compute_segment_thresholds,
+    engagement_features,
+    segment_codes,
+)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Accepted instead of engagement_rate/purchase_intensity, as in the features query
+RAW_ENGAGEMENT_FIELDS = ["active_days", "customer_lifespan_days"]
+
+TOTAL_PURCHASES = CLUSTERING_FEATURES.index("total_purchases")
+TOTAL_SPENT = CLUSTERING_FEATURES.index("total_spent")
+RECENCY = CLUSTERING_FEATURES.index("days_since_last_purchase")
+ENGAGEMENT_RATE = CLUSTERING_FEATURES.index("engagement_rate")
+PURCHASE_INTENSITY = CLUSTERING_FEATURES.index("purchase_intensity")
+
+
+class SegmentScorer:
+    """Scaler, centroids and segment thresholds held as small NumPy arrays.
+
+    Scoring a batch is one affine scaling, one (batch x 6) @ (6 x k) product
+    for the nearest centroid and a handful of vectorized threshold comparisons,
+    so single customers and micro-batches score in microseconds.
+    """
+
+    def __init__(self, scaler_mean, scaler_scale, centers, thresholds, model_version=None):
+        self.mean = np.ascontiguousarray(scaler_mean, dtype=np.float64)
+        self.inv_scale = 1.0 / np.asarray(scaler_scale, dtype=np.float64)
+        self.centers_t = np.ascontiguousarray(np.asarray(centers, dtype=np.float64).T)
+        # ||s - c||^2 = ||s||^2 - 2 s.c + ||c||^2, and ||s||^2 does not change the argmin
+        self.center_norms = (self.centers_t**2).sum(axis=0)
+        self.thresholds = {name: float(value) for name, value in thresholds.items()}
+        self.model_version = model_version
+        # Set by from_model() when the thresholds follow the current date
+        self.model = None
+        self.thresholds_date = None
+
+    @classmethod
+    def from_fit(cls, data, kmeans, scaler, model_version=None):
+        """Build a scorer from the outputs of create_customer_segments."""
+        return cls(
+            scaler.mean_, scaler.scale_, kmeans.cluster_centers_,
+            compute_segment_thresholds(data), model_version,
+        )
+
+    @classmethod
+    def from_model(cls, model, as_of=None):
+        """Build a scorer from a persisted SegmentModel, thresholds as of a date.
+
+        Without a date, the recency threshold depends on today's date, so the
+        thresholds are recomputed from the model whenever the date changes.
+        """
+        today = date.today()
+        scorer = cls(
+            model.scaler_mean, model.scaler_scale, model.centers,
+            model.thresholds(as_of or today), model.model_version,
+        )
+        if as_of is None:
+            scorer.model, scorer.thresholds_date = model, today
+        return scorer
+
+    @classmethod
+    def load(cls, path=SEGMENT_MODEL_PATH):
+        return cls.from_model(SegmentModel.load(path))
+
+    def current_thresholds(self):
+        """Segment thresholds for today, refreshed on the first request of each new day."""
+        if self.model is None:
+            return self.thresholds
+        today = date.today()
+        if today == self.thresholds_date:
+            return self.thresholds
+        # Concurrent requests may both recompute; each gets a complete dict
+        thresholds = {name: float(value) for name, value in self.model.thresholds(today).items()}
+        self.thresholds, self.thresholds_date = thresholds, today
+        return thresholds
+
+    def score(self, features):
+        """Return (cluster, segment code) arrays for an (n, 6) CLUSTERING_FEATURES matrix."""
+        features = np.asarray(features, dtype=np.float64)
+        if features.ndim == 1:
+            features = features[None, :]
+
+        # Missing values count as 0 for clustering, as in create_customer_segments
+        scaled = (np.nan_to_num(features) - self.mean) * self.inv_scale
+        clusters = (self.center_norms - 2.0 * (scaled @ self.centers_t)).argmin(axis=1)
+
+        codes = segment_codes(
+            features[:, TOTAL_SPENT],
+            features[:, TOTAL_PURCHASES],
+            features[:, RECENCY],
+            self.current_thresholds(),
+        )
+        return clusters, codes
+
+    def score_records(self, records):
+        """Score a list of customer dicts; returns a list of result dicts."""
+        clusters, codes = self.score(records_to_features(records))
+        return [
+            {
+                "customer_id": record.get("customer_id"),
+                "cluster": int(cluster),
+                "segment": str(SEGMENT_NAMES[code]),
+            }
+            for record, cluster, code in zip(records, clusters, codes)
+        ]
+
+
+def records_to_features(records):
+    """Build the (n, 6) feature matrix, deriving engagement features when absent."""
+    fields = CLUSTERING_FEATURES + RAW_ENGAGEMENT_FIELDS
+    rows = np.array(
+        [[record.get(field) for field in fields] for record in records], dtype=np.float64
+    )
+    if rows.size == 0:
+        return rows.reshape(0, len(CLUSTERING_FEATURES))
+
+    derive = np.isnan(rows[:, ENGAGEMENT_RATE]) | np.isnan(rows[:, PURCHASE_INTENSITY])
+    if derive.any():
+        active_days = rows[derive, len(CLUSTERING_FEATURES)]
+        lifespan = rows[derive, len(CLUSTERING_FEATURES) + 1]
+        rate, intensity = engagement_features(rows[derive, TOTAL_PURCHASES], active_days, lifespan)
+        rows[derive, ENGAGEMENT_RATE] = rate
+        rows[derive, PURCHASE_INTENSITY] = intensity
+    return rows[:, : len(CLUSTERING_FEATURES)]
+
+
+class ScoringRequestHandler(BaseHTTPRequestHandler):
+    """JSON endpoints around a shared SegmentScorer."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; with Nagle on, keep-alive
+    # requests stall on the client's delayed ACK for ~40 ms each
+    disable_nagle_algorithm = True
+    scorer = None
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != "/health":
+            self._send_json(404, {"error": "not found"})
+            return
+        self._send_json(200, {"status": "ok", "model_version": self.scorer.model_version})
+
+    def do_POST(self):
+        if self.path != "/score":
+            self._send_json(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length))
+            records = payload["customers"] if "customers" in payload else [payload]
+            results = self.scorer.score_records(records)
+        except (ValueError, TypeError, KeyError, AttributeError) as e:
+            self._send_json(400, {"error": f"invalid request: {e}"})
+            return
+        self._send_json(200, {"model_version": self.scorer.model_version, "results": results})
+
+    def log_message(self, format, *args):
+        # Per-request access logs would dominate the latency being served
+        pass
+
+
+def make_server(scorer, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """Create (but do not start) a threaded HTTP server bound to the scorer."""
+    handler = type("BoundScoringRequestHandler", (ScoringRequestHandler,), {"scorer": scorer})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    """Serve segment scores from the model saved by the last full Clustering.py run."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--model", type=Path, default=SEGMENT_MODEL_PATH)
+    args = parser.parse_args()
+
+    if not args.model.exists():
+        print(f"No segment model at {args.model}. Run ex05/Clustering.py once first.")
+        return 1
+
+    scorer = SegmentScorer.load(args.model)
+    server = make_server(scorer, args.host, args.port)
+    print(f"Scoring segments with model {scorer.model_version} on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        sys.exit(0)
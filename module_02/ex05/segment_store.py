@@ -0,0 +1,156 @@
+"""Bulk write-back of customer segments to Postgres with streamed COPY."""
+
+import hashlib
+import io
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+import numpy as np
+
+from common.db import get_db_engine
+
+SEGMENTS_TABLE = "customer_segments"
+DEFAULT_BATCH_SIZE = 100_000
+
+
+@dataclass
+class WriteReport:
+    rows: int
+    batches: int
+    copy_time: float
+    elapsed: float
+
+    @property
+    def rows_per_sec(self):
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def model_version_for(kmeans):
+    """Identify a fitted KMeans model by its cluster count and centroids."""
+    centers = np.ascontiguousarray(kmeans.cluster_centers_, dtype=np.float64)
+    digest = hashlib.blake2b(centers.tobytes(), digest_size=6).hexdigest()
+    return f"kmeans-k{kmeans.n_clusters}-{digest}"
+
+
+def segment_table_ddl(table, feature_columns):
+    """CREATE TABLE statement for a segments table with one column per feature."""
+    feature_ddl = "".join(f"    {column} DOUBLE PRECISION,\n" for column in feature_columns)
+    return (
+        f"CREATE TABLE {table} (\n"
+        "    customer_id BIGINT NOT NULL,\n"
+        "    cluster SMALLINT NOT NULL,\n"
+        "    customer_segment TEXT NOT NULL,\n"
+        f"{feature_ddl}"
+        "    model_version TEXT NOT NULL,\n"
+        "    scored_at TIMESTAMPTZ NOT NULL DEFAULT now()\n"
+        ")"
+    )
+
+
+def iter_copy_batches(frame, batch_size=DEFAULT_BATCH_SIZE):
+    """Yield (row count, CSV buffer) pairs ready for COPY FROM STDIN."""
+    for start in range(0, len(frame), batch_size):
+        batch = frame.iloc[start : start + batch_size]
+        buffer = io.StringIO()
+        # Missing feature values become empty fields, which COPY reads as NULL
+        batch.to_csv(buffer, header=False, index=False)
+        buffer.seek(0)
+        yield len(batch), buffer
+
+
+@contextmanager
+def _transaction(engine=None):
+    """Yield a raw DB-API cursor inside one transaction, committed on success."""
+    own_engine = engine is None
+    engine = engine or get_db_engine()
+    connection = engine.raw_connection()
+    try:
+        with connection.cursor() as cursor:
+            yield cursor
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+        if own_engine:
+            engine.dispose()
+
+
+def _segment_frame(data, feature_columns, model_version):
+    columns = ["customer_id", "cluster", "customer_segment", *feature_columns]
+    return data[columns].assign(model_version=model_version)
+
+
+def _copy_frame(cursor, table, frame, batch_size):
+    """Stream a frame into a table with COPY; returns (rows, batches)."""
+    copy_sql = f"COPY {table} ({', '.join(frame.columns)}) FROM STDIN WITH (FORMAT csv)"
+    rows = batches = 0
+    for batch_rows, buffer in iter_copy_batches(frame, batch_size):
+        cursor.copy_expert(copy_sql, buffer)
+        rows += batch_rows
+        batches += 1
+    return rows, batches
+
+
+def write_segments(data, feature_columns, model_version, engine=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Replace the customer_segments table with the given segmentation.
+
+    Rows are streamed into a staging table with COPY in batches, indexed after
+    the load, then swapped in for the live table in the same transaction, so
+    readers see either the previous segmentation or the new one, never a mix.
+    """
+    frame = _segment_frame(data, feature_columns, model_version)
+    staging = f"{SEGMENTS_TABLE}_staging"
+
+    start = time.perf_counter()
+    with _transaction(engine) as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {staging}")
+        cursor.execute(segment_table_ddl(staging, feature_columns))
+
+        copy_start = time.perf_counter()
+        rows, batches = _copy_frame(cursor, staging, frame, batch_size)
+        copy_time = time.perf_counter() - copy_start
+
+        # Building the indexes once after the load is cheaper than maintaining them per row
+        cursor.execute(f"ALTER TABLE {staging} ADD CONSTRAINT {staging}_pkey PRIMARY KEY (customer_id)")
+        cursor.execute(f"CREATE INDEX {staging}_segment_idx ON {staging} (customer_segment)")
+
+        cursor.execute(f"DROP TABLE IF EXISTS {SEGMENTS_TABLE}")
+        cursor.execute(f"ALTER TABLE {staging} RENAME TO {SEGMENTS_TABLE}")
+        cursor.execute(f"ALTER INDEX {staging}_pkey RENAME TO {SEGMENTS_TABLE}_pkey")
+        cursor.execute(f"ALTER INDEX {staging}_segment_idx RENAME TO {SEGMENTS_TABLE}_segment_idx")
+
+    return WriteReport(rows, batches, copy_time, time.perf_counter() - start)
+
+
+def upsert_segments(data, feature_columns, model_version, engine=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Insert or update only the given customers' rows in customer_segments.
+
+    The rows are COPYed into a temporary table and merged with a single
+    INSERT ... ON CONFLICT, so an incremental refresh rewrites only the
+    changed customers and leaves every other row untouched.
+    """
+    frame = _segment_frame(data, feature_columns, model_version)
+    changes = f"{SEGMENTS_TABLE}_changes"
+    columns = ", ".join(frame.columns)
+    assignments = ", ".join(
+        f"{column} = EXCLUDED.{column}" for column in frame.columns if column != "customer_id"
+    )
+
+    start = time.perf_counter()
+    with _transaction(engine) as cursor:
+        cursor.execute(
+            f"CREATE TEMP TABLE {changes} (LIKE {SEGMENTS_TABLE} INCLUDING DEFAULTS) ON COMMIT DROP"
+        )
+        copy_start = time.perf_counter()
+        rows, batches = _copy_frame(cursor, changes, frame, batch_size)
+        copy_time = time.perf_counter() - copy_start
+
+        cursor.execute(
+            f"INSERT INTO {SEGMENTS_TABLE} ({columns}) SELECT {columns} FROM {changes} "
+            f"ON CONFLICT (customer_id) DO UPDATE SET {assignments}, scored_at = now()"
+        )
+
+    return WriteReport(rows, batches, copy_time, time.perf_counter() - start)
@@ -0,0 +1,318 @@
+"""Segment rules, streaming threshold estimates and the persisted model for incremental refreshes."""
+
+import json
+import math
+import os
+
+import numpy as np
+
+from projection import CACHE_DIR
+
+# RFM-like features the segmentation model is fitted on
+CLUSTERING_FEATURES = [
+    "total_purchases",
+    "total_spent",
+    "avg_purchase_value",
+    "days_since_last_purchase",
+    "engagement_rate",
+    "purchase_intensity",
+]
+
+SEGMENT_QUANTILES = {
+    "spending_high": ("total_spent", 0.8),
+    "spending_med": ("total_spent", 0.5),
+    "frequency_high": ("total_purchases", 0.8),
+    "frequency_med": ("total_purchases", 0.5),
+    "frequency_low": ("total_purchases", 0.3),
+    "recency_recent": ("days_since_last_purchase", 0.2),
+    "recency_old": ("days_since_last_purchase", 0.8),
+}
+
+SEGMENT_MODEL_PATH = CACHE_DIR / "segment_model.npz"
+EPOCH = np.datetime64("1970-01-01", "D")
+
+# Segment code -> name; the codes follow the order the rules are checked in
+SEGMENT_NAMES = np.array(
+    [
+        "Platinum Customer",
+        "Gold Customer",
+        "Silver Customer",
+        "New Customer",
+        "Inactive Customer",
+        "Regular Customer",
+    ]
+)
+
+
+def compute_segment_thresholds(data):
+    """Exact percentile thresholds over the full customer base."""
+    return {
+        name: data[column].quantile(q) for name, (column, q) in SEGMENT_QUANTILES.items()
+    }
+
+
+def engagement_features(total_purchases, active_days, customer_lifespan_days):
+    """Engagement rate and purchase intensity, vectorized over customers."""
+    total_purchases = np.asarray(total_purchases, dtype=np.float64)
+    active_days = np.asarray(active_days, dtype=np.float64)
+    lifespan = np.asarray(customer_lifespan_days, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        engagement_rate = np.where(lifespan > 0, active_days / lifespan, 1.0)
+        purchase_intensity = np.where(active_days > 0, total_purchases / active_days, total_purchases)
+    return engagement_rate, purchase_intensity
+
+
+def segment_codes(spending, frequency, recency, thresholds):
+    """Apply the business segment rules to arrays of customers; returns SEGMENT_NAMES codes."""
+    high_spending = spending >= thresholds["spending_high"]
+    high_frequency = frequency >= thresholds["frequency_high"]
+    recent = recency <= thresholds["recency_recent"]
+
+    # np.select picks the first matching rule, like the original if/elif chain
+    conditions = [
+        # Platinum: High spending + High frequency + Recent activity
+        high_spending & high_frequency & recent,
+        # Gold: High spending OR High frequency + Medium recency
+        (high_spending | high_frequency) & (recency <= thresholds["recency_old"]),
+        # Silver: Medium spending + Medium frequency
+        (spending >= thresholds["spending_med"]) & (frequency >= thresholds["frequency_med"]),
+        # New customers: Low frequency but recent activity
+        (frequency <= thresholds["frequency_low"]) & recent,
+        # Inactive: Old recency (haven't purchased in a while)
+        recency >= thresholds["recency_old"],
+    ]
+    # Regular: Everyone else
+    return np.select(conditions, range(len(conditions)), default=len(conditions))
+
+
+def assign_customer_segments(data, thresholds):
+    """Segment of every customer in a features DataFrame, as a categorical."""
+    import pandas as pd
+
+    codes = segment_codes(
+        data["total_spent"].to_numpy(dtype=np.float64),
+        data["total_purchases"].to_numpy(dtype=np.float64),
+        data["days_since_last_purchase"].to_numpy(dtype=np.float64),
+        thresholds,
+    )
+    return pd.Categorical.from_codes(codes, categories=SEGMENT_NAMES)
+
+
+def day_numbers(dates):
+    """Convert a column of dates to days since the Unix epoch (NaN where missing).
+
+    Columns already holding day numbers (see customer_frame) pass through.
+    """
+    import pandas as pd
+
+    dates = pd.Series(dates)
+    if pd.api.types.is_numeric_dtype(dates):
+        return dates.to_numpy(dtype=np.float64)
+    days = pd.to_datetime(dates).to_numpy(dtype="datetime64[D]")
+    return np.where(np.isnat(days), np.nan, (days - EPOCH).astype(np.int64))
+
+
+class IntegerHistogram:
+    """Exact counts of integer values that supports removals.
+
+    Quantiles use the same linear interpolation as pandas, so thresholds over
+    integer metrics (purchase counts, purchase days) match a full recompute.
+    """
+
+    def __init__(self, counts=None, offset=0):
+        self.counts = np.zeros(0, dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+        self.offset = int(offset)
+
+    @property
+    def count(self):
+        return int(self.counts.sum())
+
+    def _grow(self, low, high):
+        if len(self.counts) == 0:
+            self.offset = low
+            self.counts = np.zeros(high - low + 1, dtype=np.int64)
+            return
+        new_offset = min(low, self.offset)
+        new_end = max(high, self.offset + len(self.counts) - 1)
+        if new_offset == self.offset and new_end == self.offset + len(self.counts) - 1:
+            return
+        counts = np.zeros(new_end - new_offset + 1, dtype=np.int64)
+        counts[self.offset - new_offset : self.offset - new_offset + len(self.counts)] = self.counts
+        self.counts, self.offset = counts, new_offset
+
+    def update(self, values, weight=1):
+        """Add (weight=1) or remove (weight=-1) a batch of values; NaNs are ignored."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)].astype(np.int64)
+        if len(values) == 0:
+            return
+        self._grow(int(values.min()), int(values.max()))
+        counts = self.counts + weight * np.bincount(values - self.offset, minlength=len(self.counts))
+        # Checked before assigning, so a bad removal leaves the histogram unchanged
+        if (counts < 0).any():
+            raise ValueError("Removed values that were never added to the histogram")
+        self.counts = counts
+
+    def quantile(self, q):
+        total = self.count
+        if total == 0:
+            return math.nan
+        rank = q * (total - 1)
+        cumulative = np.cumsum(self.counts)
+        lower = np.searchsorted(cumulative, math.floor(rank), side="right") + self.offset
+        upper = np.searchsorted(cumulative, math.ceil(rank), side="right") + self.offset
+        return lower + (upper - lower) * (rank - math.floor(rank))
+
+
+class QuantileSketch:
+    """Log-bucketed quantile sketch for positive values that supports removals.
+
+    Every estimate is within relative_accuracy of a value ranked at the
+    requested quantile (the DDSketch bucketing), using one counter per bucket
+    regardless of how many customers are tracked.
+    """
+
+    def __init__(self, relative_accuracy=0.01, counts=None, offset=0, zero_count=0):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.buckets = IntegerHistogram(counts, offset)
+        self.zero_count = int(zero_count)
+
+    @property
+    def count(self):
+        return self.buckets.count + self.zero_count
+
+    def update(self, values, weight=1):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        positive = values > 0
+        zero_count = self.zero_count + weight * int((~positive).sum())
+        if zero_count < 0:
+            raise ValueError("Removed values that were never added to the sketch")
+        self.buckets.update(np.ceil(np.log(values[positive]) / math.log(self.gamma)), weight)
+        self.zero_count = zero_count
+
+    def quantile(self, q):
+        total = self.count
+        if total == 0:
+            return math.nan
+        rank = q * (total - 1)
+        if rank < self.zero_count:
+            return 0.0
+        cumulative = np.cumsum(self.buckets.counts)
+        index = np.searchsorted(cumulative, rank - self.zero_count, side="right") + self.buckets.offset
+        return 2 * self.gamma**index / (self.gamma + 1)
+
+
+class SegmentModel:
+    """Fitted scaler, centroids and threshold distributions from the last segmentation.
+
+    Saved next to the projection cache so an incremental run can re-score
+    changed customers without refitting or re-reading the whole customer base.
+    """
+
+    def __init__(self, scaler_mean, scaler_scale, centers, model_version, watermark,
+                 spent_sketch, purchases_histogram, last_day_histogram):
+        import pandas as pd
+
+        self.scaler_mean = np.asarray(scaler_mean, dtype=np.float64)
+        self.scaler_scale = np.asarray(scaler_scale, dtype=np.float64)
+        self.centers = np.asarray(centers, dtype=np.float64)
+        self.model_version = model_version
+        self.watermark = pd.Timestamp(watermark)
+        self.spent_sketch = spent_sketch
+        self.purchases_histogram = purchases_histogram
+        self.last_day_histogram = last_day_histogram
+
+    @classmethod
+    def from_fit(cls, data, scaler, kmeans, model_version, watermark):
+        model = cls(
+            scaler.mean_, scaler.scale_, kmeans.cluster_centers_, model_version, watermark,
+            QuantileSketch(), IntegerHistogram(), IntegerHistogram(),
+        )
+        model.spent_sketch.update(data["total_spent"])
+        model.purchases_histogram.update(data["total_purchases"])
+        model.last_day_histogram.update(day_numbers(data["last_purchase_date"]))
+        return model
+
+    def scale(self, data):
+        """Customers' clustering features in the fitted scaled space."""
+        features = data[CLUSTERING_FEATURES].fillna(0).to_numpy(dtype=np.float64)
+        return (features - self.scaler_mean) / self.scaler_scale
+
+    def predict(self, data):
+        """Nearest-centroid cluster for each customer, in the fitted scaled space."""
+        scaled = self.scale(data)
+        distances = ((scaled[:, None, :] - self.centers[None, :, :]) ** 2).sum(axis=2)
+        return distances.argmin(axis=1)
+
+    def update_distributions(self, changed):
+        """Replace changed customers' previous values with their current ones."""
+        returning = changed["previous_purchases"].fillna(0) > 0
+        previous = changed[returning]
+        self.spent_sketch.update(previous["previous_spent"], weight=-1)
+        self.purchases_histogram.update(previous["previous_purchases"], weight=-1)
+        self.last_day_histogram.update(day_numbers(previous["previous_last_purchase_date"]), weight=-1)
+
+        self.spent_sketch.update(changed["total_spent"])
+        self.purchases_histogram.update(changed["total_purchases"])
+        self.last_day_histogram.update(day_numbers(changed["last_purchase_date"]))
+
+    def thresholds(self, as_of):
+        """Threshold estimates for segmenting as of the given date."""
+        as_of_day = int((np.datetime64(as_of, "D") - EPOCH).astype(np.int64))
+        quantiles = {
+            "total_spent": self.spent_sketch.quantile,
+            "total_purchases": self.purchases_histogram.quantile,
+            # Recency is today minus the last purchase day, so its q-quantile
+            # is today minus the (1 - q)-quantile of last purchase days
+            "days_since_last_purchase": lambda q: as_of_day - self.last_day_histogram.quantile(1 - q),
+        }
+        return {name: quantiles[column](q) for name, (column, q) in SEGMENT_QUANTILES.items()}
+
+    def save(self, path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        metadata = {
+            "model_version": self.model_version,
+            "watermark": self.watermark.isoformat(),
+            "relative_accuracy": self.spent_sketch.relative_accuracy,
+            "spent_offset": self.spent_sketch.buckets.offset,
+            "spent_zero_count": self.spent_sketch.zero_count,
+            "purchases_offset": self.purchases_histogram.offset,
+            "last_day_offset": self.last_day_histogram.offset,
+        }
+        partial = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(partial, "wb") as file:
+                np.savez(
+                    file,
+                    metadata=np.array(json.dumps(metadata)),
+                    scaler_mean=self.scaler_mean,
+                    scaler_scale=self.scaler_scale,
+                    centers=self.centers,
+                    spent_counts=self.spent_sketch.buckets.counts,
+                    purchases_counts=self.purchases_histogram.counts,
+                    last_day_counts=self.last_day_histogram.counts,
+                )
+            # An --incremental run loading the model sees the old or the new file, never a partial one
+            os.replace(partial, path)
+        finally:
+            partial.unlink(missing_ok=True)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as saved:
+            metadata = json.loads(str(saved["metadata"]))
+            return cls(
+                saved["scaler_mean"],
+                saved["scaler_scale"],
+                saved["centers"],
+                metadata["model_version"],
+                metadata["watermark"],
+                QuantileSketch(
+                    metadata["relative_accuracy"], saved["spent_counts"],
+                    metadata["spent_offset"], metadata["spent_zero_count"],
+                ),
+                IntegerHistogram(saved["purchases_counts"], metadata["purchases_offset"]),
+                IntegerHistogram(saved["last_day_counts"], metadata["last_day_offset"]),
+            )
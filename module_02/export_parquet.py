@@ -0,0 +1,33 @@
+"""Export the customers and items tables to Parquet for the DuckDB backend."""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from common.backends import EXPORT_CHUNK_SIZE, export_to_parquet, get_parquet_path
+
+
+def main():
+    """Stream the warehouse tables out of Postgres into partitioned Parquet."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--output", type=Path, default=get_parquet_path(),
+                        help="export directory (defaults to PARQUET_PATH or DATA_PATH/parquet)")
+    parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    print(f"Exporting customers and items to {args.output}...")
+    start = time.perf_counter()
+    rows = export_to_parquet(args.output, args.chunk_size)
+    elapsed = time.perf_counter() - start
+    print(f"✓ Exported {rows:,} customer rows in {elapsed:.1f}s")
+    print("Select the engine with DASHBOARD_BACKEND=duckdb or --backend duckdb")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit(1)
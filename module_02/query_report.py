@@ -0,0 +1,135 @@
+"""Rank the heaviest queries recorded in the module_02 query log."""
+
+import argparse
+import statistics
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from common import queries
+from common.query_log import get_log_path, query_hash, read_log
+
+SORT_KEYS = {
+    "total": "total_ms",
+    "p95": "p95_ms",
+    "bytes": "mean_bytes",
+    "rows": "mean_rows",
+    "count": "count",
+}
+
+
+def known_query_names():
+    """Map the hashes of the SQL constants in common/queries.py to their names."""
+    names = {}
+    for name, value in vars(queries).items():
+        if name.endswith("_QUERY") and isinstance(value, str):
+            names[query_hash(value)] = name.removesuffix("_QUERY").lower()
+    return names
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def summarize(records):
+    """Aggregate log records per (backend, query hash)."""
+    groups = defaultdict(list)
+    for record in records:
+        groups[(record["backend"], record["query_hash"])].append(record)
+
+    summaries = []
+    for (backend, digest), group in groups.items():
+        latencies = [record["latency_ms"] for record in group]
+        rows = [record["rows"] for record in group if record.get("rows") is not None]
+        payloads = [record["payload_bytes"] for record in group if record.get("payload_bytes") is not None]
+        plans = [record["plan"] for record in group if record.get("plan")]
+        summaries.append(
+            {
+                "backend": backend,
+                "query_hash": digest,
+                "query": group[-1]["query"],
+                "scripts": sorted({record["script"] for record in group}),
+                "count": len(group),
+                "total_ms": sum(latencies),
+                "p50_ms": statistics.median(latencies),
+                "p95_ms": percentile(latencies, 0.95),
+                "mean_rows": statistics.fmean(rows) if rows else 0,
+                "mean_bytes": statistics.fmean(payloads) if payloads else 0,
+                "plan": plans[-1] if plans else None,
+            }
+        )
+    return summaries
+
+
+def format_bytes(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:,.0f} {unit}" if unit == "B" else f"{size:,.1f} {unit}"
+        size /= 1024
+
+
+def print_summary(summaries, top, sort):
+    names = known_query_names()
+    ranked = sorted(summaries, key=lambda summary: summary[SORT_KEYS[sort]], reverse=True)[:top]
+
+    print(f"{'#':>3}  {'query':<28}{'backend':<10}{'runs':>6}{'total ms':>12}{'p50 ms':>10}"
+          f"{'p95 ms':>10}{'rows':>12}{'payload':>12}")
+    for rank, summary in enumerate(ranked, start=1):
+        label = names.get(summary["query_hash"], summary["query_hash"])
+        print(
+            f"{rank:>3}  {label:<28.28}{summary['backend']:<10}{summary['count']:>6}"
+            f"{summary['total_ms']:>12,.1f}{summary['p50_ms']:>10,.1f}{summary['p95_ms']:>10,.1f}"
+            f"{summary['mean_rows']:>12,.0f}{format_bytes(summary['mean_bytes']):>12}"
+        )
+
+    for rank, summary in enumerate(ranked, start=1):
+        plan = summary["plan"]
+        print(f"\n{rank:>3}. {summary['query']}")
+        print(f"     scripts: {', '.join(summary['scripts'])}")
+        if plan is None:
+            continue
+        if "error" in plan:
+            print(f"     plan: EXPLAIN failed ({plan['error']})")
+            continue
+        print(
+            f"     plan: {plan['node']}, executed in {plan['execution_ms']:.1f} ms, "
+            f"shared buffers hit {plan['shared_hit_blocks']:,} / read {plan['shared_read_blocks']:,}, "
+            f"temp written {plan['temp_written_blocks'] or 0:,}"
+        )
+
+
+def main():
+    """Summarize the query log, heaviest queries first."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--log", type=Path, default=get_log_path(), help="query log to read")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--sort", choices=SORT_KEYS, default="total", help="ranking criterion")
+    parser.add_argument("--script", help="only queries run by this script (e.g. dashboard)")
+    parser.add_argument("--clear", action="store_true", help="delete the log after reporting")
+    args = parser.parse_args()
+
+    records = [
+        record for record in read_log(args.log)
+        if args.script is None or record.get("script") == args.script
+    ]
+    if not records:
+        print(f"No queries logged in {args.log}. Run a module_02 script first.")
+        return 1
+
+    print(f"{len(records):,} queries logged in {args.log}\n")
+    print_summary(summarize(records), args.top, args.sort)
+
+    if args.clear:
+        args.log.unlink()
+        print(f"\n✓ Cleared {args.log}")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        sys.exit(1)
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The ex05 scripts import their sibling helpers (projection, segmentation) by plain name
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "ex05"))
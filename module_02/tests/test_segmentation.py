@@ -0,0 +1,108 @@
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from segmentation import IntegerHistogram, QuantileSketch, SegmentModel, compute_segment_thresholds
+
+QUANTILES = [0.0, 0.1, 0.2, 0.3, 0.5, 0.8, 0.95, 1.0]
+
+
+@pytest.fixture
+def purchases():
+    """Purchase counts of every customer, the customers that change and their new counts."""
+    rng = np.random.default_rng(0)
+    counts = rng.geometric(0.2, 5000)
+    changed = rng.choice(len(counts), 600, replace=False)
+    return counts, changed, counts[changed] + rng.integers(1, 5, len(changed))
+
+
+def test_integer_histogram_matches_pandas_after_add_and_remove(purchases):
+    counts, changed, new_counts = purchases
+    histogram = IntegerHistogram()
+    histogram.update(counts)
+
+    histogram.update(counts[changed], weight=-1)
+    histogram.update(new_counts)
+
+    remaining = counts.copy()
+    remaining[changed] = new_counts
+    for q in QUANTILES:
+        assert histogram.quantile(q) == pytest.approx(pd.Series(remaining).quantile(q))
+
+
+def test_quantile_sketch_is_within_relative_accuracy_after_add_and_remove():
+    rng = np.random.default_rng(1)
+    spent = np.round(rng.lognormal(4, 1.2, 5000), 2)
+    spent[:50] = 0
+    changed = rng.choice(len(spent), 600, replace=False)
+    new_spent = spent[changed] + rng.uniform(1, 200, len(changed))
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    sketch.update(spent)
+
+    sketch.update(spent[changed], weight=-1)
+    sketch.update(new_spent)
+
+    remaining = spent.copy()
+    remaining[changed] = new_spent
+    assert sketch.count == len(remaining)
+    for q in QUANTILES:
+        expected = pd.Series(remaining).quantile(q)
+        assert sketch.quantile(q) == pytest.approx(expected, rel=0.02, abs=1e-12)
+
+
+@pytest.mark.parametrize("structure", [IntegerHistogram, QuantileSketch])
+def test_bad_removal_leaves_the_counts_unchanged(structure):
+    values = np.array([0.0, 1.0, 2.0, 2.0, 3.0])
+    distribution = structure()
+    distribution.update(values)
+    before = [distribution.quantile(q) for q in QUANTILES]
+
+    with pytest.raises(ValueError, match="never added"):
+        distribution.update([0.0, 0.0, 2.0, 7.0], weight=-1)
+
+    assert distribution.count == len(values)
+    assert [distribution.quantile(q) for q in QUANTILES] == before
+
+
+def customers(rng, ids, as_of):
+    total_purchases = rng.geometric(0.3, len(ids))
+    last_purchase = [as_of - timedelta(days=int(days)) for days in rng.integers(0, 150, len(ids))]
+    return pd.DataFrame(
+        {
+            "customer_id": ids,
+            "total_purchases": total_purchases,
+            "total_spent": np.round(total_purchases * rng.lognormal(3, 0.5, len(ids)), 2),
+            "last_purchase_date": last_purchase,
+            "days_since_last_purchase": [(as_of - day).days for day in last_purchase],
+        }
+    )
+
+
+def test_incremental_thresholds_match_a_full_recompute(tmp_path):
+    rng = np.random.default_rng(2)
+    as_of = date(2023, 3, 1)
+    data = customers(rng, np.arange(3000), as_of)
+    fit = SimpleNamespace(mean_=np.zeros(6), scale_=np.ones(6), cluster_centers_=np.zeros((3, 6)))
+    model = SegmentModel.from_fit(data, fit, fit, "v1", "2023-02-01")
+    model.save(tmp_path / "segment_model.npz")
+    model = SegmentModel.load(tmp_path / "segment_model.npz")
+
+    # 400 returning customers with more purchases, and 100 new ones
+    returning = data.sample(400, random_state=0)
+    changed = customers(rng, np.concatenate([returning["customer_id"], np.arange(3000, 3100)]), as_of)
+    changed["total_purchases"] += np.concatenate([returning["total_purchases"], np.zeros(100, dtype=int)])
+    changed["previous_purchases"] = np.concatenate([returning["total_purchases"], np.full(100, np.nan)])
+    changed["previous_spent"] = np.concatenate([returning["total_spent"], np.full(100, np.nan)])
+    changed["previous_last_purchase_date"] = list(returning["last_purchase_date"]) + [None] * 100
+    model.update_distributions(changed)
+
+    current = pd.concat([data.set_index("customer_id").drop(returning["customer_id"]).reset_index(), changed])
+    expected = compute_segment_thresholds(current)
+    thresholds = model.thresholds(as_of)
+    for name in ("frequency_high", "frequency_med", "frequency_low", "recency_recent", "recency_old"):
+        assert thresholds[name] == pytest.approx(expected[name]), name
+    for name in ("spending_high", "spending_med"):
+        assert thresholds[name] == pytest.approx(expected[name], rel=0.02), name
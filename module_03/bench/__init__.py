@@ -0,0 +1 @@
+"""Benchmarks for the module_03 data preparation helpers."""
@@ -0,0 +1,103 @@
+"""Throughput and memory of the streaming train/validation split.
+
+Builds a knight CSV of the requested size by repeating the rows of
+Train_knight.csv, then splits it with common/splitting.py ('hash' and 'exact')
+and with the in-memory pandas approach split.ipynb used before. Reports MB/s
+of source CSV and the tracemalloc peak of each.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+MODULE_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(MODULE_ROOT))
+
+from common.splitting import SPLIT_METHODS, split_csv
+
+DEFAULT_SOURCE = MODULE_ROOT.parent / 'resources' / 'resources' / 'Train_knight.csv'
+DEFAULT_SIZE_MB = 128
+
+
+def build_dataset(source: Path, destination: Path, size_mb: int) -> int:
+    """Write a CSV of at least size_mb MB by repeating the source's rows; return its size."""
+    with open(source, 'rb') as source_file:
+        header = source_file.readline()
+        body = source_file.read()
+    if not body.endswith(b'\n'):
+        body += b'\n'
+    repeats = max(1, -(-size_mb * 2**20 // len(body)))
+    with open(destination, 'wb') as output:
+        output.write(header)
+        for _ in range(repeats):
+            output.write(body)
+    return destination.stat().st_size
+
+
+def pandas_split(source: Path, train_path: Path, validation_path: Path, train_ratio: float = 0.8) -> None:
+    """The previous split.ipynb approach: load everything, shuffle, slice, write."""
+    df = pd.read_csv(source)
+    shuffled = df.sample(frac=1, random_state=42).reset_index(drop=True)
+    split_index = int(len(shuffled) * train_ratio)
+    shuffled[:split_index].to_csv(train_path, index=False)
+    shuffled[split_index:].to_csv(validation_path, index=False)
+
+
+def measure(run, trace_memory: bool) -> tuple[float, int | None]:
+    """Return (seconds, tracemalloc peak bytes or None) of one call."""
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    peak = None
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+def main() -> int:
+    """Split a synthetic knight CSV with each method and report MB/s."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size-mb', type=int, default=DEFAULT_SIZE_MB, help='size of the synthetic CSV')
+    parser.add_argument('--source', type=Path, default=DEFAULT_SOURCE, help='CSV whose rows are repeated')
+    parser.add_argument('--skip-pandas', action='store_true', help='skip the in-memory pandas baseline')
+    args = parser.parse_args()
+
+    if not args.source.exists():
+        print(f"✗ Dataset not found: {args.source}")
+        return 1
+
+    with tempfile.TemporaryDirectory(prefix='knight-split-') as directory:
+        directory = Path(directory)
+        dataset = directory / 'knight.csv'
+        size = build_dataset(args.source, dataset, args.size_mb)
+        train_path, validation_path = directory / 'train.csv', directory / 'validation.csv'
+        print(f"Source: {size / 2**20:,.1f} MB synthetic knight CSV\n")
+
+        runs = {f'stream ({method})': (lambda method=method: split_csv(dataset, train_path, validation_path,
+                                                                         method=method))
+                for method in SPLIT_METHODS}
+        if not args.skip_pandas:
+            runs['pandas in memory'] = lambda: pandas_split(dataset, train_path, validation_path)
+
+        print(f"{'method':<20}{'seconds':>10}{'MB/s':>10}{'peak MB':>10}")
+        for name, run in runs.items():
+            # Timed without tracemalloc, which slows Python-level loops down
+            elapsed, _ = measure(run, trace_memory=False)
+            _, peak = measure(run, trace_memory=True)
+            print(f"{name:<20}{elapsed:>10.2f}{size / 2**20 / elapsed:>10.1f}{peak / 2**20:>10.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        sys.exit(1)
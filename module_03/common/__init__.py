@@ -0,0 +1 @@
+"""Shared helpers for the module_03 notebooks."""
@@ -0,0 +1,248 @@
+"""Cached loader for the knight datasets.
+
+The first load of a CSV parses it into float32 feature columns and a
+categorical ``knight`` column, then saves them as ``.npy`` files in a
+``.cache/`` directory next to the CSV. Later loads memory-map those files
+instead of parsing the CSV again. The cache is rebuilt when the CSV's size or
+content hash changes; a changed mtime with unchanged content only refreshes
+the recorded mtime.
+"""
+
+import hashlib
+import json
+import os
+import sys
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+TARGET_COLUMN = 'knight'
+KNIGHT_CLASSES = ['Jedi', 'Sith']
+FEATURE_DTYPE = np.float32
+CACHE_DIRNAME = '.cache'
+CACHE_VERSION = 1
+# Rows per chunk when the CSV is too large to parse in one pass
+PARSE_CHUNK_ROWS = 1_000_000
+HASH_BLOCK_BYTES = 1 << 20
+
+
+@dataclass(frozen=True)
+class CacheInfo:
+    """Where a dataset's cache lives and whether the last load reused it."""
+
+    csv_path: Path
+    cache_dir: Path
+    reused: bool
+    # Content hash of the CSV, None when it was loaded without the cache
+    digest: str | None = None
+
+
+def cache_dir_for(csv_path: Path) -> Path:
+    """Return the cache directory of a CSV, e.g. ``.cache/Train_knight/`` next to it."""
+    return csv_path.parent / CACHE_DIRNAME / csv_path.stem
+
+
+def file_digest(path: Path) -> str:
+    """Return the BLAKE2b digest of a file's content."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as source:
+        while block := source.read(HASH_BLOCK_BYTES):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source_stamp(csv_path: Path) -> dict:
+    stat = csv_path.stat()
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _read_meta(cache_dir: Path) -> dict | None:
+    try:
+        with open(cache_dir / 'meta.json', encoding='utf-8') as meta_file:
+            meta = json.load(meta_file)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get('version') == CACHE_VERSION else None
+
+
+def _write_meta(cache_dir: Path, meta: dict) -> None:
+    temporary = cache_dir / 'meta.json.tmp'
+    with open(temporary, 'w', encoding='utf-8') as meta_file:
+        json.dump(meta, meta_file, indent=2)
+    os.replace(temporary, cache_dir / 'meta.json')
+
+
+def _save_array(path: Path, array: np.ndarray) -> None:
+    """Write an array beside its final name and rename it into place.
+
+    Frames returned by read_cache() map the previous file; replacing it gives
+    the new data a new inode, so those mappings keep reading the old pages
+    instead of a truncated file.
+    """
+    temporary = path.with_name(path.name + '.tmp')
+    with open(temporary, 'wb') as array_file:
+        np.save(array_file, array)
+    os.replace(temporary, path)
+
+
+def _cache_is_fresh(csv_path: Path, cache_dir: Path, meta: dict | None) -> bool:
+    """Check the cache against the CSV: size and mtime first, content hash if only mtime differs."""
+    if meta is None:
+        return False
+    stamp = _source_stamp(csv_path)
+    if meta['source']['size'] != stamp['size']:
+        return False
+    if meta['source']['mtime_ns'] == stamp['mtime_ns']:
+        return True
+    if file_digest(csv_path) != meta['source']['digest']:
+        return False
+    # Same content with a new mtime (copied or touched): keep the cache
+    meta['source']['mtime_ns'] = stamp['mtime_ns']
+    try:
+        _write_meta(cache_dir, meta)
+    except OSError:
+        pass
+    return True
+
+
+def column_dtypes(csv_path: Path) -> dict:
+    """Return the dtypes a knight CSV is parsed with, read from its header."""
+    columns = pd.read_csv(csv_path, nrows=0).columns
+    dtypes = {column: FEATURE_DTYPE for column in columns if column != TARGET_COLUMN}
+    if TARGET_COLUMN in columns:
+        dtypes[TARGET_COLUMN] = pd.CategoricalDtype(KNIGHT_CLASSES)
+    return dtypes
+
+
+def iter_csv_chunks(filepath: str | Path, chunk_rows: int = PARSE_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    Parse a knight CSV chunk by chunk, with the same dtypes as load_dataset().
+
+    Args:
+        filepath: Path to the CSV file
+        chunk_rows: Rows per chunk
+
+    Yields:
+        DataFrames of at most chunk_rows rows
+
+    Raises:
+        FileNotFoundError: If file doesn't exist
+        ValueError: If a knight label is missing or unknown
+    """
+    csv_path = Path(filepath)
+    if not csv_path.exists():
+        raise FileNotFoundError(f"Dataset not found: {filepath}")
+    with pd.read_csv(csv_path, dtype=column_dtypes(csv_path), chunksize=chunk_rows) as reader:
+        for chunk in reader:
+            if TARGET_COLUMN in chunk.columns and chunk[TARGET_COLUMN].isna().any():
+                raise ValueError(f"Unknown or missing {TARGET_COLUMN} labels in {csv_path}")
+            yield chunk
+
+
+def parse_csv(csv_path: Path) -> pd.DataFrame:
+    """Parse a knight CSV into float32 features and a categorical target."""
+    return pd.concat(iter_csv_chunks(csv_path), ignore_index=True)
+
+
+def write_cache(df: pd.DataFrame, csv_path: Path, digest: str | None = None) -> Path:
+    """Save a parsed dataset as ``.npy`` files in its cache directory.
+
+    Features are stored column-major, so each column is contiguous on disk
+    and the memory-mapped frame can use the array without copying it.
+    """
+    cache_dir = cache_dir_for(csv_path)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    feature_columns = [column for column in df.columns if column != TARGET_COLUMN]
+    stamp = _source_stamp(csv_path)
+
+    features = np.asfortranarray(df[feature_columns].to_numpy(dtype=FEATURE_DTYPE))
+    _save_array(cache_dir / 'features.npy', features)
+    has_target = TARGET_COLUMN in df.columns
+    if has_target:
+        _save_array(cache_dir / 'target.npy', df[TARGET_COLUMN].cat.codes.to_numpy(dtype=np.int8))
+
+    _write_meta(cache_dir, {
+        'version': CACHE_VERSION,
+        'columns': list(df.columns),
+        'feature_columns': feature_columns,
+        'target': TARGET_COLUMN if has_target else None,
+        'classes': KNIGHT_CLASSES,
+        'rows': len(df),
+        'source': {**stamp, 'digest': digest or file_digest(csv_path)},
+    })
+    return cache_dir
+
+
+def read_cache(cache_dir: Path, meta: dict) -> pd.DataFrame:
+    """Build a DataFrame on top of the memory-mapped cache files.
+
+    The files are mapped copy-on-write: edits to the frame stay in memory and
+    never reach the cache.
+    """
+    features = np.load(cache_dir / 'features.npy', mmap_mode='c')
+    df = pd.DataFrame(features, columns=meta['feature_columns'], copy=False)
+    if meta['target'] is not None:
+        codes = np.load(cache_dir / 'target.npy', mmap_mode='c')
+        df[meta['target']] = pd.Categorical.from_codes(codes, categories=meta['classes'])
+    if list(df.columns) != meta['columns']:
+        df = df[meta['columns']]
+    return df
+
+
+def load_dataset_cached(filepath: str | Path, use_cache: bool = True) -> tuple[pd.DataFrame, CacheInfo]:
+    """
+    Load a knight CSV, reusing its binary cache when the CSV is unchanged.
+
+    Args:
+        filepath: Path to the CSV file
+        use_cache: Set to False to parse the CSV without reading or writing the cache
+
+    Returns:
+        Tuple of (DataFrame, CacheInfo)
+
+    Raises:
+        FileNotFoundError: If file doesn't exist
+        pd.errors.ParserError: If file is not valid CSV
+    """
+    csv_path = Path(filepath)
+    if not csv_path.exists():
+        raise FileNotFoundError(f"Dataset not found: {filepath}")
+    cache_dir = cache_dir_for(csv_path)
+
+    if use_cache:
+        meta = _read_meta(cache_dir)
+        if _cache_is_fresh(csv_path, cache_dir, meta):
+            info = CacheInfo(csv_path, cache_dir, reused=True, digest=meta['source']['digest'])
+            return read_cache(cache_dir, meta), info
+
+    if not use_cache:
+        return parse_csv(csv_path), CacheInfo(csv_path, cache_dir, reused=False)
+
+    digest = file_digest(csv_path)
+    df = parse_csv(csv_path)
+    try:
+        write_cache(df, csv_path, digest)
+    except OSError as e:
+        print(f"⚠ Could not write dataset cache {cache_dir}: {e}", file=sys.stderr)
+    return df, CacheInfo(csv_path, cache_dir, reused=False, digest=digest)
+
+
+def load_dataset(filepath: str | Path) -> pd.DataFrame:
+    """
+    Load a knight CSV into float32 features and a categorical 'knight' column.
+
+    Args:
+        filepath: Path to the CSV file
+
+    Returns:
+        DataFrame containing the loaded data
+
+    Raises:
+        FileNotFoundError: If file doesn't exist
+        pd.errors.ParserError: If file is not valid CSV
+    """
+    df, _ = load_dataset_cached(filepath)
+    return df
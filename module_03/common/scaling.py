@@ -0,0 +1,278 @@
+"""Fit/transform scalers for the knight features.
+
+Statistics are fitted once, on the training data, and applied unchanged to
+any other data set. partial_fit() folds in one chunk at a time (means and
+variances with Chan's pairwise update, minima and maxima directly), so a
+scaler can be fitted on a CSV of any size. transform() runs over the whole
+float32 feature matrix at once, in place when asked. transform_csv() scales a
+file chunk by chunk without loading it. Fitted scalers round-trip through a
+small JSON file.
+"""
+
+import json
+import os
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from common.dataset import FEATURE_DTYPE, PARSE_CHUNK_ROWS, TARGET_COLUMN, iter_csv_chunks
+
+
+def feature_columns(df: pd.DataFrame) -> list[str]:
+    """Return the numeric columns of a DataFrame other than the target."""
+    return [column for column in df.select_dtypes(include='number').columns if column != TARGET_COLUMN]
+
+
+class Scaler(ABC):
+    """
+    Base class: maps x to (x - offset) * factor per column.
+
+    Subclasses keep running statistics in _update() and derive the offset and
+    factor from them in _coefficients(). Columns without spread are left unchanged.
+    """
+
+    kind = 'scaler'
+
+    def __init__(self):
+        self.columns: list[str] | None = None
+        self.count = 0
+
+    @abstractmethod
+    def _reset(self, width: int) -> None:
+        ...
+
+    @abstractmethod
+    def _update(self, values: np.ndarray) -> None:
+        ...
+
+    @abstractmethod
+    def _coefficients(self) -> tuple[np.ndarray, np.ndarray]:
+        ...
+
+    @abstractmethod
+    def _state(self) -> dict:
+        ...
+
+    @abstractmethod
+    def _restore(self, state: dict) -> None:
+        ...
+
+    def partial_fit(self, df: pd.DataFrame) -> 'Scaler':
+        """
+        Update the statistics with one chunk of rows.
+
+        Args:
+            df: Chunk with the same feature columns as the previous ones
+
+        Returns:
+            self
+
+        Raises:
+            ValueError: If the chunk's feature columns differ from the fitted ones
+        """
+        columns = feature_columns(df)
+        if self.columns is None:
+            self.columns = columns
+            self._reset(len(columns))
+        elif columns != self.columns:
+            raise ValueError(f"Expected feature columns {self.columns}, got {columns}")
+
+        values = df[columns].to_numpy(dtype=np.float64)
+        values = values[~np.isnan(values).any(axis=1)]
+        if len(values):
+            self._update(values)
+            self.count += len(values)
+        return self
+
+    def fit(self, df: pd.DataFrame) -> 'Scaler':
+        """Fit the statistics on a whole DataFrame, discarding earlier ones."""
+        self.columns = None
+        self.count = 0
+        return self.partial_fit(df)
+
+    def fit_csv(self, filepath: str | Path, chunk_rows: int = PARSE_CHUNK_ROWS) -> 'Scaler':
+        """Fit the statistics on a knight CSV, reading it chunk by chunk."""
+        self.columns = None
+        self.count = 0
+        for chunk in iter_csv_chunks(filepath, chunk_rows):
+            self.partial_fit(chunk)
+        return self
+
+    def _check_fitted(self) -> None:
+        if self.columns is None or self.count == 0:
+            raise ValueError(f"{type(self).__name__} is not fitted")
+
+    def transform_array(self, values: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+        """
+        Scale a (rows, features) matrix in the fitted column order.
+
+        Args:
+            values: Feature matrix
+            out: Array to write to; pass values itself to scale in place
+
+        Returns:
+            The scaled matrix
+        """
+        self._check_fitted()
+        offset, factor = self._coefficients()
+        out = np.subtract(values, offset.astype(FEATURE_DTYPE), out=out, dtype=FEATURE_DTYPE)
+        out *= factor.astype(FEATURE_DTYPE)
+        return out
+
+    def transform(self, df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
+        """
+        Scale the fitted feature columns of a DataFrame; other columns are kept.
+
+        Args:
+            df: DataFrame with the fitted feature columns
+            inplace: Write the scaled columns into df instead of a copy
+
+        Returns:
+            DataFrame with float32 scaled features
+
+        Raises:
+            ValueError: If the scaler is not fitted or a column is missing
+        """
+        self._check_fitted()
+        missing = [column for column in self.columns if column not in df.columns]
+        if missing:
+            raise ValueError(f"Columns missing from DataFrame: {missing}")
+
+        values = df[self.columns].to_numpy(dtype=FEATURE_DTYPE, copy=True)
+        self.transform_array(values, out=values)
+        result = df if inplace else df.copy()
+        result[self.columns] = values
+        return result
+
+    def transform_csv(self, source: str | Path, destination: str | Path,
+                      chunk_rows: int = PARSE_CHUNK_ROWS) -> int:
+        """
+        Scale a knight CSV into another, one chunk at a time.
+
+        Args:
+            source: CSV to scale, e.g. a test file larger than memory
+            destination: CSV to write
+            chunk_rows: Rows per chunk
+
+        Returns:
+            Number of rows written
+        """
+        destination = Path(destination)
+        temporary = destination.with_name(destination.name + '.tmp')
+        rows = 0
+        with open(temporary, 'w', encoding='utf-8', newline='') as output:
+            for chunk in iter_csv_chunks(source, chunk_rows):
+                self.transform(chunk, inplace=True).to_csv(output, header=rows == 0, index=False)
+                rows += len(chunk)
+        os.replace(temporary, destination)
+        return rows
+
+    def save(self, path: str | Path) -> None:
+        """Write the fitted statistics to a JSON file."""
+        self._check_fitted()
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        state = {'kind': self.kind, 'columns': self.columns, 'count': self.count, **self._state()}
+        temporary = path.with_name(path.name + '.tmp')
+        with open(temporary, 'w', encoding='utf-8') as output:
+            json.dump(state, output, indent=2)
+        os.replace(temporary, path)
+
+
+class StandardScaler(Scaler):
+    """Standardize to mean 0 and standard deviation 1 (sample std, like pandas)."""
+
+    kind = 'standard'
+
+    def __init__(self, ddof: int = 1):
+        super().__init__()
+        self.ddof = ddof
+
+    def _reset(self, width: int) -> None:
+        self.mean = np.zeros(width)
+        self.m2 = np.zeros(width)
+
+    def _update(self, values: np.ndarray) -> None:
+        chunk_count = len(values)
+        chunk_mean = values.mean(axis=0)
+        chunk_m2 = ((values - chunk_mean) ** 2).sum(axis=0)
+        total = self.count + chunk_count
+        delta = chunk_mean - self.mean
+        self.mean += delta * (chunk_count / total)
+        self.m2 += chunk_m2 + delta ** 2 * (self.count * chunk_count / total)
+
+    @property
+    def std(self) -> np.ndarray:
+        return np.sqrt(self.m2 / max(self.count - self.ddof, 1))
+
+    def _coefficients(self) -> tuple[np.ndarray, np.ndarray]:
+        std = self.std
+        spread = std > 0
+        offset = np.where(spread, self.mean, 0.0)
+        factor = np.divide(1.0, std, out=np.ones_like(std), where=spread)
+        return offset, factor
+
+    def _state(self) -> dict:
+        return {'ddof': self.ddof, 'mean': self.mean.tolist(), 'm2': self.m2.tolist()}
+
+    def _restore(self, state: dict) -> None:
+        self.ddof = state['ddof']
+        self.mean = np.array(state['mean'])
+        self.m2 = np.array(state['m2'])
+
+
+class MinMaxScaler(Scaler):
+    """Normalize to the [0, 1] range of the fitted data."""
+
+    kind = 'minmax'
+
+    def _reset(self, width: int) -> None:
+        self.min = np.full(width, np.inf)
+        self.max = np.full(width, -np.inf)
+
+    def _update(self, values: np.ndarray) -> None:
+        np.minimum(self.min, values.min(axis=0), out=self.min)
+        np.maximum(self.max, values.max(axis=0), out=self.max)
+
+    def _coefficients(self) -> tuple[np.ndarray, np.ndarray]:
+        span = self.max - self.min
+        spread = span > 0
+        offset = np.where(spread, self.min, 0.0)
+        factor = np.divide(1.0, span, out=np.ones_like(span), where=spread)
+        return offset, factor
+
+    def _state(self) -> dict:
+        return {'min': self.min.tolist(), 'max': self.max.tolist()}
+
+    def _restore(self, state: dict) -> None:
+        self.min = np.array(state['min'])
+        self.max = np.array(state['max'])
+
+
+SCALERS = {scaler.kind: scaler for scaler in (StandardScaler, MinMaxScaler)}
+
+
+def load_scaler(path: str | Path) -> Scaler:
+    """
+    Read a scaler written by Scaler.save().
+
+    Args:
+        path: Path to the JSON file
+
+    Returns:
+        The fitted StandardScaler or MinMaxScaler
+
+    Raises:
+        ValueError: If the file holds an unknown kind of scaler
+    """
+    with open(path, encoding='utf-8') as source:
+        state = json.load(source)
+    if state.get('kind') not in SCALERS:
+        raise ValueError(f"Unknown scaler kind in {path}: {state.get('kind')!r}")
+    scaler = SCALERS[state['kind']]()
+    scaler.columns = state['columns']
+    scaler.count = state['count']
+    scaler._restore(state)
+    return scaler
@@ -0,0 +1,262 @@
+"""Out-of-core stratified train/validation split of a knight CSV.
+
+split_csv() reads the CSV as raw byte blocks and copies every row unchanged
+into one of the two outputs, so memory stays constant whatever the file size
+and values are never re-parsed or re-formatted. Only the class label is
+extracted from each row. Two assignment methods are available:
+
+- ``hash``: one pass. A row goes to training when a 64-bit hash of
+  (seed, class, index within its class) falls below the ratio. It is
+  deterministic, and each class is split at the ratio in expectation.
+- ``exact``: two passes. A first pass counts the rows of each class. Then
+  selection sampling (Knuth's Algorithm S) picks exactly
+  round(count × (1 - ratio)) validation rows per class, uniformly at random.
+
+Rows must not contain quoted commas or newlines, which holds for the knight
+datasets (numeric features and a bare class label).
+"""
+
+import os
+import time
+from dataclasses import dataclass, field
+from itertools import compress
+from pathlib import Path
+
+import numpy as np
+
+from common.dataset import TARGET_COLUMN
+
+SPLIT_METHODS = ('hash', 'exact')
+# Bytes read per block; memory use is a small multiple of this
+BLOCK_BYTES = 8 << 20
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+
+
+@dataclass
+class SplitResult:
+    """Rows written per class and split, and the throughput of the split."""
+
+    method: str
+    train_ratio: float
+    classes: list[str] = field(default_factory=list)
+    train_counts: dict[str, int] = field(default_factory=dict)
+    validation_counts: dict[str, int] = field(default_factory=dict)
+    bytes_read: int = 0
+    seconds: float = 0.0
+
+    @property
+    def train_rows(self) -> int:
+        return sum(self.train_counts.values())
+
+    @property
+    def validation_rows(self) -> int:
+        return sum(self.validation_counts.values())
+
+    @property
+    def rows(self) -> int:
+        return self.train_rows + self.validation_rows
+
+    @property
+    def mb_per_s(self) -> float:
+        return self.bytes_read / 2**20 / self.seconds if self.seconds else float('inf')
+
+    def class_distribution(self, split: str = 'train') -> dict[str, float]:
+        """Return the share of each class in the 'train' or 'validation' output."""
+        counts = self.train_counts if split == 'train' else self.validation_counts
+        total = sum(counts.values())
+        return {label: counts.get(label, 0) / total if total else 0.0 for label in self.classes}
+
+
+def row_hash(seed: int, class_codes: np.ndarray, class_index: np.ndarray) -> np.ndarray:
+    """SplitMix64 of (seed, class, index within class) as uniform floats in [0, 1)."""
+    with np.errstate(over='ignore'):
+        state = np.uint64(seed) * _GOLDEN
+        state = state + class_codes.astype(np.uint64) * _MIX2 + class_index.astype(np.uint64)
+        state = state + _GOLDEN
+        state = (state ^ (state >> np.uint64(30))) * _MIX1
+        state = (state ^ (state >> np.uint64(27))) * _MIX2
+        state = state ^ (state >> np.uint64(31))
+    return (state >> np.uint64(11)).astype(np.float64) / 2.0**53
+
+
+def iter_row_blocks(source: Path, block_bytes: int = BLOCK_BYTES):
+    """
+    Read a CSV as blocks of complete rows.
+
+    Yields:
+        (header, rows, bytes) tuples: the header line, the list of rows of a
+        block without their newlines, and the number of bytes the block consumed
+    """
+    with open(source, 'rb') as csv_file:
+        header = csv_file.readline()
+        yield header, [], len(header)
+        remainder = b''
+        while True:
+            block = csv_file.read(block_bytes)
+            if not block:
+                break
+            data = remainder + block
+            cut = data.rfind(b'\n')
+            if cut < 0:
+                remainder = data
+                continue
+            remainder = data[cut + 1:]
+            yield header, [row for row in data[:cut].split(b'\n') if row.strip()], len(block)
+        if remainder.strip():
+            yield header, [remainder], 0
+
+
+class _Labeler:
+    """Extract a row's class label and map it to a code, adding new labels as they appear."""
+
+    def __init__(self, header: bytes, target_col: str):
+        names = header.rstrip(b'\r\n').decode().split(',')
+        if target_col not in names:
+            raise ValueError(f"Target column '{target_col}' not found in CSV header")
+        self.position = names.index(target_col)
+        self.is_last = self.position == len(names) - 1
+        self.codes: dict[bytes, int] = {}
+
+    def __call__(self, rows: list[bytes]) -> np.ndarray:
+        if self.is_last:
+            labels = [row.rpartition(b',')[2].rstrip(b'\r') for row in rows]
+        else:
+            labels = [row.split(b',')[self.position].rstrip(b'\r') for row in rows]
+        codes = self.codes
+        return np.fromiter((codes.setdefault(label, len(codes)) for label in labels), dtype=np.int64, count=len(labels))
+
+    @property
+    def classes(self) -> list[str]:
+        return [label.decode() for label in sorted(self.codes, key=self.codes.get)]
+
+
+def count_classes(source: str | Path, target_col: str = TARGET_COLUMN, block_bytes: int = BLOCK_BYTES) -> dict[str, int]:
+    """Count the rows of each class in one streaming pass."""
+    labeler = None
+    counts = np.zeros(0, dtype=np.int64)
+    for header, rows, _ in iter_row_blocks(Path(source), block_bytes):
+        labeler = labeler or _Labeler(header, target_col)
+        block_counts = np.bincount(labeler(rows), minlength=len(labeler.codes))
+        counts = np.pad(counts, (0, len(block_counts) - len(counts))) + block_counts
+    return dict(zip(labeler.classes, counts.tolist()))
+
+
+def _hash_assignment(seed: int, train_ratio: float):
+    seen = np.zeros(0, dtype=np.int64)
+
+    def assign(codes: np.ndarray, n_classes: int) -> np.ndarray:
+        nonlocal seen
+        seen = np.pad(seen, (0, n_classes - len(seen)))
+        # Index of each row within its class, continuing from earlier blocks
+        class_index = np.empty(len(codes), dtype=np.int64)
+        for code in np.unique(codes):
+            rows = codes == code
+            n_rows = int(rows.sum())
+            class_index[rows] = seen[code] + np.arange(n_rows)
+            seen[code] += n_rows
+        return row_hash(seed, codes, class_index) < train_ratio
+
+    return assign
+
+
+def _exact_assignment(seed: int, train_ratio: float, totals: list[int]):
+    rng = np.random.default_rng(seed)
+    remaining = list(totals)
+    needed = [round(total * (1 - train_ratio)) for total in totals]
+
+    def assign(codes: np.ndarray, n_classes: int) -> np.ndarray:
+        draws = rng.random(len(codes)).tolist()
+        to_train = np.ones(len(codes), dtype=bool)
+        for row, (code, draw) in enumerate(zip(codes.tolist(), draws)):
+            # Algorithm S: choose this row with probability needed / remaining
+            if draw * remaining[code] < needed[code]:
+                to_train[row] = False
+                needed[code] -= 1
+            remaining[code] -= 1
+        return to_train
+
+    return assign
+
+
+def split_csv(source: str | Path, train_path: str | Path, validation_path: str | Path,
+              train_ratio: float = 0.8, seed: int = 42, method: str = 'hash',
+              target_col: str = TARGET_COLUMN, block_bytes: int = BLOCK_BYTES) -> SplitResult:
+    """
+    Split a CSV into stratified training and validation files, streaming.
+
+    Args:
+        source: CSV to split
+        train_path: Training CSV to write
+        validation_path: Validation CSV to write
+        train_ratio: Proportion for training (0.8 = 80%)
+        seed: Seed for reproducibility
+        method: 'hash' (one pass, ratio in expectation) or 'exact' (two passes, exact per class)
+        target_col: Class column to stratify on
+        block_bytes: Bytes read per block
+
+    Returns:
+        SplitResult with the rows per class and the throughput
+
+    Raises:
+        FileNotFoundError: If the source doesn't exist
+        ValueError: If the ratio, method or target column is invalid
+    """
+    source, train_path, validation_path = Path(source), Path(train_path), Path(validation_path)
+    if not source.exists():
+        raise FileNotFoundError(f"Dataset not found: {source}")
+    if not 0 < train_ratio < 1:
+        raise ValueError(f"train_ratio must be between 0 and 1, got {train_ratio}")
+    if method not in SPLIT_METHODS:
+        raise ValueError(f"Unknown split method {method!r}, expected one of {SPLIT_METHODS}")
+
+    start = time.perf_counter()
+    result = SplitResult(method, train_ratio)
+    labeler = None
+    if method == 'exact':
+        totals = count_classes(source, target_col, block_bytes)
+        labeler_codes = {label.encode(): code for code, label in enumerate(totals)}
+        assign = _exact_assignment(seed, train_ratio, list(totals.values()))
+        result.bytes_read += source.stat().st_size
+    else:
+        labeler_codes = None
+        assign = _hash_assignment(seed, train_ratio)
+
+    train_temporary = train_path.with_name(train_path.name + '.tmp')
+    validation_temporary = validation_path.with_name(validation_path.name + '.tmp')
+    train_counts = np.zeros(0, dtype=np.int64)
+    validation_counts = np.zeros(0, dtype=np.int64)
+    with open(train_temporary, 'wb') as train_file, open(validation_temporary, 'wb') as validation_file:
+        for header, rows, consumed in iter_row_blocks(source, block_bytes):
+            result.bytes_read += consumed
+            if labeler is None:
+                labeler = _Labeler(header, target_col)
+                if labeler_codes is not None:
+                    labeler.codes = labeler_codes
+                train_file.write(header)
+                validation_file.write(header)
+            if not rows:
+                continue
+
+            codes = labeler(rows)
+            n_classes = len(labeler.codes)
+            to_train = assign(codes, n_classes)
+            for output, mask in ((train_file, to_train), (validation_file, ~to_train)):
+                selected = list(compress(rows, mask.tolist()))
+                if selected:
+                    output.write(b'\n'.join(selected) + b'\n')
+            train_counts = np.pad(train_counts, (0, n_classes - len(train_counts)))
+            validation_counts = np.pad(validation_counts, (0, n_classes - len(validation_counts)))
+            train_counts += np.bincount(codes[to_train], minlength=n_classes)
+            validation_counts += np.bincount(codes[~to_train], minlength=n_classes)
+
+    os.replace(train_temporary, train_path)
+    os.replace(validation_temporary, validation_path)
+
+    result.classes = labeler.classes if labeler else []
+    result.train_counts = dict(zip(result.classes, train_counts.tolist()))
+    result.validation_counts = dict(zip(result.classes, validation_counts.tolist()))
+    result.seconds = time.perf_counter() - start
+    return result
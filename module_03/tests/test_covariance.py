@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from common.covariance import CovarianceAccumulator, accumulate_chunks, stream_covariance
+
+FEATURES = ['Sensitivity', 'Hability', 'Strength', 'Power']
+
+
+def knights(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    latent = rng.normal(size=(rows, 1))
+    df = pd.DataFrame(latent * [1, -2, 0.5, 3] + rng.normal(size=(rows, 4)), columns=FEATURES)
+    df['knight'] = pd.Categorical(np.where(latent[:, 0] > 0, 'Sith', 'Jedi'), categories=['Jedi', 'Sith'])
+    return df
+
+
+def encoded(df):
+    return df.assign(knight=df['knight'].cat.codes)
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_uneven_chunks_match_pandas(workers):
+    df = knights(1000)
+    cuts = [0, 1, 2, 90, 91, 400, 777, 1000]
+    chunks = [df.iloc[start:stop] for start, stop in zip(cuts, cuts[1:])]
+
+    total = accumulate_chunks(chunks, workers)
+
+    assert total.columns == FEATURES + ['knight']
+    assert total.count == len(df)
+    pd.testing.assert_frame_equal(total.correlation(), encoded(df).corr(), atol=1e-12)
+    pd.testing.assert_frame_equal(total.covariance(), encoded(df).cov(), atol=1e-10)
+
+
+def test_merge_with_empty_summary():
+    values = knights(50)[FEATURES].to_numpy()
+    empty = CovarianceAccumulator(FEATURES)
+    full = CovarianceAccumulator.from_chunk(values, FEATURES)
+
+    left = CovarianceAccumulator(FEATURES).merge(full)
+    right = CovarianceAccumulator.from_chunk(values, FEATURES).merge(empty)
+
+    for merged in (left, right):
+        assert merged.count == 50
+        np.testing.assert_allclose(merged.mean, full.mean)
+        np.testing.assert_allclose(merged.comoment, full.comoment)
+    # The empty side took a copy, so later merges do not write into the other summary
+    left.update(values)
+    np.testing.assert_allclose(full.comoment, right.comoment)
+
+
+def test_rows_with_missing_values_are_skipped():
+    df = knights(200)[FEATURES]
+    df.iloc[[3, 50, 51], [0, 2, 3]] = np.nan
+
+    total = CovarianceAccumulator(FEATURES).update(df.iloc[:60].to_numpy()).update(df.iloc[60:].to_numpy())
+
+    assert total.count == 197
+    pd.testing.assert_frame_equal(total.correlation(), df.dropna().corr(), atol=1e-12)
+
+
+def test_correlation_with_constant_column():
+    df = knights(100)[FEATURES].assign(Constant=2.5)
+
+    total = CovarianceAccumulator(list(df.columns)).update(df.to_numpy())
+
+    expected = df.corr()
+    pd.testing.assert_series_equal(total.correlation_with('Hability'), expected['Hability'], atol=1e-12)
+    assert total.correlation_with('Constant').isna().all()
+    assert expected['Constant'].isna().all()
+
+
+def test_different_columns_cannot_merge():
+    with pytest.raises(ValueError, match='different columns'):
+        CovarianceAccumulator(FEATURES).merge(CovarianceAccumulator(FEATURES[:2]))
+
+
+def test_stream_covariance_matches_pandas(tmp_path):
+    df = knights(500, seed=1)
+    df.to_csv(tmp_path / 'Train_knight.csv', index=False)
+
+    total = stream_covariance(tmp_path / 'Train_knight.csv', chunk_rows=77, workers=2)
+
+    expected = encoded(pd.read_csv(tmp_path / 'Train_knight.csv', dtype={'knight': df['knight'].dtype})).corr()
+    pd.testing.assert_frame_equal(total.correlation(), expected, atol=1e-6)
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from common.dataset import cache_dir_for, load_dataset_cached
+
+
+def write_knights(path, rows, seed):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.random((rows, 3)).astype(np.float32), columns=['Sensitivity', 'Hability', 'Strength'])
+    df['knight'] = rng.choice(['Jedi', 'Sith'], rows)
+    df.to_csv(path, index=False)
+    return df
+
+
+def test_cache_is_reused_for_unchanged_csv(tmp_path):
+    csv_path = tmp_path / 'Train_knight.csv'
+    write_knights(csv_path, 50, seed=0)
+
+    _, first = load_dataset_cached(csv_path)
+    df, second = load_dataset_cached(csv_path)
+
+    assert not first.reused
+    assert second.reused
+    assert (cache_dir_for(csv_path) / 'features.npy').exists()
+    assert list(df['knight'].cat.categories) == ['Jedi', 'Sith']
+
+
+def test_rewriting_the_cache_keeps_earlier_frames_readable(tmp_path):
+    csv_path = tmp_path / 'Train_knight.csv'
+    original = write_knights(csv_path, 2000, seed=0)
+    load_dataset_cached(csv_path)
+    before, info = load_dataset_cached(csv_path)
+    assert info.reused
+
+    # A smaller CSV: rewriting the old files in place would truncate the pages `before` maps
+    changed = write_knights(csv_path, 10, seed=1)
+    after, info = load_dataset_cached(csv_path)
+
+    assert not info.reused
+    # Without the atomic replace, this read of the mapped trailing column dies with SIGBUS
+    np.testing.assert_array_equal(before['Strength'].to_numpy(), original['Strength'].to_numpy())
+    assert list(before['knight']) == list(original['knight'])
+    np.testing.assert_array_equal(after['Strength'].to_numpy(), changed['Strength'].to_numpy())
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import common.histogram as histogram
+from common.dataset import cache_dir_for
+from common.histogram import bin_counts, compute_histograms, load_histograms, shared_edges
+
+
+def numpy_counts(values, class_codes, edges, n_classes):
+    """Per feature and class counts from np.histogram, NaNs dropped."""
+    counts = np.zeros((values.shape[1], n_classes, edges.shape[1] - 1), dtype=np.int64)
+    for feature in range(values.shape[1]):
+        for code in range(n_classes):
+            column = values[class_codes == code, feature]
+            counts[feature, code] = np.histogram(column[~np.isnan(column)], bins=edges[feature])[0]
+    return counts
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(histogram, 'BIN_CHUNK_ROWS', 100)
+
+
+def test_bin_counts_match_numpy_on_edges(tmp_path):
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=(1000, 4)) * [1, 10, 1e-3, 1e4]
+    edges = shared_edges(values, 7)
+    # A quarter of the rows sit exactly on an edge, the maximum included
+    on_edge = rng.integers(0, 8, size=(250, 4))
+    values[:250] = edges[np.arange(4), on_edge]
+    class_codes = rng.integers(0, 3, len(values))
+
+    counts = bin_counts(values, class_codes, edges, 3)
+
+    np.testing.assert_array_equal(counts, numpy_counts(values, class_codes, edges, 3))
+    assert counts.sum() == values.size
+
+
+def test_bin_counts_drop_missing_values():
+    rng = np.random.default_rng(1)
+    values = rng.random((500, 3))
+    values[rng.random(values.shape) < 0.1] = np.nan
+    class_codes = rng.integers(0, 2, len(values))
+    edges = shared_edges(values, 5)
+
+    counts = bin_counts(values, class_codes, edges, 2)
+
+    np.testing.assert_array_equal(counts, numpy_counts(values, class_codes, edges, 2))
+    assert counts.sum() == np.count_nonzero(~np.isnan(values))
+
+
+def test_compute_histograms_match_numpy():
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame(rng.normal(size=(400, 3)).astype(np.float32), columns=['Sensitivity', 'Hability', 'Strength'])
+    df['Power'] = np.float32(3.5)
+    df.loc[::7, 'Hability'] = np.nan
+    df['knight'] = rng.choice(['Jedi', 'Sith'], len(df))
+
+    result = compute_histograms(df, bins=10)
+
+    values = df[result.features].to_numpy(dtype=np.float32)
+    for feature, edges in zip(result.features, result.edges):
+        column = df[feature].dropna().to_numpy(dtype=np.float64)
+        expected, expected_edges = np.histogram(column, bins=10)
+        np.testing.assert_allclose(edges, expected_edges)
+        np.testing.assert_array_equal(result.counts[result.features.index(feature)].sum(axis=0), expected)
+    class_codes = (df['knight'] == 'Sith').to_numpy().astype(np.int64)
+    np.testing.assert_array_equal(result.counts, numpy_counts(values, class_codes, result.edges, 2))
+    # The constant column is counted in the middle bin of its unit-wide range
+    assert result.class_counts('Power', 'Jedi')[5] == (df['knight'] == 'Jedi').sum()
+
+
+def write_knights(path, rows, seed):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.random((rows, 3)).astype(np.float32), columns=['Sensitivity', 'Hability', 'Strength'])
+    df['knight'] = rng.choice(['Jedi', 'Sith'], rows)
+    df.to_csv(path, index=False)
+
+
+def test_load_histograms_caches_by_digest_and_bins(tmp_path, monkeypatch):
+    monkeypatch.setattr(histogram, '_memory_cache', {})
+    csv_path = tmp_path / 'Train_knight.csv'
+    write_knights(csv_path, 200, seed=0)
+
+    first = load_histograms(csv_path, bins=8)
+    other_bins = load_histograms(csv_path, bins=12)
+    histogram._memory_cache.clear()
+    reloaded = load_histograms(csv_path, bins=8)
+
+    assert len(list(cache_dir_for(csv_path).glob('histograms-8-*.npz'))) == 1
+    assert other_bins.counts.shape[-1] == 12
+    np.testing.assert_array_equal(reloaded.counts, first.counts)
+    np.testing.assert_array_equal(reloaded.edges, first.edges)
+
+    write_knights(csv_path, 150, seed=1)
+    changed = load_histograms(csv_path, bins=8)
+
+    assert changed.counts.sum() == 150 * 3
+    assert len(list(cache_dir_for(csv_path).glob('histograms-8-*.npz'))) == 1
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from common.scaling import MinMaxScaler, Scaler, StandardScaler, load_scaler
+
+
+def knights(rows, seed):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.normal(size=(rows, 3)) * [1, 10, 100], columns=['Sensitivity', 'Hability', 'Strength'])
+    df['knight'] = rng.choice(['Jedi', 'Sith'], rows)
+    return df
+
+
+def test_base_scaler_cannot_be_instantiated():
+    with pytest.raises(TypeError):
+        Scaler()
+
+
+@pytest.mark.parametrize('scaler_type', [StandardScaler, MinMaxScaler])
+def test_chunked_fit_matches_full_fit(scaler_type):
+    df = knights(300, seed=0)
+
+    chunked = scaler_type()
+    for start in range(0, len(df), 70):
+        chunked.partial_fit(df.iloc[start:start + 70])
+    full = scaler_type().fit(df)
+
+    pd.testing.assert_frame_equal(chunked.transform(df), full.transform(df))
+
+
+@pytest.mark.parametrize('scaler_type', [StandardScaler, MinMaxScaler])
+def test_saved_scaler_transforms_the_same(scaler_type, tmp_path):
+    train, test = knights(200, seed=0), knights(50, seed=1)
+    scaler = scaler_type().fit(train)
+
+    scaler.save(tmp_path / 'scaler.json')
+    loaded = load_scaler(tmp_path / 'scaler.json')
+
+    assert type(loaded) is scaler_type
+    pd.testing.assert_frame_equal(loaded.transform(test), scaler.transform(test))
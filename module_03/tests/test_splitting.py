@@ -0,0 +1,102 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from common.splitting import count_classes, split_csv
+
+HEADER = 'Sensitivity,Hability,Strength,knight'
+
+
+def knight_rows(rows, seed=0, labels=('Jedi', 'Sith', 'Padawan'), weights=(0.6, 0.3, 0.1)):
+    rng = np.random.default_rng(seed)
+    classes = rng.choice(labels, rows, p=weights)
+    return [f"{a:.6f},{b:.3f},{c:.9f},{label}" for (a, b, c), label in zip(rng.random((rows, 3)), classes)]
+
+
+def write_csv(path, rows, newline='\n', final_newline=True):
+    text = newline.join([HEADER, *rows]) + (newline if final_newline else '')
+    path.write_bytes(text.encode())
+
+
+def read_rows(path):
+    lines = path.read_bytes().decode().split('\n')
+    assert lines[0].rstrip('\r') == HEADER
+    return [line.rstrip('\r') for line in lines[1:] if line]
+
+
+def split(tmp_path, **options):
+    result = split_csv(tmp_path / 'knights.csv', tmp_path / 'train.csv', tmp_path / 'validation.csv', **options)
+    return result, read_rows(tmp_path / 'train.csv'), read_rows(tmp_path / 'validation.csv')
+
+
+@pytest.mark.parametrize('method', ['hash', 'exact'])
+@pytest.mark.parametrize('newline', ['\n', '\r\n'])
+@pytest.mark.parametrize('final_newline', [True, False])
+def test_every_row_is_written_once(tmp_path, method, newline, final_newline):
+    rows = knight_rows(500)
+    write_csv(tmp_path / 'knights.csv', rows, newline, final_newline)
+
+    # Blocks of 37 bytes end in the middle of most rows
+    result, train, validation = split(tmp_path, method=method, block_bytes=37)
+
+    assert Counter(train + validation) == Counter(rows)
+    assert result.rows == len(rows)
+    assert result.train_counts == dict(Counter(row.rsplit(',', 1)[1] for row in train))
+    assert result.validation_counts == dict(Counter(row.rsplit(',', 1)[1] for row in validation))
+
+
+@pytest.mark.parametrize('block_bytes', [37, 4096])
+def test_exact_validation_count_per_class(tmp_path, block_bytes):
+    rows = knight_rows(1003)
+    write_csv(tmp_path / 'knights.csv', rows)
+    totals = Counter(row.rsplit(',', 1)[1] for row in rows)
+
+    result, _, validation = split(tmp_path, method='exact', train_ratio=0.8, block_bytes=block_bytes)
+
+    expected = {label: round(total * 0.2) for label, total in totals.items()}
+    assert result.validation_counts == expected
+    assert dict(Counter(row.rsplit(',', 1)[1] for row in validation)) == expected
+
+
+def test_exact_keeps_the_first_pass_class_codes(tmp_path):
+    # Sith only appears late, after blocks that hold nothing but Jedi
+    rows = knight_rows(300, labels=('Jedi',), weights=(1.0,)) + knight_rows(50, labels=('Sith',), weights=(1.0,))
+    write_csv(tmp_path / 'knights.csv', rows)
+
+    result, _, _ = split(tmp_path, method='exact', train_ratio=0.8, block_bytes=64)
+
+    assert result.classes == ['Jedi', 'Sith']
+    assert result.validation_counts == {'Jedi': 60, 'Sith': 10}
+
+
+def test_hash_split_does_not_depend_on_block_size(tmp_path):
+    write_csv(tmp_path / 'knights.csv', knight_rows(2000))
+
+    small, small_train, small_validation = split(tmp_path, method='hash', block_bytes=53)
+    large, large_train, large_validation = split(tmp_path, method='hash', block_bytes=1 << 20)
+
+    assert small_train == large_train
+    assert small_validation == large_validation
+    assert small.train_counts == large.train_counts
+    assert abs(small.train_rows / small.rows - 0.8) < 0.05
+
+
+def test_count_classes_across_blocks(tmp_path):
+    rows = knight_rows(400)
+    write_csv(tmp_path / 'knights.csv', rows, '\r\n', final_newline=False)
+
+    counts = count_classes(tmp_path / 'knights.csv', block_bytes=29)
+
+    assert counts == dict(Counter(row.rsplit(',', 1)[1] for row in rows))
+
+
+def test_invalid_arguments_are_rejected(tmp_path):
+    write_csv(tmp_path / 'knights.csv', knight_rows(10))
+
+    with pytest.raises(ValueError, match='train_ratio'):
+        split(tmp_path, train_ratio=1.0)
+    with pytest.raises(ValueError, match='split method'):
+        split(tmp_path, method='random')
+    with pytest.raises(ValueError, match="Target column 'house'"):
+        split(tmp_path, target_col='house')
@@ -0,0 +1 @@
+"""Benchmarks for the module_04 model evaluation helpers."""
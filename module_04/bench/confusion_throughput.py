@@ -0,0 +1,99 @@
+"""Throughput of the confusion-matrix engine on large prediction/truth files.
+
+Writes two label files of the requested number of lines (Jedi/Sith, about 70%
+agreement), builds the confusion matrix with common/confusion.py, and compares
+with a plain Python line loop timed on a prefix and scaled to the full size.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from collections import Counter
+from itertools import islice
+from pathlib import Path
+
+import numpy as np
+
+MODULE_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(MODULE_ROOT))
+
+from common.confusion import confusion_matrix_from_files
+
+DEFAULT_LINES = 10**8
+DEFAULT_SEED = 42
+BASELINE_LINES = 10**6
+WRITE_CHUNK_LINES = 10**7
+LABELS = np.frombuffer(b'Jedi\nSith\n', dtype=np.uint8).reshape(2, 5)
+
+
+def parse_size(value: str) -> int:
+    """Accept sizes such as 100000, 1e8 or 10**8."""
+    try:
+        if '**' in value:
+            base, exponent = value.split('**', 1)
+            size = int(base) ** int(exponent)
+        else:
+            size = int(float(value))
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"Invalid size '{value}'") from e
+    if size <= 0:
+        raise argparse.ArgumentTypeError("Size must be positive")
+    return size
+
+
+def write_label_files(predictions: Path, truth: Path, lines: int, seed: int) -> None:
+    """Write both files in chunks, as rows of the fixed-width label table."""
+    rng = np.random.default_rng(seed)
+    with open(predictions, 'wb') as predictions_file, open(truth, 'wb') as truth_file:
+        for start in range(0, lines, WRITE_CHUNK_LINES):
+            size = min(WRITE_CHUNK_LINES, lines - start)
+            true = rng.integers(0, 2, size)
+            predicted = np.where(rng.random(size) < 0.7, true, 1 - true)
+            truth_file.write(LABELS[true].tobytes())
+            predictions_file.write(LABELS[predicted].tobytes())
+
+
+def python_loop(predictions: Path, truth: Path, lines: int) -> Counter:
+    with open(predictions) as predictions_file, open(truth) as truth_file:
+        pairs = zip(map(str.strip, truth_file), map(str.strip, predictions_file))
+        return Counter(islice(pairs, lines))
+
+
+def main() -> int:
+    """Time the confusion matrix of two large label files."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lines', type=parse_size, default=DEFAULT_LINES)
+    parser.add_argument('--workers', type=int, default=None, help='threads, one per CPU by default')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='confusion-') as directory:
+        predictions, truth = Path(directory) / 'predictions.txt', Path(directory) / 'truth.txt'
+        start = time.perf_counter()
+        write_label_files(predictions, truth, args.lines, args.seed)
+        size_mb = (predictions.stat().st_size + truth.stat().st_size) / 2**20
+        print(f"Wrote 2 x {args.lines:,} lines ({size_mb:,.0f} MB) in {time.perf_counter() - start:.1f}s\n")
+
+        start = time.perf_counter()
+        result = confusion_matrix_from_files(predictions, truth, workers=args.workers)
+        elapsed = time.perf_counter() - start
+
+        baseline_lines = min(BASELINE_LINES, args.lines)
+        start = time.perf_counter()
+        python_loop(predictions, truth, baseline_lines)
+        baseline = (time.perf_counter() - start) * args.lines / baseline_lines
+
+        print(result.report())
+        print(result.matrix)
+        print(f"\n{'method':<22}{'seconds':>10}{'Mlines/s':>10}{'MB/s':>10}")
+        for name, seconds in (('vectorized engine', elapsed), ('python loop (scaled)', baseline)):
+            print(f"{name:<22}{seconds:>10.2f}{args.lines / seconds / 1e6:>10.1f}{size_mb / seconds:>10.0f}")
+    return 0
+
+
+if __name__ == '__main__':
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        sys.exit(1)
@@ -0,0 +1,77 @@
+"""Random-forest inference throughput: flattened arrays against scikit-learn.
+
+Fits the ex04 forest on Train_knight.csv, flattens it with common/forest.py,
+and scores batches of resampled, jittered knight rows of several sizes with
+FlatForest.predict_proba and RandomForestClassifier.predict_proba. Both must
+give the same probabilities. Small batches show the per-call overhead of the
+estimator; large ones the cost per row.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+MODULE_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(MODULE_ROOT))
+
+from common.data import DEFAULT_SEED, DEFAULT_TRAIN_PATH, load_knight_csv
+from common.forest import FlatForest
+
+DEFAULT_SIZES = (1, 100, 10_000, 1_000_000)
+DEFAULT_TREES = 100
+JITTER = 0.05
+# Repeat small batches until at least this long has been timed
+MIN_SECONDS = 1.0
+
+
+def timed(predict, X: np.ndarray) -> tuple[float, np.ndarray]:
+    """Seconds per call, averaged over enough calls to reach MIN_SECONDS."""
+    calls, start = 0, time.perf_counter()
+    while True:
+        result = predict(X)
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_SECONDS:
+            return elapsed / calls, result
+
+
+def main() -> int:
+    """Time both predictors on each batch size."""
+    from sklearn.ensemble import RandomForestClassifier
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='batch sizes in rows')
+    parser.add_argument('--trees', type=int, default=DEFAULT_TREES)
+    parser.add_argument('--workers', type=int, default=None, help='threads, one per CPU by default')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    args = parser.parse_args()
+
+    data = load_knight_csv(DEFAULT_TRAIN_PATH)
+    model = RandomForestClassifier(n_estimators=args.trees, random_state=args.seed).fit(data.X, data.y)
+    forest = FlatForest.from_sklearn(model)
+    print(f"{forest.n_trees} trees, {len(forest.feature):,} nodes, depth {forest.depths.max()}\n")
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'rows':>10}{'flat ms':>12}{'sklearn ms':>12}{'flat rows/s':>14}{'speedup':>9}")
+    for size in args.sizes:
+        picks = rng.integers(0, len(data.X), size)
+        X = (data.X[picks] * rng.normal(1, JITTER, (size, data.X.shape[1]))).astype(np.float32)
+        flat_seconds, flat = timed(lambda batch: forest.predict_proba(batch, args.workers), X)
+        sklearn_seconds, reference = timed(model.predict_proba, X)
+        if not np.allclose(flat, reference):
+            print(f"✗ Probabilities differ from scikit-learn on {size:,} rows")
+            return 1
+        print(f"{size:>10,}{flat_seconds * 1e3:>12.2f}{sklearn_seconds * 1e3:>12.2f}"
+              f"{size / flat_seconds:>14,.0f}{sklearn_seconds / flat_seconds:>8.1f}x")
+    print("\n✓ Same probabilities as scikit-learn for every batch")
+    return 0
+
+
+if __name__ == '__main__':
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        sys.exit(1)
@@ -0,0 +1,83 @@
+"""Cost of a KNN k-sweep: one neighbour graph against a refit per k.
+
+Enlarges the knight training set with jittered copies of its rows, splits it
+into train/validation, and scores every k from 1 to --max-k twice: with
+common/knn.py (one neighbour search, votes accumulated along the sorted
+neighbours) and with a scikit-learn KNeighborsClassifier fitted and queried for
+each k. Both must give the same accuracy for every k.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+MODULE_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(MODULE_ROOT))
+
+from common.data import DEFAULT_SEED, DEFAULT_TRAIN_PATH, KNIGHT_CLASSES, load_knight_csv, validation_split
+from common.knn import sweep_k
+
+DEFAULT_ROWS = 50_000
+DEFAULT_MAX_K = 30
+JITTER = 0.05
+
+
+def enlarged_dataset(rows: int, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    """Standardized knight rows resampled to the requested size, with Gaussian jitter."""
+    data = load_knight_csv(DEFAULT_TRAIN_PATH)
+    X = (data.X - data.X.mean(axis=0)) / data.X.std(axis=0)
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(X), rows)
+    return X[picks] + rng.normal(0, JITTER, (rows, X.shape[1])).astype(X.dtype), data.y[picks]
+
+
+def refit_per_k(train_X, train_y, query_X, query_y, max_k: int) -> np.ndarray:
+    from sklearn.neighbors import KNeighborsClassifier
+
+    accuracy = []
+    for k in range(1, max_k + 1):
+        predictions = KNeighborsClassifier(n_neighbors=k).fit(train_X, train_y).predict(query_X)
+        accuracy.append(np.mean(predictions == query_y))
+    return np.array(accuracy)
+
+
+def main() -> int:
+    """Time both sweeps on the same split."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=DEFAULT_ROWS)
+    parser.add_argument('--max-k', type=int, default=DEFAULT_MAX_K)
+    parser.add_argument('--workers', type=int, default=None, help='threads, one per CPU by default')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    args = parser.parse_args()
+
+    X, y = enlarged_dataset(args.rows, args.seed)
+    fit_rows, validation_rows = validation_split(y, seed=args.seed)
+    split = X[fit_rows], y[fit_rows], X[validation_rows], y[validation_rows]
+    print(f"{len(fit_rows):,} training rows, {len(validation_rows):,} validation rows, k = 1..{args.max_k}\n")
+
+    start = time.perf_counter()
+    sweep = sweep_k(*split, args.max_k, KNIGHT_CLASSES, workers=args.workers)
+    graph_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    reference = refit_per_k(*split, args.max_k)
+    refit_seconds = time.perf_counter() - start
+
+    if not np.allclose(sweep.accuracy, reference):
+        print("✗ Accuracies differ from scikit-learn")
+        return 1
+    print(f"✓ Same accuracy as scikit-learn for every k (best k = {sweep.best_k})\n")
+    print(f"{'method':<24}{'seconds':>10}")
+    for name, seconds in (('single neighbour graph', graph_seconds), ('refit per k', refit_seconds)):
+        print(f"{name:<24}{seconds:>10.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        sys.exit(1)
@@ -0,0 +1,97 @@
+"""Cost of VIF elimination on wide data: rank-one downdates against re-inversion.
+
+Builds a correlation matrix of --features columns from a few latent factors
+plus noise, so most features are collinear, and runs the elimination down to
+VIF < 5 twice: with common/vif.py (one inversion, then a downdate per dropped
+feature) and by inverting the remaining correlations again every round. The
+one-regression-per-feature approach is timed on one round and scaled to the
+number of rounds.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+MODULE_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(MODULE_ROOT))
+
+from common.data import DEFAULT_SEED
+from common.vif import VIF_THRESHOLD, eliminate, inverse_correlation
+
+DEFAULT_FEATURES = 1000
+DEFAULT_ROWS = 5000
+LATENT_FACTORS = 40
+
+
+def collinear_correlation(features: int, rows: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    latent = rng.normal(size=(rows, LATENT_FACTORS))
+    X = latent @ rng.normal(size=(LATENT_FACTORS, features)) + rng.normal(scale=0.5, size=(rows, features))
+    return np.corrcoef(X, rowvar=False)
+
+
+def reinvert_each_round(correlation: np.ndarray) -> list[int]:
+    kept = np.arange(len(correlation))
+    while len(kept) > 1:
+        vif = np.diag(inverse_correlation(correlation[np.ix_(kept, kept)]))
+        worst = int(np.argmax(vif))
+        if vif[worst] < VIF_THRESHOLD:
+            break
+        kept = np.delete(kept, worst)
+    return list(kept)
+
+
+def regression_round_seconds(correlation: np.ndarray, features: int) -> float:
+    """Time of one round of per-feature regressions on the normal equations, estimated on a sample."""
+    sample = min(features, 50)
+    vif = np.empty(sample)
+    start = time.perf_counter()
+    for j in range(sample):
+        others = np.delete(np.arange(features), j)
+        beta = np.linalg.solve(correlation[np.ix_(others, others)], correlation[others, j])
+        vif[j] = 1 / (1 - correlation[j, others] @ beta)
+    return (time.perf_counter() - start) * features / sample
+
+
+def main() -> int:
+    """Time the elimination both ways and check they keep the same features."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--features', type=int, default=DEFAULT_FEATURES)
+    parser.add_argument('--rows', type=int, default=DEFAULT_ROWS)
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    args = parser.parse_args()
+
+    correlation = collinear_correlation(args.features, args.rows, args.seed)
+    names = [f"f{i}" for i in range(args.features)]
+
+    start = time.perf_counter()
+    selection = eliminate(correlation, names)
+    downdate_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    kept = reinvert_each_round(correlation)
+    reinvert_seconds = time.perf_counter() - start
+
+    rounds = len(selection.dropped)
+    regression_seconds = regression_round_seconds(correlation, args.features) * rounds
+
+    if [names[i] for i in kept] != selection.features:
+        print("✗ Re-inversion kept different features")
+        return 1
+    print(f"✓ {args.features:,} features, {rounds:,} dropped, {len(kept):,} kept by both methods\n")
+    print(f"{'method':<32}{'seconds':>10}")
+    for name, seconds in (('rank-one downdates', downdate_seconds),
+                          ('inversion per round', reinvert_seconds),
+                          ('regression per feature (est.)', regression_seconds)):
+        print(f"{name:<32}{seconds:>10.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        sys.exit(1)
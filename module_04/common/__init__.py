@@ -0,0 +1 @@
+"""Shared helpers for the module_04 exercises."""
@@ -0,0 +1,335 @@
+"""Confusion matrix and per-class metrics of label files, one label per line.
+
+Both files are memory-mapped and read in blocks of whole lines. A block's
+labels are encoded to integer codes with vectorized NumPy operations: each
+label is packed into 64-bit words and compared with the known labels, so the
+bytes are never decoded to Python strings. The matrix is then one bincount of
+truth * n_labels + prediction.
+
+For large files, the lines are cut into segments that hold the same line range
+in both files. Segments are processed in a thread pool, each with its own
+label codes, and the per-segment matrices are merged by label. Memory use is
+bounded by the block size, not by the file size.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+# Bytes encoded at a time, per file and per worker
+BLOCK_BYTES = 4 << 20
+# Files smaller than this are processed in a single segment
+PARALLEL_MIN_BYTES = 64 << 20
+NEWLINE = ord('\n')
+CARRIAGE_RETURN = ord('\r')
+# Distinct labels added by linear scans before falling back to a sort
+LINEAR_LABELS = 16
+# Mask keeping the first n bytes of a little-endian word
+_LENGTH_MASKS = np.array([(1 << (8 * n)) - 1 for n in range(9)], dtype=np.uint64)
+
+
+class Vocabulary:
+    """Labels seen so far and their codes, in order of first appearance."""
+
+    def __init__(self):
+        self.labels: list[bytes] = []
+
+    def _keys(self, words: int) -> tuple[list[int], np.ndarray]:
+        """Codes and packed keys of the labels that fit in words; longer labels cannot match this block."""
+        codes = [code for code, label in enumerate(self.labels) if len(label) <= words * 8]
+        keys = np.zeros((len(codes), words), dtype=np.uint64)
+        for row, code in enumerate(codes):
+            keys[row] = np.frombuffer(self.labels[code].ljust(words * 8, b'\0'), dtype='<u8')
+        return codes, keys
+
+    def encode(self, packed: np.ndarray) -> np.ndarray:
+        """Map (lines, words) packed labels to codes, adding unseen labels."""
+        codes = np.full(len(packed), -1, dtype=np.int64)
+        for code, key in zip(*self._keys(packed.shape[1])):
+            codes[_matches(packed, key)] = code
+
+        # Few distinct labels are expected: add them one by one, sorting only if there are many
+        unmatched = np.flatnonzero(codes < 0)
+        while len(unmatched):
+            if len(self.labels) >= LINEAR_LABELS:
+                new_keys, inverse = np.unique(packed[unmatched], axis=0, return_inverse=True)
+                codes[unmatched] = len(self.labels) + inverse.ravel()
+                self.labels.extend(_unpack(key) for key in new_keys)
+                break
+            key = packed[unmatched[0]]
+            matched = unmatched[_matches(packed[unmatched], key)]
+            codes[matched] = len(self.labels)
+            self.labels.append(_unpack(key))
+            unmatched = unmatched[codes[unmatched] < 0]
+        return codes
+
+
+def _matches(packed: np.ndarray, key: np.ndarray) -> np.ndarray:
+    if packed.shape[1] == 1:
+        return packed[:, 0] == key[0]
+    return (packed == key).all(axis=1)
+
+
+def _unpack(key: np.ndarray) -> bytes:
+    return key.astype('<u8').tobytes().rstrip(b'\0')
+
+
+def pack_lines(block: np.ndarray) -> np.ndarray:
+    """
+    Pack each line of a block into 64-bit words, zero-padded.
+
+    Every word is one unaligned 8-byte read at the line's start (plus 8 per
+    word), masked to the line's remaining length.
+
+    Args:
+        block: uint8 array of whole lines; the last one may lack its newline
+
+    Returns:
+        (lines, words) uint64 array, words = ceil(longest label / 8)
+
+    Raises:
+        ValueError: If a line is empty
+    """
+    ends = np.flatnonzero(block == NEWLINE)
+    if len(block) and block[-1] != NEWLINE:
+        ends = np.append(ends, len(block))
+    starts = np.empty_like(ends)
+    starts[:1] = 0
+    starts[1:] = ends[:-1] + 1
+    lengths = ends - starts
+    # Windows line endings
+    lengths -= (block[np.maximum(ends - 1, 0)] == CARRIAGE_RETURN) & (lengths > 0)
+    if len(lengths) and lengths.min() == 0:
+        raise ValueError("Empty line in label file")
+
+    width = int(lengths.max()) if len(lengths) else 1
+    words = -(-width // 8)
+    padded = np.zeros(len(block) + 8, dtype=np.uint8)
+    padded[:len(block)] = block
+    # Overlapping little-endian uint64 starting at every byte
+    eight_bytes = np.ndarray((len(block) + 1,), dtype='<u8', buffer=padded, strides=(1,))
+
+    packed = np.empty((len(starts), words), dtype=np.uint64)
+    for word in range(words):
+        remaining = np.clip(lengths - 8 * word, 0, 8)
+        positions = np.minimum(starts + 8 * word, len(block))
+        np.bitwise_and(eight_bytes[positions], _LENGTH_MASKS[remaining], out=packed[:, word])
+    return packed
+
+
+def line_blocks(data: np.ndarray, start: int, end: int, block_bytes: int = BLOCK_BYTES):
+    """Yield uint8 views of data[start:end] cut after a newline, about block_bytes each."""
+    while start < end:
+        stop = min(start + block_bytes, end)
+        if stop < end:
+            cut = np.flatnonzero(data[start:stop] == NEWLINE)
+            if len(cut):
+                stop = start + int(cut[-1]) + 1
+            else:
+                following = np.flatnonzero(data[stop:end] == NEWLINE)
+                stop = stop + int(following[0]) + 1 if len(following) else end
+        yield data[start:stop]
+        start = stop
+
+
+def iter_codes(data: np.ndarray, start: int, end: int, vocabulary: Vocabulary, block_bytes: int = BLOCK_BYTES):
+    """Yield the label codes of each block of lines in data[start:end]."""
+    for block in line_blocks(data, start, end, block_bytes):
+        yield vocabulary.encode(pack_lines(block))
+
+
+def aligned_pairs(first, second):
+    """Re-chunk two streams of code arrays into pairs of equal length."""
+    pending_first = np.empty(0, dtype=np.int64)
+    pending_second = np.empty(0, dtype=np.int64)
+    first, second = iter(first), iter(second)
+    while True:
+        while len(pending_first) == 0:
+            chunk = next(first, None)
+            if chunk is None:
+                break
+            pending_first = chunk
+        while len(pending_second) == 0:
+            chunk = next(second, None)
+            if chunk is None:
+                break
+            pending_second = chunk
+        if len(pending_first) == 0 or len(pending_second) == 0:
+            if len(pending_first) or len(pending_second):
+                raise ValueError("Prediction and truth files have a different number of lines")
+            return
+        size = min(len(pending_first), len(pending_second))
+        yield pending_first[:size], pending_second[:size]
+        pending_first, pending_second = pending_first[size:], pending_second[size:]
+
+
+@dataclass
+class ConfusionMatrix:
+    """Counts of (truth, prediction) pairs: rows are true labels, columns predicted ones."""
+
+    labels: list[str]
+    matrix: np.ndarray
+
+    @classmethod
+    def from_codes(cls, truth: np.ndarray, predictions: np.ndarray, labels: list[str]) -> 'ConfusionMatrix':
+        size = len(labels)
+        counts = np.bincount(truth * size + predictions, minlength=size * size)
+        return cls(list(labels), counts.reshape(size, size))
+
+    def merged(self, other: 'ConfusionMatrix') -> 'ConfusionMatrix':
+        """Return the sum of two matrices, matching rows and columns by label."""
+        labels = sorted(set(self.labels) | set(other.labels))
+        matrix = np.zeros((len(labels), len(labels)), dtype=np.int64)
+        for part in (self, other):
+            index = np.array([labels.index(label) for label in part.labels], dtype=np.int64)
+            matrix[np.ix_(index, index)] += part.matrix
+        return ConfusionMatrix(labels, matrix)
+
+    def sorted(self) -> 'ConfusionMatrix':
+        order = np.argsort(self.labels, kind='stable')
+        return ConfusionMatrix([self.labels[i] for i in order], self.matrix[np.ix_(order, order)])
+
+    @property
+    def support(self) -> np.ndarray:
+        return self.matrix.sum(axis=1)
+
+    @property
+    def precision(self) -> np.ndarray:
+        predicted = self.matrix.sum(axis=0)
+        return np.divide(np.diag(self.matrix), predicted, out=np.zeros(len(self.labels)), where=predicted > 0)
+
+    @property
+    def recall(self) -> np.ndarray:
+        support = self.support
+        return np.divide(np.diag(self.matrix), support, out=np.zeros(len(self.labels)), where=support > 0)
+
+    @property
+    def f1(self) -> np.ndarray:
+        precision, recall = self.precision, self.recall
+        total = precision + recall
+        return np.divide(2 * precision * recall, total, out=np.zeros(len(self.labels)), where=total > 0)
+
+    @property
+    def accuracy(self) -> float:
+        total = self.matrix.sum()
+        return float(np.trace(self.matrix) / total) if total else 0.0
+
+    def report(self, digits: int = 2) -> str:
+        """Per-class precision, recall, F1 and support, then accuracy, like the subject's example."""
+        width = max(len('accuracy'), *(len(label) for label in self.labels))
+        column = max(digits + 3, len('f1-score'))
+        lines = [f"{'':>{width}} {'precision':>{column + 1}} {'recall':>{column}} {'f1-score':>{column}} {'total':>{column}}"]
+        rows = zip(self.labels, self.precision, self.recall, self.f1, self.support)
+        for label, precision, recall, f1, support in rows:
+            lines.append(f"{label:>{width}} {precision:>{column + 1}.{digits}f} {recall:>{column}.{digits}f} "
+                         f"{f1:>{column}.{digits}f} {support:>{column}}")
+        lines.append("")
+        lines.append(f"{'accuracy':>{width}} {'':>{column + 1}} {'':>{column}} "
+                     f"{self.accuracy:>{column}.{digits}f} {self.matrix.sum():>{column}}")
+        return "\n".join(lines)
+
+
+def _map_file(path: Path) -> np.ndarray:
+    if path.stat().st_size == 0:
+        return np.empty(0, dtype=np.uint8)
+    return np.memmap(path, dtype=np.uint8, mode='r')
+
+
+def confusion_of_ranges(predictions: np.ndarray, truth: np.ndarray, prediction_range: tuple[int, int],
+                        truth_range: tuple[int, int], block_bytes: int = BLOCK_BYTES) -> ConfusionMatrix:
+    """Confusion matrix of the same lines, given as byte ranges of each file."""
+    vocabulary = Vocabulary()
+    pairs = aligned_pairs(iter_codes(predictions, *prediction_range, vocabulary, block_bytes),
+                          iter_codes(truth, *truth_range, vocabulary, block_bytes))
+    counts = np.zeros(0, dtype=np.int64)
+    size = 0
+    for predicted, true in pairs:
+        if len(vocabulary.labels) != size:
+            # New labels appeared: re-lay the running counts for the larger matrix
+            new_size = len(vocabulary.labels)
+            grown = np.zeros((new_size, new_size), dtype=np.int64)
+            grown[:size, :size] = counts.reshape(size, size)
+            counts, size = grown.ravel(), new_size
+        counts += np.bincount(true * size + predicted, minlength=size * size)
+    labels = [label.decode() for label in vocabulary.labels]
+    return ConfusionMatrix(labels, counts.reshape(size, size))
+
+
+def newline_counts(data: np.ndarray, block_bytes: int, executor: ThreadPoolExecutor) -> np.ndarray:
+    """Number of newlines in each block_bytes block of data."""
+    starts = range(0, len(data), block_bytes)
+    return np.fromiter(executor.map(lambda start: np.count_nonzero(data[start:start + block_bytes] == NEWLINE),
+                                    starts), dtype=np.int64, count=len(starts))
+
+
+def offset_after_line(data: np.ndarray, counts: np.ndarray, block_bytes: int, line: int) -> int:
+    """Byte offset just after the line-th newline (1-based), using per-block newline counts."""
+    if line == 0:
+        return 0
+    cumulative = np.cumsum(counts)
+    block = int(np.searchsorted(cumulative, line))
+    if block >= len(counts):
+        return len(data)
+    before = int(cumulative[block - 1]) if block else 0
+    start = block * block_bytes
+    newlines = np.flatnonzero(data[start:start + block_bytes] == NEWLINE)
+    return start + int(newlines[line - before - 1]) + 1
+
+
+def segment_ranges(predictions: np.ndarray, truth: np.ndarray, segments: int, block_bytes: int,
+                   executor: ThreadPoolExecutor) -> list[tuple[tuple[int, int], tuple[int, int]]]:
+    """Cut both files into segments covering the same lines; return their byte ranges."""
+    prediction_counts = newline_counts(predictions, block_bytes, executor)
+    truth_counts = newline_counts(truth, block_bytes, executor)
+    lines = int(prediction_counts.sum())
+    boundaries = sorted({lines * part // segments for part in range(segments + 1)})
+
+    prediction_offsets = [offset_after_line(predictions, prediction_counts, block_bytes, line) for line in boundaries]
+    truth_offsets = [offset_after_line(truth, truth_counts, block_bytes, line) for line in boundaries]
+    # Lines after the last newline (a missing final newline) belong to the last segment
+    prediction_offsets[-1] = len(predictions)
+    truth_offsets[-1] = len(truth)
+    return [((prediction_offsets[i], prediction_offsets[i + 1]), (truth_offsets[i], truth_offsets[i + 1]))
+            for i in range(len(boundaries) - 1)]
+
+
+def confusion_matrix_from_files(predictions_path: str | Path, truth_path: str | Path, workers: int | None = None,
+                                block_bytes: int = BLOCK_BYTES) -> ConfusionMatrix:
+    """
+    Build the confusion matrix of two label files, one label per line.
+
+    Args:
+        predictions_path: File of predicted labels
+        truth_path: File of true labels, line for line
+        workers: Threads for large files, one per CPU by default
+        block_bytes: Bytes encoded at a time
+
+    Returns:
+        ConfusionMatrix with labels in alphabetical order
+
+    Raises:
+        FileNotFoundError: If a file doesn't exist
+        ValueError: If the files have a different number of lines or an empty line
+    """
+    predictions_path, truth_path = Path(predictions_path), Path(truth_path)
+    for path in (predictions_path, truth_path):
+        if not path.exists():
+            raise FileNotFoundError(f"File not found: {path}")
+    predictions, truth = _map_file(predictions_path), _map_file(truth_path)
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(predictions) + len(truth) < PARALLEL_MIN_BYTES:
+        result = confusion_of_ranges(predictions, truth, (0, len(predictions)), (0, len(truth)), block_bytes)
+        return result.sorted()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        ranges = segment_ranges(predictions, truth, workers * 4, block_bytes, executor)
+        parts = executor.map(lambda pair: confusion_of_ranges(predictions, truth, *pair, block_bytes), ranges)
+        result = ConfusionMatrix([], np.zeros((0, 0), dtype=np.int64))
+        # A segment raises if its line ranges differ, which happens only when the files' line counts do
+        for part in parts:
+            result = result.merged(part)
+    return result.sorted()
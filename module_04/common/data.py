@@ -0,0 +1,95 @@
+"""Loading and preparing the knight datasets for the module_04 models."""
+
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+TARGET_COLUMN = 'knight'
+KNIGHT_CLASSES = ['Jedi', 'Sith']
+FEATURE_DTYPE = np.float32
+VALIDATION_RATIO = 0.2
+DEFAULT_SEED = 42
+DEFAULT_TRAIN_PATH = Path(__file__).resolve().parent.parent.parent / 'resources' / 'resources' / 'Train_knight.csv'
+DEFAULT_TEST_PATH = DEFAULT_TRAIN_PATH.with_name('Test_knight.csv')
+
+
+@dataclass
+class KnightData:
+    """Feature matrix, class codes (None for unlabeled data) and feature names."""
+
+    X: np.ndarray
+    y: np.ndarray | None
+    features: list[str]
+
+    @property
+    def classes(self) -> list[str]:
+        return KNIGHT_CLASSES
+
+
+def load_knight_csv(filepath: str | Path) -> KnightData:
+    """
+    Load a knight CSV as a float32 matrix and 0 (Jedi) / 1 (Sith) class codes.
+
+    Args:
+        filepath: Path to the CSV file
+
+    Returns:
+        KnightData; y is None when the file has no 'knight' column
+
+    Raises:
+        FileNotFoundError: If file doesn't exist
+        ValueError: If a knight label is unknown
+    """
+    path = Path(filepath)
+    if not path.exists():
+        raise FileNotFoundError(f"Dataset not found: {filepath}")
+
+    columns = pd.read_csv(path, nrows=0).columns
+    dtypes = {column: FEATURE_DTYPE for column in columns if column != TARGET_COLUMN}
+    if TARGET_COLUMN in columns:
+        dtypes[TARGET_COLUMN] = pd.CategoricalDtype(KNIGHT_CLASSES)
+    df = pd.read_csv(path, dtype=dtypes)
+
+    y = None
+    if TARGET_COLUMN in df.columns:
+        if df[TARGET_COLUMN].isna().any():
+            raise ValueError(f"Unknown or missing {TARGET_COLUMN} labels in {filepath}")
+        y = df.pop(TARGET_COLUMN).cat.codes.to_numpy(dtype=np.int64)
+    return KnightData(df.to_numpy(dtype=FEATURE_DTYPE), y, list(df.columns))
+
+
+def load_train_test(argv: list[str]) -> tuple[KnightData, KnightData]:
+    """Load the Train_knight.csv and Test_knight.csv given on the command line, or exit with an error."""
+    if len(argv) != 3:
+        print(f"Usage: {Path(argv[0]).name} Train_knight.csv Test_knight.csv")
+        sys.exit(1)
+    try:
+        train, test = load_knight_csv(argv[1]), load_knight_csv(argv[2])
+    except (FileNotFoundError, ValueError) as e:
+        print(f"✗ Error: {e}")
+        sys.exit(1)
+    if train.y is None:
+        print(f"✗ Error: {argv[1]} has no '{TARGET_COLUMN}' column")
+        sys.exit(1)
+    if test.features != train.features:
+        print("✗ Error: training and test files have different feature columns")
+        sys.exit(1)
+    return train, test
+
+
+def validation_split(y: np.ndarray, ratio: float = VALIDATION_RATIO,
+                     seed: int = DEFAULT_SEED) -> tuple[np.ndarray, np.ndarray]:
+    """Stratified (train, validation) row indices, like module_03's Training/Validation files."""
+    from sklearn.model_selection import train_test_split
+
+    return train_test_split(np.arange(len(y)), test_size=ratio, random_state=seed, stratify=y)
+
+
+def write_predictions(codes: np.ndarray, filepath: str | Path) -> None:
+    """Write one class name per line, in the format of ex00/predictions.txt."""
+    names = np.array(KNIGHT_CLASSES)[codes]
+    Path(filepath).write_text('\n'.join(names) + '\n')
+    print(f"✓ {len(names)} predictions written to {filepath}")
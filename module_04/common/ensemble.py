@@ -0,0 +1,210 @@
+"""Voting ensembles evaluated from cached out-of-fold probabilities.
+
+Each base model is trained once per cross-validation fold. Its probabilities
+on the held-out rows of every fold form the out-of-fold (OOF) matrix. Its
+probabilities on the test rows are averaged over the fold models. Both are
+saved to an .npz file whose name hashes the model configuration, the folds and
+the data, so a model is only retrained when one of them changes. Missing
+(model, fold) fits run in a process pool. A voting combination is then a
+weighted sum of cached arrays and an argmax, which takes milliseconds.
+"""
+
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from common.confusion import ConfusionMatrix
+from common.data import DEFAULT_SEED, KNIGHT_CLASSES
+
+DEFAULT_FOLDS = 5
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / '.cache' / 'ensemble'
+# Distance- and margin-based models, fitted on standardized features
+SCALED_KINDS = {'knn', 'logistic', 'svm'}
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    """A base model: a name, the kind of estimator and its parameters."""
+
+    name: str
+    kind: str
+    params: dict = field(default_factory=dict, hash=False)
+
+    def config(self) -> str:
+        return json.dumps({'kind': self.kind, 'params': self.params}, sort_keys=True)
+
+
+def build_model(spec: ModelSpec, prescaled: bool = False):
+    """
+    Create the unfitted scikit-learn estimator of a spec.
+
+    Args:
+        spec: Model kind and parameters
+        prescaled: Rows are already standardized, so leave out the scaler step
+
+    Raises:
+        ValueError: If the kind is unknown
+    """
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.neighbors import KNeighborsClassifier
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.svm import SVC
+    from sklearn.tree import DecisionTreeClassifier
+
+    factories = {
+        'knn': KNeighborsClassifier,
+        'logistic': LogisticRegression,
+        'svm': lambda **params: SVC(probability=True, **params),
+        'tree': DecisionTreeClassifier,
+        'forest': RandomForestClassifier,
+    }
+    if spec.kind not in factories:
+        raise ValueError(f"Unknown model kind '{spec.kind}', expected one of {', '.join(factories)}")
+    model = factories[spec.kind](**spec.params)
+    if spec.kind in SCALED_KINDS and not prescaled:
+        return make_pipeline(StandardScaler(), model)
+    return model
+
+
+def data_digest(*arrays: np.ndarray) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(f"{array.dtype}{array.shape}".encode())
+        digest.update(array.data)
+    return digest.hexdigest()
+
+
+def _save_arrays(path: Path, **arrays: np.ndarray) -> None:
+    """Write an .npz beside its final name and rename it into place, so readers never see a partial file."""
+    temporary = path.with_name(path.name + '.tmp')
+    with open(temporary, 'wb') as npz_file:
+        np.savez(npz_file, **arrays)
+    os.replace(temporary, path)
+
+
+def _fit_fold(spec: ModelSpec, X, y, X_test, train_rows, held_out_rows):
+    model = build_model(spec).fit(X[train_rows], y[train_rows])
+    return model.predict_proba(X[held_out_rows]), model.predict_proba(X_test)
+
+
+@dataclass
+class CachedModel:
+    """Out-of-fold probabilities on the training rows and fold-averaged test probabilities."""
+
+    spec: ModelSpec
+    oof: np.ndarray
+    test: np.ndarray
+    reused: bool
+
+
+class Workbench:
+    """Base models cross-validated once, and voting combinations scored from their cached probabilities."""
+
+    def __init__(self, X: np.ndarray, y: np.ndarray, X_test: np.ndarray, folds: int = DEFAULT_FOLDS,
+                 seed: int = DEFAULT_SEED, cache_dir: str | Path = DEFAULT_CACHE_DIR, labels=KNIGHT_CLASSES):
+        from sklearn.model_selection import StratifiedKFold
+
+        self.X, self.y, self.X_test = X, y, X_test
+        self.labels = list(labels)
+        self.folds = list(StratifiedKFold(folds, shuffle=True, random_state=seed).split(X, y))
+        self.cache_dir = Path(cache_dir)
+        self.digest = data_digest(X, y, X_test, *(rows for _, rows in self.folds))
+        self.models: dict[str, CachedModel] = {}
+
+    def cache_path(self, spec: ModelSpec) -> Path:
+        key = hashlib.blake2b(f"{spec.config()}|{self.digest}".encode(), digest_size=16).hexdigest()
+        return self.cache_dir / f"{spec.kind}-{key}.npz"
+
+    def add(self, specs: list[ModelSpec], workers: int | None = None) -> None:
+        """
+        Load the cached probabilities of each spec, fitting the missing ones in a process pool.
+
+        Raises:
+            ValueError: If two specs share a name or a kind is unknown
+        """
+        names = [spec.name for spec in specs]
+        if len(set(names)) != len(names):
+            raise ValueError("Model names must be unique")
+
+        missing = []
+        for spec in specs:
+            build_model(spec)
+            path = self.cache_path(spec)
+            if path.exists():
+                with np.load(path) as arrays:
+                    self.models[spec.name] = CachedModel(spec, arrays['oof'], arrays['test'], reused=True)
+            else:
+                missing.append(spec)
+        if not missing:
+            return
+
+        tasks = [(spec, fold) for spec in missing for fold in range(len(self.folds))]
+        with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count(), len(tasks))) as executor:
+            futures = {
+                task: executor.submit(_fit_fold, task[0], self.X, self.y, self.X_test, *self.folds[task[1]])
+                for task in tasks
+            }
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            for spec in missing:
+                oof = np.empty((len(self.y), len(self.labels)))
+                test = np.zeros((len(self.X_test), len(self.labels)))
+                for fold, (_, held_out_rows) in enumerate(self.folds):
+                    held_out, fold_test = futures[spec, fold].result()
+                    oof[held_out_rows] = held_out
+                    test += fold_test / len(self.folds)
+                _save_arrays(self.cache_path(spec), oof=oof, test=test)
+                self.models[spec.name] = CachedModel(spec, oof, test, reused=False)
+
+    def _vote(self, probabilities: list[np.ndarray], weights, voting: str) -> np.ndarray:
+        weights = np.ones(len(probabilities)) if weights is None else np.asarray(weights, dtype=np.float64)
+        if voting == 'soft':
+            scores = sum(weight * proba for weight, proba in zip(weights, probabilities))
+        elif voting == 'hard':
+            scores = sum(weight * np.eye(len(self.labels))[proba.argmax(axis=1)]
+                         for weight, proba in zip(weights, probabilities))
+        else:
+            raise ValueError(f"Unknown voting '{voting}', expected 'soft' or 'hard'")
+        return scores.argmax(axis=1)
+
+    def evaluate(self, members: list[str], weights=None, voting: str = 'soft') -> ConfusionMatrix:
+        """Out-of-fold confusion matrix of a voting combination of cached models."""
+        predictions = self._vote([self.models[name].oof for name in members], weights, voting)
+        return ConfusionMatrix.from_codes(self.y, predictions, self.labels)
+
+    def predict(self, members: list[str], weights=None, voting: str = 'soft') -> np.ndarray:
+        """Class codes of the test rows for a voting combination of cached models."""
+        return self._vote([self.models[name].test for name in members], weights, voting)
+
+    def search(self, weight_grid=(1, 2, 3), votings=('soft', 'hard'),
+               min_members: int = 2) -> list[tuple[float, tuple[str, ...], tuple, str]]:
+        """
+        Score every combination of members, weights and voting on the out-of-fold probabilities.
+
+        Returns:
+            (macro F1, members, weights, voting) tuples, best first
+        """
+        results = []
+        names = list(self.models)
+        for size in range(min_members, len(names) + 1):
+            for members in itertools.combinations(names, size):
+                for weights in itertools.product(weight_grid, repeat=size):
+                    # Weights with a common factor vote like the reduced ones
+                    if np.gcd.reduce(weights) != 1:
+                        continue
+                    for voting in votings:
+                        # A hard vote where one member outweighs all the others is that member alone
+                        if voting == 'hard' and 2 * max(weights) > sum(weights):
+                            continue
+                        f1 = self.evaluate(list(members), weights, voting).f1.mean()
+                        results.append((float(f1), members, weights, voting))
+        # Stable sort: ties keep the smallest, unweighted combinations first
+        return sorted(results, key=lambda result: -result[0])
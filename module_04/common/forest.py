@@ -0,0 +1,169 @@
+"""Tree ensembles flattened to arrays for batch inference.
+
+FlatForest stores the nodes of every tree in one set of contiguous arrays:
+the split feature and threshold, the left and right child, and the class
+probabilities of each node. Leaves point to themselves. A batch is classified
+level by level: the current node of every (tree, row) pair moves one level
+down at a time with plain array gathers, and no Python runs per row. Trees are
+sorted deepest first, so a level only touches the trees that are still that
+deep. Rows go through in blocks small enough to stay in cache, and groups of
+trees run in a thread pool, since the gathers release the GIL. The arrays can
+be saved to and loaded from an .npz file without scikit-learn.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+# Rows moved through the trees at a time; the (trees, rows) node block stays in cache
+TRAVERSAL_BLOCK_ROWS = 512
+
+
+@dataclass
+class FlatForest:
+    """Nodes of all trees; tree t starts at node roots[t] and is depths[t] levels deep."""
+
+    feature: np.ndarray     # int32, split feature, 0 for leaves
+    threshold: np.ndarray   # float32, go left when x[feature] <= threshold, +inf for leaves
+    left: np.ndarray        # int32, absolute node index; leaves point to themselves
+    right: np.ndarray       # int32
+    value: np.ndarray       # float64 (nodes, classes), class probabilities
+    roots: np.ndarray       # int32
+    depths: np.ndarray      # int32
+    classes: np.ndarray
+
+    def __post_init__(self):
+        # Children interleaved so that one gather of 2 * node + goes_right picks the next node
+        self._children = np.stack([self.left, self.right], axis=1).ravel()
+
+    @classmethod
+    def from_sklearn(cls, model) -> 'FlatForest':
+        """
+        Flatten a fitted DecisionTreeClassifier or RandomForestClassifier.
+
+        Raises:
+            ValueError: If the model is not a fitted tree classifier
+        """
+        estimators = getattr(model, 'estimators_', [model])
+        if not hasattr(model, 'classes_') or not all(hasattr(tree, 'tree_') for tree in estimators):
+            raise ValueError(f"Expected a fitted decision tree or random forest, got {type(model).__name__}")
+
+        parts, roots, offset = [], [], 0
+        for estimator in estimators:
+            tree = estimator.tree_
+            nodes = np.arange(tree.node_count, dtype=np.int32)
+            leaf = tree.children_left < 0
+            value = tree.value[:, 0, :].astype(np.float64)
+            value /= value.sum(axis=1, keepdims=True)
+            parts.append((
+                np.where(leaf, 0, tree.feature).astype(np.int32),
+                np.where(leaf, np.inf, tree.threshold),
+                np.where(leaf, nodes, tree.children_left).astype(np.int32) + offset,
+                np.where(leaf, nodes, tree.children_right).astype(np.int32) + offset,
+                value,
+            ))
+            roots.append(offset)
+            offset += tree.node_count
+
+        feature, threshold, left, right, value = (np.concatenate(column) for column in zip(*parts))
+        depths = np.array([estimator.tree_.max_depth for estimator in estimators], dtype=np.int32)
+        return cls(feature, float32_threshold(threshold), left, right, value,
+                   np.array(roots, dtype=np.int32), depths, np.asarray(model.classes_))
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def save(self, filepath: str | Path) -> None:
+        arrays = {name: value for name, value in vars(self).items() if not name.startswith('_')}
+        np.savez(filepath, **arrays)
+
+    @classmethod
+    def load(cls, filepath: str | Path) -> 'FlatForest':
+        with np.load(filepath) as arrays:
+            return cls(**{name: arrays[name] for name in arrays.files})
+
+    def _leaf_blocks(self, X: np.ndarray, trees: np.ndarray):
+        """Yield (start, stop, order, leaves) per row block; leaves[i] is tree trees[order[i]]."""
+        order = np.argsort(-self.depths[trees], kind='stable')
+        roots, depths = self.roots[trees][order], self.depths[trees][order]
+        # Number of trees (deepest first) still descending at each level
+        descending = [int(np.count_nonzero(depths > level)) for level in range(depths.max(initial=0))]
+
+        width = X.shape[1]
+        flat = X.ravel()
+        for start in range(0, len(X), TRAVERSAL_BLOCK_ROWS):
+            stop = min(start + TRAVERSAL_BLOCK_ROWS, len(X))
+            row_offsets = _row_offsets(start, stop, width)
+            node = np.repeat(roots[:, None], stop - start, axis=1)
+            for count in descending:
+                current = node[:count]
+                values = flat.take(self.feature.take(current) + row_offsets)
+                node[:count] = self._children.take(current * 2 + (values > self.threshold.take(current)))
+            yield start, stop, order, node
+
+    def apply(self, X: np.ndarray, trees: np.ndarray | None = None) -> np.ndarray:
+        """
+        Leaf reached by each row in each tree.
+
+        Args:
+            X: (rows, features) matrix, converted to float32 like scikit-learn does
+            trees: Tree numbers to run, all trees by default
+
+        Returns:
+            (len(trees), rows) absolute node indices
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        trees = np.arange(self.n_trees) if trees is None else np.asarray(trees)
+        leaves = np.empty((len(trees), len(X)), dtype=np.int32)
+        for start, stop, order, node in self._leaf_blocks(X, trees):
+            leaves[order, start:stop] = node
+        return leaves
+
+    def predict_proba(self, X: np.ndarray, workers: int | None = None) -> np.ndarray:
+        """Class probabilities averaged over the trees, like scikit-learn's predict_proba."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        workers = max(1, min(workers or os.cpu_count(), self.n_trees))
+
+        def group_proba(trees: np.ndarray) -> np.ndarray:
+            total = np.empty((len(X), len(self.classes)), dtype=np.float64)
+            for start, stop, _, node in self._leaf_blocks(X, trees):
+                total[start:stop] = self.value.take(node, axis=0).sum(axis=0)
+            return total
+
+        # Tree t goes to group t % workers, so the groups get a similar mix of depths
+        groups = [np.arange(group, self.n_trees, workers) for group in range(workers)]
+        if workers == 1:
+            total = group_proba(groups[0])
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                total = sum(executor.map(group_proba, groups))
+        return total / self.n_trees
+
+    def predict(self, X: np.ndarray, workers: int | None = None) -> np.ndarray:
+        return self.classes[self.predict_proba(X, workers).argmax(axis=1)]
+
+
+def _row_offsets(start: int, stop: int, width: int) -> np.ndarray:
+    """Position of each row's first value in the flattened matrix.
+
+    intp, not int32: rows x features passes 2**31 for batches of tens of
+    millions of rows, and a wrapped offset would read another row silently.
+    """
+    return np.arange(start * width, stop * width, width, dtype=np.intp)
+
+
+def float32_threshold(threshold: np.ndarray) -> np.ndarray:
+    """
+    Largest float32 at or below each float64 threshold.
+
+    For a float32 x, x <= float32_threshold(t) exactly when x <= t, so the
+    traversal compares in float32 and still splits like scikit-learn.
+    """
+    rounded = threshold.astype(np.float32)
+    above = rounded.astype(np.float64) > threshold
+    rounded[above] = np.nextafter(rounded[above], np.float32(-np.inf))
+    return rounded
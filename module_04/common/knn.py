@@ -0,0 +1,170 @@
+"""K-nearest-neighbours evaluation for every k from one neighbour graph.
+
+The max_k nearest training rows of each query are found once, with a blocked
+BLAS distance kernel: |q|² - 2 q·x + |x|² for a block of queries against all
+training rows, then argpartition. The neighbours come out sorted by distance,
+so the votes for k are the votes for k - 1 plus the k-th neighbour's label. A
+cumulative sum over the neighbour axis therefore gives the predictions of
+every k in one pass. Query blocks run in a thread pool; NumPy's matrix
+product releases the GIL.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from common.confusion import ConfusionMatrix
+
+# Upper bound on each block's query x training distance matrix
+DISTANCE_BLOCK_BYTES = 64 << 20
+
+
+def _block_rows(n_train: int) -> int:
+    return max(1, DISTANCE_BLOCK_BYTES // (8 * max(n_train, 1)))
+
+
+def nearest_neighbours(train_X: np.ndarray, query_X: np.ndarray, k: int,
+                       train_norms: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Return the k nearest training rows of each query, closest first.
+
+    Args:
+        train_X: (n_train, features) matrix
+        query_X: (n_query, features) matrix, small enough for one distance block
+        k: Number of neighbours, at most n_train
+        train_norms: Squared norms of the training rows, computed if None
+
+    Returns:
+        (indices, squared distances), both (n_query, k)
+    """
+    train_X = np.asarray(train_X, dtype=np.float64)
+    query_X = np.asarray(query_X, dtype=np.float64)
+    if train_norms is None:
+        train_norms = np.einsum('ij,ij->i', train_X, train_X)
+
+    distances = query_X @ train_X.T
+    distances *= -2
+    distances += train_norms
+    distances += np.einsum('ij,ij->i', query_X, query_X)[:, None]
+    np.maximum(distances, 0, out=distances)
+
+    if k < distances.shape[1]:
+        candidates = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(distances.shape[1]), distances.shape).copy()
+    candidate_distances = np.take_along_axis(distances, candidates, axis=1)
+    # Sort by distance, then by training row, so ties resolve the same way every run
+    order = np.lexsort((candidates, candidate_distances), axis=1)
+    indices = np.take_along_axis(candidates, order, axis=1)
+    return indices, np.take_along_axis(candidate_distances, order, axis=1)
+
+
+def predictions_for_every_k(neighbour_labels: np.ndarray, n_classes: int) -> np.ndarray:
+    """
+    Majority vote of the first k neighbours for every k at once.
+
+    Args:
+        neighbour_labels: (n_query, max_k) class codes of the sorted neighbours
+        n_classes: Number of classes
+
+    Returns:
+        (n_query, max_k) predictions; column k - 1 is the vote of k neighbours.
+        Ties go to the lowest class code, as in scikit-learn.
+    """
+    one_hot = neighbour_labels[:, :, None] == np.arange(n_classes)
+    votes = np.cumsum(one_hot, axis=1, dtype=np.int32)
+    return votes.argmax(axis=2)
+
+
+def _sweep_block(train_X, train_y, train_norms, query_X, query_y, max_k, n_classes):
+    indices, _ = nearest_neighbours(train_X, query_X, max_k, train_norms)
+    predictions = predictions_for_every_k(train_y[indices], n_classes)
+    # One bincount over (k, truth, prediction) gives the confusion matrix of every k
+    flat = (np.arange(max_k) * n_classes * n_classes + query_y[:, None] * n_classes + predictions).ravel()
+    return np.bincount(flat, minlength=max_k * n_classes * n_classes)
+
+
+@dataclass
+class KSweep:
+    """Confusion matrix of each k, for k = 1..max_k."""
+
+    labels: list[str]
+    # (max_k, classes, classes): rows true labels, columns predictions
+    confusions: np.ndarray
+
+    @property
+    def ks(self) -> np.ndarray:
+        return np.arange(1, len(self.confusions) + 1)
+
+    def matrix(self, k: int) -> ConfusionMatrix:
+        return ConfusionMatrix(self.labels, self.confusions[k - 1])
+
+    @property
+    def accuracy(self) -> np.ndarray:
+        return np.trace(self.confusions, axis1=1, axis2=2) / self.confusions.sum(axis=(1, 2))
+
+    @property
+    def f1(self) -> np.ndarray:
+        """Macro-averaged F1 of each k."""
+        return np.array([self.matrix(k).f1.mean() for k in self.ks])
+
+    @property
+    def best_k(self) -> int:
+        """k with the highest F1; the smallest such k on ties."""
+        return int(self.ks[np.argmax(self.f1)])
+
+
+def sweep_k(train_X: np.ndarray, train_y: np.ndarray, query_X: np.ndarray, query_y: np.ndarray,
+            max_k: int, labels: list[str], workers: int | None = None) -> KSweep:
+    """
+    Score KNN for every k from 1 to max_k with a single neighbour search.
+
+    Args:
+        train_X: (n_train, features) training matrix, already scaled
+        train_y: Class codes of the training rows
+        query_X: (n_query, features) validation matrix
+        query_y: Class codes of the validation rows
+        max_k: Largest k to score
+        labels: Class names, indexed by code
+        workers: Threads scoring query blocks, one per CPU by default
+
+    Returns:
+        KSweep with the confusion matrix of every k
+
+    Raises:
+        ValueError: If max_k exceeds the number of training rows
+    """
+    if not 1 <= max_k <= len(train_X):
+        raise ValueError(f"max_k must be between 1 and {len(train_X)}, got {max_k}")
+    train_X = np.asarray(train_X, dtype=np.float64)
+    train_norms = np.einsum('ij,ij->i', train_X, train_X)
+    n_classes = len(labels)
+    block = _block_rows(len(train_X))
+
+    starts = range(0, len(query_X), block)
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        parts = executor.map(
+            lambda start: _sweep_block(train_X, train_y, train_norms, query_X[start:start + block],
+                                       query_y[start:start + block], max_k, n_classes),
+            starts,
+        )
+        counts = sum(parts, np.zeros(max_k * n_classes * n_classes, dtype=np.int64))
+    return KSweep(list(labels), counts.reshape(max_k, n_classes, n_classes))
+
+
+def predict(train_X: np.ndarray, train_y: np.ndarray, query_X: np.ndarray, k: int, n_classes: int,
+            workers: int | None = None) -> np.ndarray:
+    """Majority vote of the k nearest training rows for each query row."""
+    train_X = np.asarray(train_X, dtype=np.float64)
+    train_norms = np.einsum('ij,ij->i', train_X, train_X)
+    block = _block_rows(len(train_X))
+
+    def predict_block(start: int) -> np.ndarray:
+        indices, _ = nearest_neighbours(train_X, query_X[start:start + block], k, train_norms)
+        return predictions_for_every_k(train_y[indices], n_classes)[:, -1]
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        parts = list(executor.map(predict_block, range(0, len(query_X), block)))
+    return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
@@ -0,0 +1,257 @@
+"""Successive-halving hyperparameter search over shared, pre-scaled folds.
+
+FoldCache splits the data into stratified folds once. For each fold, it
+standardizes the rows with a scaler fitted on the training part and can choose
+features by VIF on that part. The scaled rows are written once to a
+SharedMemory block, with each fold's training rows first, in a stratified
+shuffled order, then its held-out rows. Worker processes attach to the block
+and slice views, so no candidate repeats the split, the scaling or the
+selection, and the data is not copied to each process.
+
+successive_halving() runs every candidate of a model kind on a small prefix of
+each fold's training rows. It keeps the best 1/eta and multiplies the row
+budget by eta, until the survivors train on full folds. Candidates go to the
+pool a few at a time with the rung's current promotion cutoff, the score of
+the last promoted candidate among those already complete. A candidate stops
+after a fold once its mean F1 could not reach the cutoff even with perfect
+scores on the remaining folds, so it is dropped without changing who is
+promoted. The search also records when each kind first reaches its required F1.
+"""
+
+import itertools
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from common.confusion import ConfusionMatrix
+from common.data import DEFAULT_SEED, KNIGHT_CLASSES
+from common.ensemble import SCALED_KINDS, ModelSpec, build_model
+from common.vif import eliminate
+
+DEFAULT_FOLDS = 5
+DEFAULT_ETA = 3
+DEFAULT_MIN_ROWS = 60
+# Subject targets: ex04 tree 90%, ex05 KNN 92%, ex06 voting 94%
+REQUIRED_F1 = {'tree': 0.90, 'forest': 0.90, 'knn': 0.92, 'logistic': 0.94, 'svm': 0.94}
+
+
+def grid(kind: str, **values: list) -> list[ModelSpec]:
+    """Every combination of the given parameter values, as named specs."""
+    names = list(values)
+    specs = []
+    for combination in itertools.product(*values.values()):
+        params = dict(zip(names, combination))
+        label = ', '.join(f"{name}={value}" for name, value in params.items())
+        specs.append(ModelSpec(f"{kind}({label})", kind, params))
+    return specs
+
+
+def stratified_order(y: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Shuffled positions of y, interleaved so that every prefix keeps the class proportions."""
+    keys = np.empty(len(y))
+    for label in np.unique(y):
+        members = np.flatnonzero(y == label)
+        # The i-th shuffled member of a class sits at (i + u) / class size along the order
+        keys[rng.permutation(members)] = (np.arange(len(members)) + rng.random(len(members))) / len(members)
+    return np.argsort(keys, kind='stable')
+
+
+@dataclass
+class FoldLayout:
+    """What a worker process needs to attach to the shared folds."""
+
+    x_name: str
+    y_name: str
+    shape: tuple[int, int, int]   # (folds, rows, features)
+    train_sizes: list[int]
+    masks: np.ndarray             # (folds, features) bool: features kept in each fold
+
+
+class FoldCache:
+    """Stratified folds, scaled and feature-selected once, in shared memory."""
+
+    def __init__(self, X: np.ndarray, y: np.ndarray, folds: int = DEFAULT_FOLDS, seed: int = DEFAULT_SEED,
+                 vif_threshold: float | None = None):
+        from sklearn.model_selection import StratifiedKFold
+
+        rows, width = X.shape
+        shape = (folds, rows, width)
+        rng = np.random.default_rng(seed)
+        # One scaled and one raw copy per fold: tree models split on the original values
+        self._x_block = shared_memory.SharedMemory(create=True, size=2 * np.prod(shape) * 4)
+        self._y_block = shared_memory.SharedMemory(create=True, size=folds * rows * 8)
+        scaled = np.ndarray((2, *shape), dtype=np.float32, buffer=self._x_block.buf)
+        labels = np.ndarray((folds, rows), dtype=np.int64, buffer=self._y_block.buf)
+
+        train_sizes, masks = [], np.ones((folds, width), dtype=bool)
+        # eliminate() names features; the column index is the name here
+        names = [str(column) for column in range(width)]
+        splits = StratifiedKFold(folds, shuffle=True, random_state=seed).split(X, y)
+        for fold, (train_rows, held_out_rows) in enumerate(splits):
+            train_rows = train_rows[stratified_order(y[train_rows], rng)]
+            order = np.concatenate([train_rows, held_out_rows])
+            fit = X[train_rows].astype(np.float64)
+            mean, std = fit.mean(axis=0), fit.std(axis=0)
+            scaled[0, fold] = (X[order] - mean) / np.where(std > 0, std, 1)
+            scaled[1, fold] = X[order]
+            labels[fold] = y[order]
+            train_sizes.append(len(train_rows))
+            if vif_threshold is not None:
+                kept = eliminate(np.corrcoef(fit, rowvar=False), names, vif_threshold).features
+                masks[fold] = np.isin(names, kept)
+
+        self.layout = FoldLayout(self._x_block.name, self._y_block.name, shape, train_sizes, masks)
+
+    def close(self) -> None:
+        for block in (self._x_block, self._y_block):
+            block.close()
+            block.unlink()
+
+    def __enter__(self) -> 'FoldCache':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+_shared: dict = {}
+
+
+def _attach(layout: FoldLayout) -> None:
+    """Pool initializer: map the shared folds into this worker."""
+    x_block = shared_memory.SharedMemory(name=layout.x_name)
+    y_block = shared_memory.SharedMemory(name=layout.y_name)
+    _shared.update(
+        layout=layout, blocks=(x_block, y_block),
+        X=np.ndarray((2, *layout.shape), dtype=np.float32, buffer=x_block.buf),
+        y=np.ndarray(layout.shape[:2], dtype=np.int64, buffer=y_block.buf),
+    )
+
+
+def _score(spec: ModelSpec, budget: int, cutoff: float | None) -> tuple[list[float], bool]:
+    """F1 of a candidate on each fold with at most budget training rows; stops once it cannot reach cutoff."""
+    layout = _shared['layout']
+    folds = layout.shape[0]
+    copy = 0 if spec.kind in SCALED_KINDS else 1
+    scores = []
+    for fold in range(folds):
+        X, y, train_size = _shared['X'][copy, fold], _shared['y'][fold], layout.train_sizes[fold]
+        columns = layout.masks[fold]
+        rows = min(budget, train_size)
+        try:
+            model = build_model(spec, prescaled=True).fit(X[:rows][:, columns], y[:rows])
+            predictions = model.predict(X[train_size:][:, columns])
+            scores.append(ConfusionMatrix.from_codes(y[train_size:], predictions, KNIGHT_CLASSES).f1.mean())
+        except ValueError:
+            # e.g. more neighbours than training rows: the candidate cannot run at this budget
+            scores.append(0.0)
+        if cutoff is not None and (sum(scores) + folds - len(scores)) / folds < cutoff:
+            return scores, False
+    return scores, True
+
+
+@dataclass
+class Trial:
+    """One candidate evaluated at one row budget."""
+
+    spec: ModelSpec
+    rows: int
+    scores: list[float]
+    complete: bool
+    seconds: float     # since the start of its kind's search
+
+    @property
+    def f1(self) -> float:
+        return float(np.mean(self.scores))
+
+
+@dataclass
+class SearchResult:
+    """Every trial of one model kind, the best full-budget candidate and when the target was reached."""
+
+    kind: str
+    trials: list[Trial] = field(default_factory=list)
+    best: Trial | None = None
+    required_f1: float | None = None
+    seconds_to_required: float | None = None
+    seconds: float = 0.0
+
+    @property
+    def fits(self) -> int:
+        return sum(len(trial.scores) for trial in self.trials)
+
+    @property
+    def abandoned(self) -> int:
+        return sum(not trial.complete for trial in self.trials)
+
+
+def row_budgets(max_rows: int, min_rows: int = DEFAULT_MIN_ROWS, eta: int = DEFAULT_ETA) -> list[int]:
+    """Training rows per rung: min_rows, min_rows * eta, ... up to every training row."""
+    budgets = [min(min_rows, max_rows)]
+    while budgets[-1] < max_rows:
+        budgets.append(min(budgets[-1] * eta, max_rows))
+    return budgets
+
+
+def _rung_cutoff(rung: list[Trial], promoted: int) -> float | None:
+    """Score a candidate must reach to be promoted, once enough candidates of the rung are complete."""
+    if len(rung) < promoted:
+        return None
+    return sorted(trial.f1 for trial in rung)[-promoted]
+
+
+def successive_halving(cache: FoldCache, specs: list[ModelSpec], eta: int = DEFAULT_ETA,
+                       min_rows: int = DEFAULT_MIN_ROWS, workers: int | None = None) -> dict[str, SearchResult]:
+    """
+    Search the candidates of each model kind by successive halving on the number of training rows.
+
+    Args:
+        cache: Shared folds
+        specs: Candidates; each kind is searched separately
+        eta: Fraction 1/eta of the candidates promoted to each rung, and growth of the row budget
+        min_rows: Training rows per fold in the first rung
+        workers: Processes, one per CPU by default
+
+    Returns:
+        SearchResult per kind, in the order the kinds first appear in specs
+    """
+    workers = workers or os.cpu_count()
+    budgets = row_budgets(max(cache.layout.train_sizes), min_rows, eta)
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=(cache.layout,)) as executor:
+        for kind in dict.fromkeys(spec.kind for spec in specs):
+            result = SearchResult(kind, required_f1=REQUIRED_F1.get(kind))
+            survivors = [spec for spec in specs if spec.kind == kind]
+            start = time.perf_counter()
+            for budget in budgets:
+                promoted = max(1, len(survivors) // eta)
+                queue, in_flight, rung = deque(survivors), {}, []
+                while queue or in_flight:
+                    # Bounded submission, so later candidates see the cutoff set by earlier ones
+                    while queue and len(in_flight) < 2 * workers:
+                        spec = queue.popleft()
+                        future = executor.submit(_score, spec, budget, _rung_cutoff(rung, promoted))
+                        in_flight[future] = spec
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        scores, complete = future.result()
+                        trial = Trial(in_flight.pop(future), budget, scores, complete, time.perf_counter() - start)
+                        result.trials.append(trial)
+                        if not complete:
+                            continue
+                        rung.append(trial)
+                        if (result.seconds_to_required is None and result.required_f1 is not None
+                                and trial.f1 >= result.required_f1):
+                            result.seconds_to_required = trial.seconds
+                # Stable sort: ties keep the grid order
+                rung.sort(key=lambda trial: (-trial.f1, survivors.index(trial.spec)))
+                result.best = rung[0]
+                survivors = [trial.spec for trial in rung[:promoted]]
+            result.seconds = time.perf_counter() - start
+            results[kind] = result
+    return results
@@ -0,0 +1,149 @@
+"""Variance inflation factors from the inverse correlation matrix.
+
+The VIF of feature j is 1 / (1 - R²_j), R²_j being the fit of j regressed on
+every other feature. It is also the j-th diagonal entry of the inverse
+correlation matrix, so a single inversion gives every VIF at once. Removing
+feature m from the inverse P is a rank-one downdate:
+
+    P' = P[-m, -m] - P[-m, m] P[m, -m] / P[m, m]
+
+Only the diagonal is needed to pick the next feature, so the downdates are
+kept as a low-rank correction U with P' = P - UᵀU. A round then costs one
+matrix-vector product for column m and an O(features) update of the diagonal.
+The correction is folded into P every COMPACT_EVERY rounds. The correlation
+matrix comes from a covariance accumulated over CSV chunks, so the rows are
+never all in memory.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from common.data import TARGET_COLUMN
+
+VIF_THRESHOLD = 5.0
+CHUNK_ROWS = 100_000
+# Downdates held as a low-rank correction before they are applied to the inverse
+COMPACT_EVERY = 64
+
+
+def stream_correlation(filepath: str | Path, chunk_rows: int = CHUNK_ROWS) -> tuple[np.ndarray, list[str]]:
+    """
+    Correlation matrix of the numeric columns of a CSV, read in chunks.
+
+    Chunks are summarized by their count, mean and co-moment matrix and merged
+    with Chan et al.'s pairwise update. Rows with missing values are skipped.
+
+    Args:
+        filepath: Path to the CSV file
+        chunk_rows: Rows parsed at a time
+
+    Returns:
+        (correlation matrix, feature names)
+
+    Raises:
+        FileNotFoundError: If file doesn't exist
+        ValueError: If the file has fewer than two complete rows
+    """
+    path = Path(filepath)
+    if not path.exists():
+        raise FileNotFoundError(f"Dataset not found: {filepath}")
+
+    count, mean, comoment, features = 0, None, None, None
+    for chunk in pd.read_csv(path, chunksize=chunk_rows):
+        chunk = chunk.drop(columns=TARGET_COLUMN, errors='ignore').select_dtypes(include='number')
+        if features is None:
+            features = list(chunk.columns)
+            mean, comoment = np.zeros(len(features)), np.zeros((len(features), len(features)))
+        values = chunk.to_numpy(dtype=np.float64)
+        values = values[~np.isnan(values).any(axis=1)]
+        if not len(values):
+            continue
+
+        chunk_mean = values.mean(axis=0)
+        centered = values - chunk_mean
+        total = count + len(values)
+        delta = chunk_mean - mean
+        comoment += centered.T @ centered + np.outer(delta, delta) * (count * len(values) / total)
+        mean += delta * (len(values) / total)
+        count = total
+
+    if count < 2:
+        raise ValueError(f"Need at least two complete rows in {filepath}")
+    scale = np.sqrt(np.diag(comoment))
+    return comoment / np.outer(scale, scale), features
+
+
+def inverse_correlation(correlation: np.ndarray) -> np.ndarray:
+    """Inverse of a correlation matrix; the pseudo-inverse if it is singular."""
+    try:
+        return np.linalg.inv(correlation)
+    except np.linalg.LinAlgError:
+        return np.linalg.pinv(correlation, hermitian=True)
+
+
+@dataclass
+class VIFSelection:
+    """Features kept, and the dropped features with their VIF when dropped."""
+
+    features: list[str]
+    vif: np.ndarray
+    dropped: list[tuple[str, float]] = field(default_factory=list)
+
+    @property
+    def tolerance(self) -> np.ndarray:
+        return 1 / self.vif
+
+    def table(self) -> pd.DataFrame:
+        return pd.DataFrame({'VIF': self.vif, 'Tolerance': self.tolerance}, index=self.features)
+
+
+def vif_table(correlation: np.ndarray, features: list[str]) -> pd.DataFrame:
+    """VIF and tolerance of every feature."""
+    return VIFSelection(list(features), np.diag(inverse_correlation(correlation)).copy()).table()
+
+
+def eliminate(correlation: np.ndarray, features: list[str], threshold: float = VIF_THRESHOLD) -> VIFSelection:
+    """
+    Drop the feature with the highest VIF until every VIF is below threshold.
+
+    Args:
+        correlation: Correlation matrix of the features
+        features: Feature names, in matrix order
+        threshold: Largest VIF allowed in the result
+
+    Returns:
+        VIFSelection of the remaining features
+    """
+    kept = np.arange(len(features))
+    inverse = inverse_correlation(correlation)
+    vif = np.diag(inverse).copy()
+    correction = np.empty((COMPACT_EVERY, len(kept)))
+    rounds = 0
+    dropped = []
+    while len(dropped) < len(features) - 1:
+        worst = int(np.argmax(vif))
+        if vif[worst] < threshold:
+            break
+        dropped.append((features[kept[worst]], float(vif[worst])))
+
+        # Column of the downdated inverse, then P' = P - u uᵀ with u = column / sqrt(P[m, m])
+        column = inverse[:, worst] - correction[:rounds].T @ correction[:rounds, worst]
+        u = column / np.sqrt(vif[worst])
+        vif -= u * u
+        vif[worst] = -np.inf
+        correction[rounds] = u
+        rounds += 1
+
+        if rounds == COMPACT_EVERY:
+            active = np.isfinite(vif)
+            applied = correction[:, active]
+            inverse = inverse[np.ix_(active, active)] - applied.T @ applied
+            kept, vif = kept[active], np.diag(inverse).copy()
+            correction = np.empty((COMPACT_EVERY, len(kept)))
+            rounds = 0
+
+    active = np.isfinite(vif)
+    return VIFSelection([features[i] for i in kept[active]], vif[active], dropped)
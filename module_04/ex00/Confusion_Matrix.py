@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Print and display the confusion matrix of a prediction file against the truth.
+
+Usage: ./Confusion_Matrix.py predictions.txt truth.txt
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.confusion import ConfusionMatrix, confusion_matrix_from_files
+
+
+def display_matrix(result: ConfusionMatrix, output: Path | None = None) -> None:
+    """Draw the matrix as a heatmap with the counts written in each cell."""
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(6, 5))
+    image = ax.imshow(result.matrix, cmap='Blues')
+    fig.colorbar(image, ax=ax)
+
+    ticks = range(len(result.labels))
+    ax.set_xticks(ticks, result.labels)
+    ax.set_yticks(ticks, result.labels)
+    ax.set_xlabel('Predicted', fontsize=11)
+    ax.set_ylabel('True', fontsize=11)
+    ax.set_title('Confusion Matrix', fontsize=14, fontweight='bold')
+
+    # Middle of the colour scale, which spans the smallest to the largest count
+    threshold = (result.matrix.min() + result.matrix.max()) / 2
+    for row in ticks:
+        for column in ticks:
+            count = result.matrix[row, column]
+            ax.text(column, row, f"{count:,}", ha='center', va='center',
+                    color='white' if count > threshold else 'black')
+
+    fig.tight_layout()
+    if output is not None:
+        fig.savefig(output, dpi=100)
+        print(f"✓ Saved {output}")
+    else:
+        plt.show()
+
+
+def main() -> int:
+    """Compute the confusion matrix and metrics of the two label files."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('predictions', type=Path, help='predicted labels, one per line')
+    parser.add_argument('truth', type=Path, help='true labels, one per line')
+    parser.add_argument('--output', type=Path, help='save the graph to this file instead of showing it')
+    parser.add_argument('--no-display', action='store_true', help='only print the matrix')
+    args = parser.parse_args()
+
+    try:
+        result = confusion_matrix_from_files(args.predictions, args.truth)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"✗ Error: {e}")
+        return 1
+
+    print(result.report())
+    print(result.matrix)
+
+    if not args.no_display:
+        display_matrix(result, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        sys.exit(1)
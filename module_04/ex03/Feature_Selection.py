@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""Display the VIF of the knight features, then keep only features with a VIF under 5.
+
+Usage: ./Feature_Selection.py [Train_knight.csv]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.data import DEFAULT_TRAIN_PATH
+from common.vif import VIF_THRESHOLD, eliminate, stream_correlation, vif_table
+
+
+def main() -> int:
+    """Print the VIF table of every feature and of the selected features."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('dataset', nargs='?', type=Path, default=DEFAULT_TRAIN_PATH, help='knight CSV file')
+    parser.add_argument('--threshold', type=float, default=VIF_THRESHOLD, help='largest VIF kept')
+    args = parser.parse_args()
+
+    try:
+        correlation, features = stream_correlation(args.dataset)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"✗ Error: {e}")
+        return 1
+
+    print(vif_table(correlation, features).to_string())
+
+    selection = eliminate(correlation, features, args.threshold)
+    print(f"\nDropped {len(selection.dropped)} features, highest VIF first:")
+    for name, vif in selection.dropped:
+        print(f"  {name:<16}{vif:>14.2f}")
+
+    print(f"\n✓ {len(selection.features)} features with a VIF under {args.threshold:g}:\n")
+    print(selection.table().to_string())
+    return 0
+
+
+if __name__ == '__main__':
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        sys.exit(1)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Train a random forest on the knights and display one of its trees.
+
+Usage: ./Tree.py Train_knight.csv Test_knight.csv
+
+Reports the F1 score on a validation split, then refits on every training row,
+predicts Test_knight.csv with the flattened forest and writes Tree.txt.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.confusion import ConfusionMatrix
+from common.data import DEFAULT_SEED, KNIGHT_CLASSES, load_train_test, validation_split, write_predictions
+from common.forest import FlatForest
+
+N_TREES = 100
+F1_TARGET = 0.90
+DISPLAY_DEPTH = 4
+OUTPUT_FILE = 'Tree.txt'
+
+
+def train_forest(X, y):
+    from sklearn.ensemble import RandomForestClassifier
+
+    return RandomForestClassifier(n_estimators=N_TREES, random_state=DEFAULT_SEED).fit(X, y)
+
+
+def display_tree(model, features: list[str], output: Path | None = None) -> None:
+    """Draw the first levels of the forest's first tree."""
+    import matplotlib.pyplot as plt
+    from sklearn.tree import plot_tree
+
+    fig, ax = plt.subplots(figsize=(20, 10))
+    plot_tree(model.estimators_[0], feature_names=features, class_names=KNIGHT_CLASSES,
+              max_depth=DISPLAY_DEPTH, filled=True, rounded=True, fontsize=8, ax=ax)
+    ax.set_title(f'Random forest, tree 1 of {N_TREES} (first {DISPLAY_DEPTH} levels)',
+                 fontsize=14, fontweight='bold')
+
+    fig.tight_layout()
+    if output is not None:
+        fig.savefig(output, dpi=100)
+        print(f"✓ Saved {output}")
+    else:
+        plt.show()
+
+
+def main() -> int:
+    """Validate the forest, then predict the test set with a forest fitted on all rows."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('train', help='Train_knight.csv')
+    parser.add_argument('test', help='Test_knight.csv')
+    parser.add_argument('--export', type=Path, help='save the flattened forest to this .npz file')
+    parser.add_argument('--output', type=Path, help='save the graph to this file instead of showing it')
+    parser.add_argument('--no-display', action='store_true', help='do not draw the tree')
+    args = parser.parse_args()
+
+    train, test = load_train_test([sys.argv[0], args.train, args.test])
+    fit_rows, validation_rows = validation_split(train.y)
+
+    forest = FlatForest.from_sklearn(train_forest(train.X[fit_rows], train.y[fit_rows]))
+    validation = ConfusionMatrix.from_codes(train.y[validation_rows], forest.predict(train.X[validation_rows]),
+                                            KNIGHT_CLASSES)
+    print(validation.report())
+    f1 = validation.f1.mean()
+    print(f"\n{'✓' if f1 >= F1_TARGET else '✗'} F1 {f1:.2%} (target {F1_TARGET:.0%})")
+
+    model = train_forest(train.X, train.y)
+    forest = FlatForest.from_sklearn(model)
+    write_predictions(forest.predict(test.X), OUTPUT_FILE)
+    if args.export is not None:
+        forest.save(args.export)
+        print(f"✓ Forest saved to {args.export}")
+
+    if not args.no_display:
+        display_tree(model, train.features, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        sys.exit(1)
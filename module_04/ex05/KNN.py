@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Train a KNN classifier on the knights, choosing k from a validation sweep.
+
+Usage: ./KNN.py Train_knight.csv Test_knight.csv
+
+Plots the validation accuracy and F1 for every k, predicts Test_knight.csv
+with the best k and writes the predictions to KNN.txt.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.data import KNIGHT_CLASSES, load_train_test, validation_split, write_predictions
+from common.knn import KSweep, predict, sweep_k
+
+DEFAULT_MAX_K = 30
+F1_TARGET = 0.92
+OUTPUT_FILE = 'KNN.txt'
+
+
+def plot_sweep(sweep: KSweep, output: Path | None = None) -> None:
+    """Plot the validation accuracy and F1 against k."""
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(8, 5))
+    ax.plot(sweep.ks, sweep.accuracy * 100, marker='o', markersize=3, label='accuracy')
+    ax.plot(sweep.ks, sweep.f1 * 100, marker='o', markersize=3, label='F1 (macro)')
+    ax.axvline(sweep.best_k, color='gray', linestyle='--', linewidth=1, label=f'best k = {sweep.best_k}')
+    ax.set_xlabel('k values', fontsize=11)
+    ax.set_ylabel('score (%)', fontsize=11)
+    ax.set_title('KNN on the validation set', fontsize=14, fontweight='bold')
+    ax.grid(alpha=0.3)
+    ax.legend()
+
+    fig.tight_layout()
+    if output is not None:
+        fig.savefig(output, dpi=100)
+        print(f"✓ Saved {output}")
+    else:
+        plt.show()
+
+
+def main() -> int:
+    """Sweep k on a validation split, then predict the test set with the best k."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('train', help='Train_knight.csv')
+    parser.add_argument('test', help='Test_knight.csv')
+    parser.add_argument('--max-k', type=int, default=DEFAULT_MAX_K, help='largest k of the sweep')
+    parser.add_argument('--output', type=Path, help='save the graph to this file instead of showing it')
+    parser.add_argument('--no-display', action='store_true', help='do not draw the graph')
+    args = parser.parse_args()
+
+    from sklearn.preprocessing import StandardScaler
+
+    train, test = load_train_test([sys.argv[0], args.train, args.test])
+    fit_rows, validation_rows = validation_split(train.y)
+
+    # Distances need comparable feature scales; fit the scaler on the training part only
+    scaler = StandardScaler().fit(train.X[fit_rows])
+    try:
+        sweep = sweep_k(scaler.transform(train.X[fit_rows]), train.y[fit_rows],
+                        scaler.transform(train.X[validation_rows]), train.y[validation_rows],
+                        args.max_k, KNIGHT_CLASSES)
+    except ValueError as e:
+        print(f"✗ Error: {e}")
+        return 1
+
+    best = sweep.matrix(sweep.best_k)
+    print(f"Validation sweep, k = 1..{args.max_k}: best k = {sweep.best_k}\n")
+    print(best.report())
+    f1 = best.f1.mean()
+    print(f"\n{'✓' if f1 >= F1_TARGET else '✗'} F1 {f1:.2%} (target {F1_TARGET:.0%})")
+
+    # Refit on every training row for the final predictions
+    scaler = StandardScaler().fit(train.X)
+    predictions = predict(scaler.transform(train.X), train.y, scaler.transform(test.X),
+                          sweep.best_k, len(KNIGHT_CLASSES))
+    write_predictions(predictions, OUTPUT_FILE)
+
+    if not args.no_display:
+        plot_sweep(sweep, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        sys.exit(1)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Vote between a KNN, a random forest and a logistic regression on the knights.
+
+Usage: ./democracy.py Train_knight.csv Test_knight.csv
+
+Cross-validates each model once (cached in module_04/.cache/ensemble), picks
+the voting combination with the best out-of-fold F1 and writes its test
+predictions to Voting.txt.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.data import DEFAULT_SEED, load_train_test, write_predictions
+from common.ensemble import DEFAULT_CACHE_DIR, DEFAULT_FOLDS, ModelSpec, Workbench
+
+MODELS = [
+    ModelSpec('knn', 'knn', {'n_neighbors': 11}),
+    ModelSpec('forest', 'forest', {'n_estimators': 100, 'random_state': DEFAULT_SEED}),
+    ModelSpec('logistic', 'logistic', {'C': 1.0, 'max_iter': 1000}),
+]
+F1_TARGET = 0.94
+OUTPUT_FILE = 'Voting.txt'
+
+
+def main() -> int:
+    """Fit or load the base models, search the voting combinations and predict the test set."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('train', help='Train_knight.csv')
+    parser.add_argument('test', help='Test_knight.csv')
+    parser.add_argument('--folds', type=int, default=DEFAULT_FOLDS)
+    parser.add_argument('--workers', type=int, default=None, help='processes, one per CPU by default')
+    parser.add_argument('--cache-dir', type=Path, default=DEFAULT_CACHE_DIR)
+    args = parser.parse_args()
+
+    train, test = load_train_test([sys.argv[0], args.train, args.test])
+    bench = Workbench(train.X, train.y, test.X, folds=args.folds, cache_dir=args.cache_dir)
+
+    start = time.perf_counter()
+    bench.add(MODELS, workers=args.workers)
+    print(f"Base models ({args.folds}-fold out-of-fold F1), ready in {time.perf_counter() - start:.2f}s:")
+    for name, model in bench.models.items():
+        source = 'cached' if model.reused else 'trained'
+        print(f"  {name:<10}{bench.evaluate([name]).f1.mean():>8.2%}  ({source})")
+
+    start = time.perf_counter()
+    results = bench.search()
+    elapsed = time.perf_counter() - start
+    print(f"\n{len(results)} voting combinations scored in {elapsed * 1e3:.1f} ms")
+
+    f1, members, weights, voting = results[0]
+    print(f"Best: {voting} vote of {', '.join(members)} with weights {weights}\n")
+    print(bench.evaluate(list(members), weights, voting).report())
+    print(f"\n{'✓' if f1 >= F1_TARGET else '✗'} F1 {f1:.2%} (target {F1_TARGET:.0%})")
+
+    write_predictions(bench.predict(list(members), weights, voting), OUTPUT_FILE)
+    return 0
+
+
+if __name__ == '__main__':
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        sys.exit(1)
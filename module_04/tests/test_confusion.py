@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+from sklearn.metrics import confusion_matrix
+
+import common.confusion as confusion
+from common.confusion import confusion_matrix_from_files
+
+
+def write_labels(path, labels, newline='\n'):
+    path.write_text(newline.join(labels) + newline)
+
+
+def expected_matrix(truth, predictions):
+    labels = sorted(set(truth) | set(predictions))
+    return labels, confusion_matrix(truth, predictions, labels=labels)
+
+
+def random_labels(rng, choices, size):
+    return [choices[i] for i in rng.integers(0, len(choices), size)]
+
+
+def test_matches_sklearn(tmp_path):
+    rng = np.random.default_rng(0)
+    truth = random_labels(rng, ['Jedi', 'Sith'], 1000)
+    predictions = random_labels(rng, ['Jedi', 'Sith'], 1000)
+    write_labels(tmp_path / 'truth.txt', truth)
+    write_labels(tmp_path / 'predictions.txt', predictions)
+
+    result = confusion_matrix_from_files(tmp_path / 'predictions.txt', tmp_path / 'truth.txt')
+
+    labels, matrix = expected_matrix(truth, predictions)
+    assert result.labels == labels
+    np.testing.assert_array_equal(result.matrix, matrix)
+
+
+def test_long_label_only_in_predictions(tmp_path):
+    truth = ['Jedi', 'Sith'] * 5
+    predictions = ['Sith_Lord'] + ['Jedi', 'Sith'] * 4 + ['Jedi']
+    write_labels(tmp_path / 'truth.txt', truth)
+    write_labels(tmp_path / 'predictions.txt', predictions)
+
+    result = confusion_matrix_from_files(tmp_path / 'predictions.txt', tmp_path / 'truth.txt')
+
+    labels, matrix = expected_matrix(truth, predictions)
+    assert result.labels == labels
+    np.testing.assert_array_equal(result.matrix, matrix)
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+@pytest.mark.parametrize('newline', ['\n', '\r\n'])
+def test_mixed_label_widths_across_blocks(tmp_path, monkeypatch, workers, newline):
+    # Labels of 1 to 20 bytes, with long labels absent from most small blocks
+    rng = np.random.default_rng(1)
+    choices = ['J', 'Sith', 'Jedi_Master', 'Sith_Lord_of_the_Dark', 'Padawan']
+    truth = random_labels(rng, choices[:2], 5000) + random_labels(rng, choices, 500)
+    predictions = random_labels(rng, choices, 500) + random_labels(rng, choices[:2], 5000)
+    write_labels(tmp_path / 'truth.txt', truth, newline)
+    write_labels(tmp_path / 'predictions.txt', predictions, newline)
+    monkeypatch.setattr(confusion, 'PARALLEL_MIN_BYTES', 0)
+
+    result = confusion_matrix_from_files(tmp_path / 'predictions.txt', tmp_path / 'truth.txt',
+                                         workers=workers, block_bytes=256)
+
+    labels, matrix = expected_matrix(truth, predictions)
+    assert result.labels == labels
+    np.testing.assert_array_equal(result.matrix, matrix)
+
+
+def test_different_line_counts_are_rejected(tmp_path):
+    write_labels(tmp_path / 'truth.txt', ['Jedi', 'Sith', 'Jedi'])
+    write_labels(tmp_path / 'predictions.txt', ['Jedi', 'Sith'])
+
+    with pytest.raises(ValueError, match='different number of lines'):
+        confusion_matrix_from_files(tmp_path / 'predictions.txt', tmp_path / 'truth.txt')
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from common.ensemble import ModelSpec, Workbench
+
+MODELS = [
+    ModelSpec('knn', 'knn', {'n_neighbors': 5}),
+    ModelSpec('logistic', 'logistic', {'max_iter': 1000}),
+]
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 4))
+    y = (X[:, 0] - X[:, 1] > 0).astype(int)
+    return X, y, rng.normal(size=(50, 4))
+
+
+def test_probabilities_are_cached_and_reused(data, tmp_path):
+    X, y, X_test = data
+    first = Workbench(X, y, X_test, folds=3, cache_dir=tmp_path)
+    first.add(MODELS, workers=1)
+
+    second = Workbench(X, y, X_test, folds=3, cache_dir=tmp_path)
+    second.add(MODELS, workers=1)
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(first.cache_path(spec).name for spec in MODELS)
+    for spec in MODELS:
+        assert not first.models[spec.name].reused and second.models[spec.name].reused
+        np.testing.assert_array_equal(second.models[spec.name].oof, first.models[spec.name].oof)
+        np.testing.assert_array_equal(second.models[spec.name].test, first.models[spec.name].test)
+
+
+def test_search_scores_match_evaluate(data, tmp_path):
+    X, y, X_test = data
+    bench = Workbench(X, y, X_test, folds=3, cache_dir=tmp_path)
+    bench.add(MODELS, workers=1)
+
+    results = bench.search(weight_grid=(1, 2))
+
+    for f1, members, weights, voting in results:
+        assert f1 == pytest.approx(bench.evaluate(list(members), weights, voting).f1.mean())
+    assert [result[0] for result in results] == sorted((result[0] for result in results), reverse=True)
+
+
+def test_duplicate_names_are_rejected(data, tmp_path):
+    bench = Workbench(*data, folds=3, cache_dir=tmp_path)
+
+    with pytest.raises(ValueError, match='unique'):
+        bench.add([MODELS[0], MODELS[0]])
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+import common.forest as forest_module
+from common.forest import FlatForest, _row_offsets, float32_threshold
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(600, 6))
+    y = (X[:, 0] + X[:, 1] * X[:, 2] + 0.5 * rng.normal(size=600) > 0).astype(int)
+    # Rows past the training ones, some on the training values, so queries land on split thresholds
+    queries = np.concatenate([rng.normal(size=(1500, 6)), X[:200]])
+    return X, y, queries
+
+
+@pytest.fixture(autouse=True)
+def small_blocks(monkeypatch):
+    monkeypatch.setattr(forest_module, 'TRAVERSAL_BLOCK_ROWS', 64)
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_forest_matches_sklearn(data, workers):
+    X, y, queries = data
+    model = RandomForestClassifier(n_estimators=25, max_depth=None, random_state=0).fit(X, y)
+
+    forest = FlatForest.from_sklearn(model)
+
+    np.testing.assert_allclose(forest.predict_proba(queries, workers), model.predict_proba(queries))
+    np.testing.assert_array_equal(forest.predict(queries, workers), model.predict(queries))
+
+
+def test_tree_matches_sklearn(data):
+    X, y, queries = data
+    labels = np.array(['Jedi', 'Sith'])[y]
+    model = DecisionTreeClassifier(max_depth=6, random_state=0).fit(X, labels)
+
+    forest = FlatForest.from_sklearn(model)
+
+    np.testing.assert_allclose(forest.predict_proba(queries), model.predict_proba(queries))
+    np.testing.assert_array_equal(forest.predict(queries), model.predict(queries))
+    np.testing.assert_array_equal(forest.apply(queries)[0], model.apply(queries.astype(np.float32)))
+
+
+def test_strided_and_offset_views_match_sklearn(data):
+    X, y, queries = data
+    model = RandomForestClassifier(n_estimators=10, random_state=0).fit(X, y)
+    wide = np.zeros((len(queries) + 7, 2 * queries.shape[1]))
+    wide[7:, ::2] = queries
+
+    forest = FlatForest.from_sklearn(model)
+
+    for view in (wide[7:, ::2], np.asfortranarray(queries), queries[::-1]):
+        np.testing.assert_allclose(forest.predict_proba(view), model.predict_proba(view))
+
+
+def test_row_offsets_do_not_wrap_past_int32():
+    width = 30
+    start = (2**31 - 60) // width
+
+    offsets = _row_offsets(start, start + 4, width)
+
+    np.testing.assert_array_equal(offsets, np.arange(start, start + 4, dtype=np.int64) * width)
+    assert offsets[-1] > np.iinfo(np.int32).max
+
+
+def test_save_and_load_round_trip(data, tmp_path):
+    X, y, queries = data
+    forest = FlatForest.from_sklearn(RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y))
+
+    forest.save(tmp_path / 'forest.npz')
+    loaded = FlatForest.load(tmp_path / 'forest.npz')
+
+    np.testing.assert_array_equal(loaded.predict_proba(queries), forest.predict_proba(queries))
+    np.testing.assert_array_equal(loaded.classes, forest.classes)
+
+
+def test_unfitted_model_is_rejected():
+    with pytest.raises(ValueError, match='fitted'):
+        FlatForest.from_sklearn(RandomForestClassifier())
+
+
+def test_float32_threshold_splits_like_float64():
+    thresholds = np.array([0.1, 1 / 3, 2.5, -7.3e-5])
+    below = np.nextafter(thresholds.astype(np.float32), np.float32(-np.inf))
+    above = np.nextafter(thresholds.astype(np.float32), np.float32(np.inf))
+    values = np.concatenate([below, thresholds.astype(np.float32), above])
+
+    rounded = float32_threshold(thresholds)
+
+    np.testing.assert_array_equal(values <= np.tile(rounded, 3), values.astype(np.float64) <= np.tile(thresholds, 3))
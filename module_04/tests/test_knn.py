@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.neighbors import KNeighborsClassifier
+
+import common.knn as knn
+from common.knn import nearest_neighbours, predict, sweep_k
+
+LABELS = ['Jedi', 'Sith', 'Padawan']
+
+
+@pytest.fixture
+def data():
+    # Overlapping classes, so the predictions change with k
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 5)) + np.repeat(np.eye(3, 5), [200, 120, 80], axis=0)
+    y = np.repeat(np.arange(3), [200, 120, 80])
+    order = rng.permutation(len(y))
+    return X[order[:300]], y[order[:300]], X[order[300:]], y[order[300:]]
+
+
+@pytest.fixture(autouse=True)
+def small_blocks(monkeypatch):
+    # A few dozen queries per distance block, so the sweep runs over several blocks
+    monkeypatch.setattr(knn, 'DISTANCE_BLOCK_BYTES', 8 * 300 * 32)
+
+
+def test_nearest_neighbours_match_sklearn(data):
+    train_X, _, query_X, _ = data
+
+    indices, distances = nearest_neighbours(train_X, query_X, 7)
+
+    expected_distances, expected_indices = KNeighborsClassifier(7).fit(train_X, np.zeros(300)).kneighbors(query_X)
+    np.testing.assert_array_equal(indices, expected_indices)
+    np.testing.assert_allclose(distances, expected_distances ** 2, atol=1e-9)
+
+
+def test_sweep_matches_sklearn_for_every_k(data):
+    train_X, train_y, query_X, query_y = data
+
+    sweep = sweep_k(train_X, train_y, query_X, query_y, max_k=25, labels=LABELS, workers=2)
+
+    for k in sweep.ks:
+        expected = KNeighborsClassifier(int(k)).fit(train_X, train_y).predict(query_X)
+        assert sweep.accuracy[k - 1] == pytest.approx(accuracy_score(query_y, expected))
+        assert sweep.f1[k - 1] == pytest.approx(f1_score(query_y, expected, average='macro'))
+
+
+def test_predict_matches_sklearn(data):
+    train_X, train_y, query_X, _ = data
+
+    predictions = predict(train_X, train_y, query_X, k=10, n_classes=len(LABELS), workers=2)
+
+    expected = KNeighborsClassifier(10).fit(train_X, train_y).predict(query_X)
+    np.testing.assert_array_equal(predictions, expected)
+
+
+def test_max_k_above_training_rows_is_rejected(data):
+    train_X, train_y, query_X, query_y = data
+
+    with pytest.raises(ValueError, match='max_k'):
+        sweep_k(train_X, train_y, query_X, query_y, max_k=301, labels=LABELS)
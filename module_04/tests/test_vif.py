@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from common.vif import COMPACT_EVERY, eliminate, stream_correlation, vif_table
+
+
+def correlated_features(rows: int, features: int, factors: int, seed: int = 0) -> np.ndarray:
+    """Features mixing a few shared factors with their own noise, so most have a high VIF."""
+    rng = np.random.default_rng(seed)
+    latent = rng.normal(size=(rows, factors))
+    return latent @ rng.normal(size=(factors, features)) + 0.3 * rng.normal(size=(rows, features))
+
+
+def eliminate_by_inversion(correlation: np.ndarray, threshold: float) -> tuple[list[int], list[float], np.ndarray]:
+    """Reference elimination, inverting the correlation of the remaining features every round."""
+    kept, dropped, vifs = list(range(len(correlation))), [], []
+    while len(kept) > 1:
+        vif = np.diag(np.linalg.inv(correlation[np.ix_(kept, kept)]))
+        worst = int(np.argmax(vif))
+        if vif[worst] < threshold:
+            break
+        dropped.append(kept.pop(worst))
+        vifs.append(float(vif[worst]))
+    return dropped, vifs, np.diag(np.linalg.inv(correlation[np.ix_(kept, kept)]))
+
+
+@pytest.mark.parametrize('features', [12, COMPACT_EVERY + 60])
+def test_eliminate_matches_direct_inversion(features):
+    correlation = np.corrcoef(correlated_features(2000, features, factors=8), rowvar=False)
+    names = [f"f{i}" for i in range(features)]
+
+    selection = eliminate(correlation, names, threshold=5.0)
+
+    dropped, vifs, remaining = eliminate_by_inversion(correlation, threshold=5.0)
+    assert [name for name, _ in selection.dropped] == [names[i] for i in dropped]
+    np.testing.assert_allclose([vif for _, vif in selection.dropped], vifs, rtol=1e-8)
+    np.testing.assert_allclose(selection.vif, remaining, rtol=1e-8)
+    assert selection.features == [name for i, name in enumerate(names) if i not in dropped]
+    assert selection.vif.max() < 5.0
+
+
+def test_compaction_is_exercised():
+    correlation = np.corrcoef(correlated_features(2000, COMPACT_EVERY + 60, factors=8), rowvar=False)
+
+    selection = eliminate(correlation, [str(i) for i in range(len(correlation))])
+
+    assert len(selection.dropped) > COMPACT_EVERY
+
+
+def test_vif_table_matches_direct_inversion():
+    correlation = np.corrcoef(correlated_features(500, 6, factors=2), rowvar=False)
+
+    table = vif_table(correlation, list('abcdef'))
+
+    np.testing.assert_allclose(table['VIF'], np.diag(np.linalg.inv(correlation)))
+    np.testing.assert_allclose(table['Tolerance'], 1 / table['VIF'])
+
+
+def test_stream_correlation_matches_pandas(tmp_path):
+    frame = pd.DataFrame(correlated_features(1000, 5, factors=2), columns=list('abcde'))
+    frame.iloc[[3, 500, 777], [1, 4, 0]] = np.nan
+    frame['knight'] = np.where(frame['a'] > 0, 'Jedi', 'Sith')
+    frame.to_csv(tmp_path / 'knights.csv', index=False)
+
+    correlation, features = stream_correlation(tmp_path / 'knights.csv', chunk_rows=97)
+
+    assert features == list('abcde')
+    np.testing.assert_allclose(correlation, frame[features].dropna().corr().to_numpy(), atol=1e-12)
+
+
+def test_stream_correlation_needs_two_rows(tmp_path):
+    (tmp_path / 'knights.csv').write_text('a,b,knight\n1.0,2.0,Jedi\n')
+
+    with pytest.raises(ValueError, match='two complete rows'):
+        stream_correlation(tmp_path / 'knights.csv')